@@ -0,0 +1,231 @@
+from __future__ import annotations
+import argparse, os, re, sys, json, math, random, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), "src"))  # test the working tree
+
+from techdebt_cli.issues import PAGE_SIZE, sync_issues  # noqa: E402
+from techdebt_cli.scoring import bucket  # noqa: E402
+
+SLUG = "acme/widgets"
+ISSUE_PATH = re.compile(r"/repos/([^/]+/[^/]+)/issues(?:/(\d+))?\Z")
+
+
+# In-memory stand-in for the GitHub issues API: list (paginated, with Link headers),
+# create and update, over keep-alive HTTP/1.1. Rate-limit headers count down a quota, and
+# `faults` makes a share of requests fail with a 502 or a secondary rate limit (403 with
+# Retry-After) so the client's retries get exercised.
+class FakeGitHub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, faults: float = 0.0, quota: int = 5000, seed: int = 1):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.lock = threading.Lock()
+        self.issues: Dict[int, Dict[str, Any]] = {}
+        self.faults = faults
+        self.quota = quota
+        self.rng = random.Random(seed)
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {"requests": 0, "connections": 0, "GET": 0, "POST": 0, "PATCH": 0, "injected": 0}
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "FakeGitHub":
+        threading.Thread(target=self.serve_forever, name="fake-github", daemon=True).start()
+        return self
+
+    def open_issues(self) -> List[Dict[str, Any]]:
+        return [i for i in self.issues.values() if i["state"] == "open"]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like api.github.com
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.stats["connections"] += 1
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def _handle(self, method: str):
+        gh: FakeGitHub = self.server
+        size = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(size)) if size else {}
+        url = urlparse(self.path)
+        with gh.lock:
+            gh.stats["requests"] += 1
+            gh.stats[method] += 1
+            gh.quota -= 1
+            if gh.faults and gh.rng.random() < gh.faults:
+                gh.stats["injected"] += 1
+                if gh.rng.random() < 0.5:
+                    return self._send(502, {"message": "Server Error"})
+                return self._send(403, {"message": "secondary rate limit"}, {"Retry-After": "0"})
+            m = ISSUE_PATH.match(url.path)
+            if m is None or m.group(1) != SLUG:
+                return self._send(404, {"message": "Not Found"})
+            if method == "GET" and m.group(2) is None:
+                return self._list(parse_qs(url.query))
+            if method == "POST" and m.group(2) is None:
+                number = len(gh.issues) + 1
+                issue = dict(body, number=number, state="open", labels=[{"name": n} for n in body.get("labels", [])])
+                gh.issues[number] = issue
+                return self._send(201, issue)
+            if method == "PATCH" and m.group(2) is not None and int(m.group(2)) in gh.issues:
+                issue = gh.issues[int(m.group(2))]
+                issue.update({k: v for k, v in body.items() if k != "labels"})
+                return self._send(200, issue)
+            return self._send(404, {"message": "Not Found"})
+
+    def _list(self, query: Dict[str, List[str]]):
+        gh: FakeGitHub = self.server
+        state = query.get("state", ["open"])[0]
+        label = query.get("labels", [""])[0]
+        per_page = int(query.get("per_page", ["30"])[0])
+        page = int(query.get("page", ["1"])[0])
+        found = [
+            i for _, i in sorted(gh.issues.items())
+            if (state == "all" or i["state"] == state) and (not label or {"name": label} in i["labels"])
+        ]
+        headers = {}
+        if page * per_page < len(found):
+            nxt = dict((k, v[0]) for k, v in query.items())
+            nxt["page"] = str(page + 1)
+            qs = "&".join(f"{k}={v}" for k, v in nxt.items())
+            headers["Link"] = f'<{gh.url}/repos/{SLUG}/issues?{qs}>; rel="next"'
+        self._send(200, found[(page - 1) * per_page : page * per_page], headers)
+
+    def _send(self, code: int, doc: Any, headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(doc).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("X-RateLimit-Remaining", str(max(self.server.quota, 0)))
+        self.send_header("X-RateLimit-Reset", str(int(time.time()) + 3600))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_report(n: int, seed: int = 1) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    items = []
+    for i in range(n):
+        score = round(rng.uniform(30, 95), 2)
+        items.append({
+            "path": f"src/mod_{i % 97}.py",
+            "kind": "inline_marker",
+            "score": score,
+            "meta": {"line": 10 + i, "snippet": f"# TODO revisit item {i}", "priority_bucket": bucket(score)},
+            "owner": ["alice", "bob", "carol", None][i % 4],
+        })
+    return {"items": items}
+
+
+def _touch(report: Dict[str, Any], renamed: int, moved: int, rescored: int):
+    # New snippets are new items (and their old issues close); a moved line is an update;
+    # a score change that keeps the bucket changes nothing on GitHub
+    items = report["items"]
+    for it in items[:renamed]:
+        it["meta"]["snippet"] += " (reworded)"
+    for it in items[renamed : renamed + moved]:
+        it["meta"]["line"] += 1
+    for it in items[renamed + moved : renamed + moved + rescored]:
+        it["score"] += 0.01
+
+
+def run_sync(gh: FakeGitHub, report: Dict[str, Any], **kw) -> Dict[str, Any]:
+    gh.reset_stats()
+    start = time.perf_counter()
+    stats = sync_issues(report, SLUG, api_url=gh.url, sleep=lambda s: None, **kw)
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    stats["server"] = dict(gh.stats)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check issue sync API usage against a local GitHub stand-in")
+    parser.add_argument("--items", type=int, default=300, help="Items in the synthetic report")
+    parser.add_argument("--jobs", "-j", type=int, default=4, help="Concurrent connections used by the sync")
+    parser.add_argument("--faults", type=float, default=0.1, help="Share of requests failed in the fault run")
+    parser.add_argument("--serve", type=int, default=None, metavar="PORT", help="Only run the stand-in server")
+    args = parser.parse_args()
+
+    if args.serve is not None:
+        gh = FakeGitHub(args.serve)
+        print(f"Fake GitHub API for {SLUG} on {gh.url} (Ctrl-C to stop)")
+        try:
+            gh.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    n = args.items
+    pages = math.ceil(n / PAGE_SIZE)
+    renamed, moved = max(1, n // 100), max(1, n // 100)
+    gh = FakeGitHub().start()
+    report = make_report(n)
+    steps = []  # (name, stats, expected (created, updated, closed), most API calls allowed)
+    steps.append(("initial", run_sync(gh, report, top=0, jobs=args.jobs), (n, 0, 0), 1 + n))
+    steps.append(("unchanged", run_sync(gh, report, top=0, jobs=args.jobs), (0, 0, 0), pages))
+    # Items below --top are still in the report: their issues stay open, untouched
+    steps.append(("top-10", run_sync(gh, report, top=10, jobs=args.jobs), (0, 0, 0), pages))
+    _touch(report, renamed, moved, rescored=n // 10)
+    changed = 2 * renamed + moved
+    steps.append(
+        ("changed", run_sync(gh, report, top=0, jobs=args.jobs), (renamed, moved, renamed), pages + changed)
+    )
+    _touch(report, renamed, moved, rescored=0)
+    gh.faults = args.faults
+    steps.append(("faults", run_sync(gh, report, top=0, jobs=args.jobs), (renamed, moved, renamed), None))
+    gh.faults = 0.0
+    steps.append(("by-owner", run_sync(gh, report, top=0, group="owner", jobs=args.jobs), (4, 0, n), None))
+
+    problems = []
+    print(f"{'run':<11}{'created':>8}{'updated':>8}{'closed':>8}{'calls':>7}{'conns':>7}{'retried':>8}{'s':>8}")
+    for name, st, want, max_calls in steps:
+        srv = st["server"]
+        print(
+            f"{name:<11}{st['created']:>8}{st['updated']:>8}{st['closed']:>8}{srv['requests']:>7}"
+            f"{srv['connections']:>7}{srv['injected']:>8}{st['seconds']:>8.2f}"
+        )
+        got = (st["created"], st["updated"], st["closed"])
+        if got != want:
+            problems.append(f"{name}: created/updated/closed {got}, expected {want}")
+        if st["failed"]:
+            problems.append(f"{name}: {len(st['failed'])} requests failed, first: {st['failed'][0]}")
+        if max_calls is not None and srv["requests"] > max_calls:
+            problems.append(f"{name}: {srv['requests']} API calls, expected at most {max_calls}")
+        # One connection lists, one per worker writes; a failed request may cost a reconnect
+        if srv["connections"] > 1 + args.jobs + srv["injected"]:
+            problems.append(f"{name}: {srv['connections']} connections for {args.jobs} workers")
+    if len(gh.open_issues()) != 4:
+        problems.append(f"{len(gh.open_issues())} open issues after the by-owner run, expected 4")
+    gh.shutdown()
+    for line in problems:
+        print(f"[problem] {line}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+from __future__ import annotations
+import argparse, os, sys, json, platform, statistics, subprocess, tempfile
+from dataclasses import asdict
+from typing import Dict, Any, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), "src"))  # benchmark the working tree
+sys.path.insert(0, HERE)
+
+from synthrepo import RepoSpec, ensure_repo  # noqa: E402
+
+BASELINE = os.path.join(HERE, "baseline.json")
+
+SCENARIOS: Dict[str, RepoSpec] = {
+    "small": RepoSpec(files=300, file_bytes=2048, commits=10, deps=20),
+    "many-files": RepoSpec(files=5000, file_bytes=2048, commits=20, deps=80, test_layout="mirror"),
+    "large-files": RepoSpec(files=40, file_bytes=2 << 20, marker_density=0.5, commits=5, deps=10),
+    "dense-markers": RepoSpec(files=1000, file_bytes=8192, marker_density=25.0, commits=10, deps=40),
+    "deep-history": RepoSpec(files=500, file_bytes=4096, commits=300, deps=40),
+    "big-manifest": RepoSpec(files=1000, file_bytes=2048, commits=10, deps=1500, test_layout="none"),
+}
+
+
+def _peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return 0.0
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    return round(peak / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+def measure(repo: str, jobs: int, cache_dir: str = "", complexity: bool = True) -> Dict[str, Any]:
+    # One scan_repo run; called in a fresh interpreter so peak RSS belongs to this run only
+    from techdebt_cli.config import load_config
+    from techdebt_cli.cache import ScanCache
+    from techdebt_cli.profiler import Profiler
+    from techdebt_cli.scanner import scan_repo
+
+    profiler = Profiler()
+    cfg = load_config(repo)
+    cfg.data["complexity"]["enabled"] = complexity
+    cache = ScanCache(repo, cfg, cache_dir=cache_dir) if cache_dir else None
+    result = scan_repo(repo, cfg, jobs=jobs, cache=cache, profiler=profiler)
+    prof = profiler.to_json()
+    return {
+        "wall_s": prof["wall_s"],
+        "cpu_s": prof["cpu_s"],
+        "files": prof["counters"].get("files_walked", 0),
+        "bytes": prof["counters"].get("bytes_read", 0),
+        "git_processes": prof["git_processes"],
+        "phases": {p["name"]: p["wall_s"] for p in prof["phases"]},
+        "items": result["summary"]["count"],
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _run_child(repo: str, jobs: int, cache_dir: str, complexity: bool = True) -> Dict[str, Any]:
+    cmd = [sys.executable, os.path.abspath(__file__), "--measure", repo, "--jobs", str(jobs)]
+    if cache_dir:
+        cmd += ["--cache-dir", cache_dir]
+    if not complexity:
+        cmd.append("--no-complexity")
+    out = subprocess.run(cmd, stdout=subprocess.PIPE, check=True, text=True).stdout
+    return json.loads(out)
+
+
+def run_scenario(
+    name: str, spec: RepoSpec, workdir: str, repeat: int, jobs: int, warm_cache: bool, complexity_off: bool = True,
+) -> Dict[str, Any]:
+    repo = ensure_repo(workdir, name, spec)
+    cache_dir = os.path.join(workdir, f"{name}-{spec.digest()}.cache") if warm_cache else ""
+    _run_child(repo, jobs, cache_dir)  # warm-up: page cache (and scan cache, if enabled)
+    runs = [_run_child(repo, jobs, cache_dir) for _ in range(repeat)]
+    wall = statistics.median(r["wall_s"] for r in runs)
+    # The same scan without the complexity pass, for the overhead check in compare()
+    off = [_run_child(repo, jobs, cache_dir, complexity=False) for _ in range(repeat if complexity_off else 0)]
+    first = runs[0]
+    phases = {k: round(statistics.median(r["phases"].get(k, 0.0) for r in runs), 4) for k in first["phases"]}
+    return {
+        "spec": asdict(spec),
+        "wall_s": round(wall, 4),
+        "cpu_s": round(statistics.median(r["cpu_s"] for r in runs), 4),
+        "files": first["files"],
+        "mb": round(first["bytes"] / 1e6, 2),
+        "files_per_s": round(first["files"] / wall, 1) if wall else 0.0,
+        "mb_per_s": round(first["bytes"] / 1e6 / wall, 2) if wall else 0.0,
+        "peak_rss_mb": max(r["peak_rss_mb"] for r in runs),
+        "git_processes": first["git_processes"],
+        "items": first["items"],
+        "phases": phases,
+        "complexity_off_wall_s": round(statistics.median(r["wall_s"] for r in off), 4) if off else None,
+    }
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, max_complexity_overhead: float = 2.0,
+) -> List[str]:
+    # A scenario regresses when its median wall time exceeds the baseline by more than
+    # `tolerance`, when it finds a different number of items (a behaviour change), or when
+    # the complexity pass makes the scan `max_complexity_overhead` times slower or worse.
+    problems = []
+    for name, cur in current.items():
+        off = cur.get("complexity_off_wall_s")
+        if max_complexity_overhead and off and cur["wall_s"] >= off * max_complexity_overhead:
+            problems.append(
+                f"{name}: {cur['wall_s']:.3f}s, {cur['wall_s'] / off:.2f}x the {off:.3f}s without complexity analysis"
+            )
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if base.get("spec") != cur["spec"]:
+            problems.append(f"{name}: spec differs from baseline, re-record with --update-baseline")
+            continue
+        if cur["items"] != base["items"]:
+            problems.append(f"{name}: {cur['items']} items, baseline had {base['items']}")
+        if base["wall_s"] and cur["wall_s"] > base["wall_s"] * (1 + tolerance):
+            pct = (cur["wall_s"] / base["wall_s"] - 1) * 100
+            problems.append(f"{name}: {cur['wall_s']:.3f}s vs baseline {base['wall_s']:.3f}s (+{pct:.0f}%)")
+    return problems
+
+
+def _print_table(current: Dict[str, Any], baseline: Dict[str, Any]):
+    print(f"{'scenario':<16}{'files':>8}{'MB':>8}{'wall s':>9}{'files/s':>10}{'MB/s':>8}{'RSS MB':>8}{'vs base':>9}")
+    for name, r in current.items():
+        base = baseline.get(name, {}).get("wall_s")
+        delta = f"{(r['wall_s'] / base - 1) * 100:+.0f}%" if base else "-"
+        print(
+            f"{name:<16}{r['files']:>8}{r['mb']:>8.1f}{r['wall_s']:>9.3f}{r['files_per_s']:>10.0f}"
+            f"{r['mb_per_s']:>8.1f}{r['peak_rss_mb']:>8.0f}{delta:>9}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scan_repo on synthetic repositories")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Run only these (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per scenario (median is reported)")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Worker processes passed to scan_repo")
+    parser.add_argument("--warm-cache", action="store_true", help="Time scans against a warm --cache")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "techdebt-bench"))
+    parser.add_argument("--baseline", default=BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument(
+        "--max-complexity-overhead", type=float, default=2.0,
+        help="Fail when a scan takes this many times as long as without complexity analysis (0 = skip the check)",
+    )
+    parser.add_argument("--output", default=None, help="Also write the full results to this JSON file")
+    parser.add_argument("--measure", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--cache-dir", default="", help=argparse.SUPPRESS)
+    parser.add_argument("--no-complexity", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.jobs, args.cache_dir, complexity=not args.no_complexity)))
+        return
+
+    os.makedirs(args.workdir, exist_ok=True)
+    names = args.scenario or list(SCENARIOS)
+    current = {
+        n: run_scenario(
+            n, SCENARIOS[n], args.workdir, args.repeat, args.jobs, args.warm_cache, args.max_complexity_overhead > 0
+        )
+        for n in names
+    }
+
+    baseline: Dict[str, Any] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("scenarios", {})
+    _print_table(current, baseline)
+
+    doc = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "jobs": args.jobs,
+        "warm_cache": args.warm_cache,
+        "scenarios": current,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+    if args.update_baseline:
+        doc["scenarios"] = dict(baseline, **current)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+            f.write("\n")
+        print(f"Wrote {args.baseline}")
+        return
+
+    problems = compare(current, baseline, args.tolerance, args.max_complexity_overhead)
+    for line in problems:
+        print(f"[regression] {line}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
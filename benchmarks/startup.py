@@ -0,0 +1,174 @@
+from __future__ import annotations
+import argparse, os, re, sys, json, platform, subprocess, tempfile, time
+from typing import Dict, Any, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(os.path.dirname(HERE), "src")
+sys.path.insert(0, HERE)
+
+from synthrepo import RepoSpec, ensure_repo  # noqa: E402
+
+BASELINE = os.path.join(HERE, "startup_baseline.json")
+REPO_SPEC = RepoSpec(files=20, file_bytes=1024, commits=2, deps=5)
+REPORT_FILES = re.compile(r"(tech-debt\.n?json|TECH_DEBT(-\d+)?\.md)\Z")
+
+# CLI invocations timed end to end ({repo} is a tiny synthetic repo, {report} a saved scan of
+# it kept outside the repo), and the heavy modules each one must not import. A JSON-only scan
+# without .techdebt.yml loads neither Jinja nor PyYAML; only `watch` needs the HTTP server
+# and only -j N > 1 needs a process pool. numpy is only for batch re-scoring.
+CASES: Dict[str, Dict[str, Any]] = {
+    "help": {
+        "argv": ["--help"],
+        "forbidden": ["jinja2", "yaml", "pathspec", "http.server", "multiprocessing", "techdebt_cli.scanner"],
+    },
+    "scan-json": {
+        "argv": ["scan", "{repo}", "--json"],
+        "forbidden": ["jinja2", "yaml", "http.server", "multiprocessing", "sqlite3", "numpy"],
+    },
+    "scan-markdown": {
+        "argv": ["scan", "{repo}", "--markdown"],
+        "forbidden": ["yaml", "http.server", "multiprocessing", "sqlite3", "numpy"],
+    },
+    "rescore-json": {
+        "argv": ["rescore", "{report}", "--repo", "{repo}", "--json"],
+        "forbidden": ["jinja2", "yaml", "pathspec", "http.server", "multiprocessing"],
+    },
+}
+
+# Runs the CLI in-process, then reports which of the watched modules got imported
+CHILD = """
+import sys, json, runpy
+sys.path.insert(0, {src!r})
+sys.argv = ["techdebt"] + {argv!r}
+try:
+    runpy.run_module("techdebt_cli", run_name="__main__")
+except SystemExit:
+    pass
+with open({report!r}, "w") as f:
+    json.dump(sorted(m for m in {watched!r} if m in sys.modules), f)
+"""
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = SRC + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def _clean(repo: str):
+    # Reports left by the previous run would be scanned (and timed) by the next one
+    for name in os.listdir(repo):
+        if REPORT_FILES.match(name):
+            os.remove(os.path.join(repo, name))
+
+
+def _time_once(cmd: List[str], cwd: str) -> float:
+    _clean(cwd)
+    start = time.perf_counter()
+    subprocess.run(cmd, cwd=cwd, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+    return time.perf_counter() - start
+
+
+def _loaded(argv: List[str], watched: List[str], cwd: str) -> List[str]:
+    with tempfile.NamedTemporaryFile("r", suffix=".json", delete=False) as f:
+        report = f.name
+    try:
+        code = CHILD.format(src=SRC, argv=argv, report=report, watched=watched)
+        _clean(cwd)
+        subprocess.run([sys.executable, "-c", code], cwd=cwd, stdout=subprocess.DEVNULL, check=True)
+        with open(report, "r", encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        os.remove(report)
+
+
+def run_case(name: str, repo: str, report: str, repeat: int, bare_s: float) -> Dict[str, Any]:
+    case = CASES[name]
+    argv = [a.format(repo=repo, report=report) for a in case["argv"]]
+    cmd = [sys.executable, "-m", "techdebt_cli"] + argv
+    _time_once(cmd, repo)  # warm-up: bytecode and page cache
+    # The fastest run: start-up cost is fixed, anything above it is scheduling noise
+    wall = min(_time_once(cmd, repo) for _ in range(repeat))
+    return {
+        "argv": case["argv"],
+        "wall_ms": round(wall * 1000, 1),
+        # What the CLI adds on top of starting a bare interpreter
+        "overhead_ms": round(max(wall - bare_s, 0.0) * 1000, 1),
+        "unexpected_imports": _loaded(argv, case["forbidden"], repo),
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, slack_ms: float) -> List[str]:
+    # Unexpected imports always fail; overhead fails past the baseline by `tolerance` plus a
+    # small absolute slack, since a few ms of jitter is a large share of a short run
+    problems = []
+    for name, cur in current.items():
+        if cur["unexpected_imports"]:
+            problems.append(f"{name}: imports {', '.join(cur['unexpected_imports'])}")
+        base = baseline.get(name)
+        if base is None or base.get("argv") != cur["argv"]:
+            continue
+        limit = base["overhead_ms"] * (1 + tolerance) + slack_ms
+        if cur["overhead_ms"] > limit:
+            over, was = cur["overhead_ms"], base["overhead_ms"]
+            problems.append(f"{name}: {over:.1f}ms over bare startup, baseline {was:.1f}ms")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark techdebt CLI startup time and imports")
+    parser.add_argument("--case", action="append", choices=sorted(CASES), help="Run only these (repeatable)")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per case (the fastest is reported)")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "techdebt-bench"))
+    parser.add_argument("--baseline", default=BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--slack-ms", type=float, default=20.0, help="Absolute jitter allowance on top of --tolerance")
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    repo = ensure_repo(args.workdir, "startup", REPO_SPEC)
+    bare = [sys.executable, "-c", "pass"]
+    _time_once(bare, repo)
+    bare_s = min(_time_once(bare, repo) for _ in range(args.repeat))
+    report = os.path.join(args.workdir, "startup-report.json")
+    _clean(repo)
+    scan = [sys.executable, "-m", "techdebt_cli", "scan", repo, "--json"]
+    subprocess.run(scan, env=_env(), stdout=subprocess.DEVNULL, check=True)
+    os.replace(os.path.join(repo, "tech-debt.json"), report)
+    names = args.case or list(CASES)
+    current = {n: run_case(n, repo, report, args.repeat, bare_s) for n in names}
+    _clean(repo)
+
+    baseline: Dict[str, Any] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("cases", {})
+    print(f"bare interpreter: {bare_s * 1000:.1f}ms")
+    print(f"{'case':<16}{'wall ms':>9}{'over ms':>9}{'vs base':>9}  unexpected imports")
+    for name, r in current.items():
+        base = baseline.get(name, {}).get("overhead_ms")
+        delta = f"{(r['overhead_ms'] / base - 1) * 100:+.0f}%" if base else "-"
+        print(f"{name:<16}{r['wall_ms']:>9.1f}{r['overhead_ms']:>9.1f}{delta:>9}  {', '.join(r['unexpected_imports'])}")
+
+    if args.update_baseline:
+        doc = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "bare_ms": round(bare_s * 1000, 1),
+            "cases": dict(baseline, **current),
+        }
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+            f.write("\n")
+        print(f"Wrote {args.baseline}")
+        return
+
+    problems = compare(current, baseline, args.tolerance, args.slack_ms)
+    for line in problems:
+        print(f"[regression] {line}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
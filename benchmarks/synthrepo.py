@@ -0,0 +1,138 @@
+from __future__ import annotations
+import os, json, random, shutil, subprocess, hashlib
+from dataclasses import dataclass, asdict
+from typing import List
+
+MARKERS = ["TODO", "FIXME", "HACK", "XXX", "BUG", "OPTIMIZE"]
+OWNERS = ["alice", "bob", "carol", "dave"]
+PACKAGES = [f"pkg-{i}" for i in range(2000)]
+RANGES = ["^1.2.3", "~2.0.1", "3.4.5", "*", "1.x", ">=0.8.0 <1", "4.17.21"]
+GIT_ENV = {
+    "GIT_AUTHOR_NAME": "bench", "GIT_AUTHOR_EMAIL": "bench@example.invalid",
+    "GIT_COMMITTER_NAME": "bench", "GIT_COMMITTER_EMAIL": "bench@example.invalid",
+}
+
+
+# Shape of one synthetic repository. The same spec and seed always produce the same tree
+# and history, so timings from different machines or commits are comparable.
+@dataclass(frozen=True)
+class RepoSpec:
+    files: int = 500
+    file_bytes: int = 4096
+    marker_density: float = 2.0  # markers per 100 lines
+    commits: int = 20
+    deps: int = 40
+    test_layout: str = "partial"  # none | partial | mirror
+    py_share: float = 0.3
+    seed: int = 1
+
+    def digest(self) -> str:
+        return hashlib.sha1(json.dumps(asdict(self), sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+
+def _git(repo: str, *args: str):
+    env = dict(os.environ, **GIT_ENV)
+    subprocess.run(["git", *args], cwd=repo, env=env, check=True, stdout=subprocess.DEVNULL)
+
+
+def _source(rng: random.Random, spec: RepoSpec, lang: str, deps: List[str], salt: int) -> str:
+    comment = "//" if lang == "ts" else "#"
+    lines: List[str] = []
+    if lang == "ts":
+        for dep in rng.sample(deps, min(len(deps), 3)):
+            lines.append(f"import {{ thing }} from '{dep}';")
+        lines.append("import { helper } from './helper';")
+    else:
+        lines.append("import os, logging")
+    size = sum(len(line) + 1 for line in lines)
+    n = 0
+    while size < spec.file_bytes:
+        n += 1
+        if rng.random() * 100 < spec.marker_density:
+            tag = rng.choice(MARKERS)
+            prio = f" [P{rng.randint(1, 3)}]" if rng.random() < 0.5 else ""
+            owner = f" @{rng.choice(OWNERS)}" if rng.random() < 0.3 else ""
+            line = f"{comment} {tag}{prio}{owner} revisit item {n} ({salt})"
+        elif rng.random() < 0.01:
+            line = "// eslint-disable-next-line" if lang == "ts" else "x = 1  # noqa"
+        elif lang == "ts":
+            line = f"export function f{n}(a: number): number {{ return a * {n} + {salt}; }}"
+        else:
+            line = f"def f{n}(a):\n    return a * {n} + {salt}"
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines) + "\n"
+
+
+def _layout(spec: RepoSpec) -> List[str]:
+    paths = []
+    for i in range(spec.files):
+        if i % 100 < spec.py_share * 100:
+            paths.append(f"app/pkg{i // 200}/mod_{i}.py")
+        else:
+            paths.append(f"src/lib{i // 200}/mod_{i}.ts")
+    return paths
+
+
+def _tests(spec: RepoSpec, paths: List[str], rng: random.Random) -> List[str]:
+    if spec.test_layout == "none":
+        return []
+    share = 1.0 if spec.test_layout == "mirror" else 0.5
+    out = []
+    for rel in paths:
+        if rng.random() >= share:
+            continue
+        base = os.path.basename(rel)
+        if rel.endswith(".ts"):
+            out.append("tests/" + base.replace(".ts", ".test.ts"))
+        else:
+            out.append("tests/" + base)
+    return out
+
+
+def _write(repo: str, rel: str, text: str):
+    path = os.path.join(repo, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def generate(repo: str, spec: RepoSpec) -> str:
+    rng = random.Random(spec.seed)
+    os.makedirs(repo, exist_ok=True)
+    _git(repo, "init", "-q", "-b", "main")
+    deps = rng.sample(PACKAGES, min(spec.deps, len(PACKAGES)))
+    pkg = {"name": "synthetic", "dependencies": {d: rng.choice(RANGES) for d in deps}}
+    _write(repo, "package.json", json.dumps(pkg, indent=2) + "\n")
+    _write(repo, "Dockerfile", "FROM node:latest\n# TODO pin the base image\n")
+    _write(repo, ".github/workflows/ci.yml", "on: push\njobs:\n  t:\n    steps:\n      - uses: actions/checkout@v4\n")
+    paths = _layout(spec)
+    for rel in paths:
+        _write(repo, rel, _source(rng, spec, "ts" if rel.endswith(".ts") else "py", deps, 0))
+    for rel in _tests(spec, paths, rng):
+        _write(repo, rel, "// test\n" if rel.endswith(".ts") else "# test\n")
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", "initial")
+    # History: each later commit rewrites a few percent of the files, which is what the
+    # churn and age passes have to walk through.
+    touched = max(1, spec.files // 30)
+    for c in range(1, spec.commits):
+        for rel in rng.sample(paths, min(touched, len(paths))):
+            _write(repo, rel, _source(rng, spec, "ts" if rel.endswith(".ts") else "py", deps, c))
+        _git(repo, "add", "-A")
+        _git(repo, "commit", "-q", "-m", f"change {c}")
+    return repo
+
+
+def ensure_repo(workdir: str, name: str, spec: RepoSpec) -> str:
+    # Generated repos are reused across runs; a spec change gets a fresh directory
+    repo = os.path.join(workdir, f"{name}-{spec.digest()}")
+    marker = os.path.join(repo, ".git", "synthetic-ok")
+    if os.path.exists(marker):
+        return repo
+    if os.path.exists(repo):
+        shutil.rmtree(repo)
+    generate(repo, spec)
+    with open(marker, "w", encoding="utf-8") as f:
+        f.write(json.dumps(asdict(spec)))
+    return repo
@@ -1,8 +1,12 @@
-import argparse
-from .scanner import scan_repo
-from .renderer import render_markdown
-from .utils import write_json, find_repo_root
+import argparse, os, json
+from datetime import datetime
+from .utils import write_json, write_ndjson, find_repo_root, git_commit_time
 from .config import load_config
+from .profiler import Profiler
+
+# Each command imports what it needs when it runs: Jinja only for Markdown output, the
+# scanner only for commands that scan, the HTTP server only for `watch`. A JSON-only scan
+# of a repo without .techdebt.yml never loads Jinja or PyYAML.
 
 
 def main():
@@ -13,29 +17,458 @@ def main():
     scan.add_argument("path", help="Path to repo (or any child path)")
     scan.add_argument("--markdown", action="store_true", help="Emit TECH_DEBT.md")
     scan.add_argument("--json", action="store_true", help="Emit tech-debt.json")
+    scan.add_argument("--ndjson", action="store_true", help="Emit tech-debt.ndjson (one record per line)")
     scan.add_argument("--issues", action="store_true", help="Create umbrella GitHub issue via gh")
     scan.add_argument("--owner", default=None, help="GitHub username for issue assignment")
     scan.add_argument("--since-days", type=int, default=30, help="Git churn window (days)")
     scan.add_argument("--max-items", type=int, default=2000, help="Safety cap on number of items")
+    scan.add_argument(
+        "--summary-scope",
+        choices=["kept", "all"],
+        default="kept",
+        help="Summarise only the reported items, or every item found before the --max-items cut",
+    )
+    scan.add_argument(
+        "--age-mode",
+        choices=["file", "line"],
+        default="file",
+        help="Age markers by last change to the file, or to the marker line via git blame",
+    )
+    scan.add_argument("--max-file-bytes", type=int, default=None, help="Skip (and report) files larger than this")
+    scan.add_argument("--since-ref", default=None, help="Only scan paths changed since REF and report the delta")
+    scan.add_argument("--cache", action="store_true", help="Reuse per-file results from .git/techdebt-cache")
+    scan.add_argument("--cache-dir", default=None, help="Override the scan cache directory (implies --cache)")
+    scan.add_argument(
+        "--walker",
+        choices=["scandir", "git"],
+        default="scandir",
+        help="File enumeration: walk the tree, or ask `git ls-files` (faster on large repos)",
+    )
+    scan.add_argument("--jobs", "-j", type=int, default=1, help="Worker processes for file scanning (0 = all CPUs)")
+    scan.add_argument("--profile", action="store_true", help="Write per-phase timings to techdebt-profile.json")
+    scan.add_argument(
+        "--details-per-page",
+        type=int,
+        default=None,
+        help="Split Markdown details into TECH_DEBT-<n>.md pages of N items (0 = one page)",
+    )
+
+    scan.add_argument("--record", action="store_true", help="Record this scan in the trend store (see `trends`)")
+    scan.add_argument("--trend-db", default=None, help="Trend store path (default: .git/techdebt-trends.sqlite)")
+
+    trends = sub.add_parser("trends", help="Query the trend store filled by `scan --record`")
+    trends.add_argument("path", nargs="?", default=".", help="Path to repo (or any child path)")
+    trends.add_argument("--trend-db", default=None, help="Trend store path (default: .git/techdebt-trends.sqlite)")
+    trends.add_argument("--weeks", type=int, default=12, help="Weeks of added/resolved counts to show")
+    trends.add_argument("--limit", type=int, default=20, help="Rows in the open-longest and recent-scans lists")
+    trends.add_argument("--json", action="store_true", help="Print the results as JSON")
+
+    back = sub.add_parser("backfill", help="Score past commits from git objects into the trend store")
+    back.add_argument("path", nargs="?", default=".", help="Path to repo (or any child path)")
+    back.add_argument("--from", dest="from_ref", required=True, help="First commit to score")
+    back.add_argument("--to", dest="to_ref", default="HEAD", help="Last commit to score (default: HEAD)")
+    back.add_argument("--every", default="1", help="Every N first-parent commits, or Nd / Nw for days / weeks")
+    back.add_argument("--since-days", type=int, default=30, help="Git churn window (days) before each commit")
+    back.add_argument("--max-items", type=int, default=2000, help="Safety cap on number of items per commit")
+    back.add_argument("--trend-db", default=None, help="Trend store path (default: .git/techdebt-trends.sqlite)")
+    back.add_argument("--force", action="store_true", help="Re-score commits that are already recorded")
+
+    rescore = sub.add_parser("rescore", help="Re-score a saved tech-debt.json with the current weights (no re-scan)")
+    rescore.add_argument("report", nargs="?", default="tech-debt.json", help="Saved report (default: tech-debt.json)")
+    rescore.add_argument("--repo", default=None, help="Repo whose .techdebt.yml to use (default: the report's repo)")
+    rescore.add_argument("--markdown", action="store_true", help="Emit TECH_DEBT.md")
+    rescore.add_argument("--json", action="store_true", help="Emit tech-debt.json")
+    rescore.add_argument("--ndjson", action="store_true", help="Emit tech-debt.ndjson (one record per line)")
+    rescore.add_argument("--max-items", type=int, default=2000, help="Safety cap on number of items")
+    rescore.add_argument("--summary-scope", choices=["kept", "all"], default="kept", help="See `scan --summary-scope`")
+    rescore.add_argument("--details-per-page", type=int, default=None, help="See `scan --details-per-page`")
+
+    sync = sub.add_parser("sync-issues", help="Create, update and close GitHub issues to match a saved report")
+    sync.add_argument("report", nargs="?", default="tech-debt.json", help="Saved report (default: tech-debt.json)")
+    sync.add_argument("--repo", default=None, help="Local repo whose origin remote names the GitHub repository")
+    sync.add_argument("--github-repo", default=None, help="OWNER/NAME (default: from the origin remote)")
+    sync.add_argument("--api-url", default=None, help="API base URL (default: https://api.github.com)")
+    sync.add_argument("--group", choices=["item", "owner"], default="item", help="One issue per item, or per owner")
+    sync.add_argument("--label", default="tech-debt", help="Label marking the synced issues (default: tech-debt)")
+    sync.add_argument("--top", type=int, default=50, help="Sync only the N highest-scoring items (0 = all)")
+    sync.add_argument("--min-score", type=float, default=0.0, help="Leave out items scoring below this")
+    sync.add_argument("--assign-owners", action="store_true", help="Assign issues to the items' owners")
+    sync.add_argument("--jobs", "-j", type=int, default=4, help="Concurrent API connections (default: 4)")
+    sync.add_argument("--dry-run", action="store_true", help="Only list existing issues and print the plan")
+
+    many = sub.add_parser("scan-many", help="Scan many repositories in one process with a shared worker pool")
+    many.add_argument("paths", nargs="*", help="Repo paths")
+    many.add_argument("--manifest", default=None, help="File listing repo paths, one per line")
+    many.add_argument("--out-dir", default=None, help="Write reports to OUT_DIR/<repo> instead of into each repo")
+    many.add_argument("--markdown", action="store_true", help="Emit TECH_DEBT.md per repo")
+    many.add_argument("--json", action="store_true", help="Emit tech-debt.json per repo")
+    many.add_argument("--ndjson", action="store_true", help="Emit tech-debt.ndjson per repo")
+    many.add_argument("--jobs", "-j", type=int, default=0, help="Worker processes shared by all repos (0 = all CPUs)")
+    many.add_argument("--parallel", type=int, default=0, help="Repos scanned at once (default: --jobs)")
+    many.add_argument("--per-repo-jobs", type=int, default=2, help="Most workers one repo may hold at a time")
+    many.add_argument("--since-days", type=int, default=30, help="Git churn window (days)")
+    many.add_argument("--max-items", type=int, default=2000, help="Safety cap on number of items per repo")
+    many.add_argument("--summary-scope", choices=["kept", "all"], default="kept", help="See `scan --summary-scope`")
+    many.add_argument("--age-mode", choices=["file", "line"], default="file", help="See `scan --age-mode`")
+    many.add_argument("--max-file-bytes", type=int, default=None, help="Skip (and report) files larger than this")
+    many.add_argument("--cache", action="store_true", help="Reuse per-file results from each repo's scan cache")
+    many.add_argument("--walker", choices=["scandir", "git"], default="scandir", help="See `scan --walker`")
+
+    watch = sub.add_parser("watch", help="Keep a scan in memory, update it as files change and serve it over HTTP")
+    watch.add_argument("path", help="Path to repo (or any child path)")
+    watch.add_argument("--host", default="127.0.0.1", help="Address to serve on (default: localhost only)")
+    watch.add_argument("--port", type=int, default=None, help="HTTP port (default: 8765, 0 = pick a free one)")
+    watch.add_argument("--interval", type=float, default=None, help="Seconds between change checks (default: 1)")
+    watch.add_argument("--poll", action="store_true", help="Stat-walk the tree even when watchdog is installed")
+    watch.add_argument("--markdown", action="store_true", help="Rewrite TECH_DEBT.md on every change")
+    watch.add_argument("--json", action="store_true", help="Rewrite tech-debt.json on every change")
+    watch.add_argument("--since-days", type=int, default=30, help="Git churn window (days)")
+    watch.add_argument("--max-items", type=int, default=2000, help="Safety cap on number of items")
+    watch.add_argument("--summary-scope", choices=["kept", "all"], default="kept", help="See `scan --summary-scope`")
+    watch.add_argument("--age-mode", choices=["file", "line"], default="file", help="See `scan --age-mode`")
+    watch.add_argument("--jobs", "-j", type=int, default=1, help="Worker processes for the initial scan (0 = all CPUs)")
 
     args = parser.parse_args()
+    if args.cmd == "rescore":
+        return run_rescore(args)
+    if args.cmd == "backfill":
+        return run_backfill(args)
+    if args.cmd == "trends":
+        return run_trends(args)
+    if args.cmd == "sync-issues":
+        return run_sync_issues(args)
+    if args.cmd == "scan-many":
+        return run_scan_many(args)
+    if args.cmd == "watch":
+        return run_watch(args)
+
+    if args.record and args.since_ref:
+        raise SystemExit("[error] --record needs a full scan; it cannot be combined with --since-ref")
+    from .cache import ScanCache
+    from .collector import TopItems
+    from .scanner import item_to_json, scan_repo
 
+    profiler = Profiler(enabled=args.profile)
     repo_root = find_repo_root(args.path)
-    cfg = load_config(repo_root)
-    result = scan_repo(repo_root, cfg, since_days=args.since_days, max_items=args.max_items)
+    with profiler.phase("load_config"):
+        cfg = load_config(repo_root)
+    if args.max_file_bytes is not None:
+        cfg.data["limits"] = dict(cfg.data.get("limits") or {}, max_file_bytes=args.max_file_bytes)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    cache = ScanCache(repo_root, cfg, cache_dir=args.cache_dir) if (args.cache or args.cache_dir) else None
+    if args.since_ref:
+        from .diffscan import scan_diff
+
+        try:
+            result = scan_diff(
+                repo_root,
+                cfg,
+                args.since_ref,
+                since_days=args.since_days,
+                max_items=args.max_items,
+                age_mode=args.age_mode,
+                jobs=jobs,
+                cache=cache,
+                walker=args.walker,
+                profiler=profiler,
+                summary_scope=args.summary_scope,
+            )
+        except ValueError as e:
+            raise SystemExit(f"[error] {e}")
+    else:
+        # The trend store needs every item, not just the reported ones
+        collector = TopItems(args.max_items, keep_all=True) if args.record else None
+        try:
+            result = scan_repo(
+                repo_root,
+                cfg,
+                since_days=args.since_days,
+                max_items=args.max_items,
+                age_mode=args.age_mode,
+                jobs=jobs,
+                cache=cache,
+                walker=args.walker,
+                profiler=profiler,
+                summary_scope=args.summary_scope,
+                collector=collector,
+            )
+        except ValueError as e:
+            raise SystemExit(f"[error] {e}")
+    if args.record:
+        with profiler.phase("record"):
+            record_scan(result, repo_root, args.trend_db, [item_to_json(it) for it in collector.all_items])
+
     # TODO: This is a test todo
     if args.json:
-        write_json(result, repo_root)
+        with profiler.phase("write_json"):
+            write_json(result, repo_root)
+
+    if args.ndjson:
+        with profiler.phase("write_ndjson"):
+            write_ndjson(result, repo_root)
 
     if args.markdown:
-        render_markdown(result, repo_root)
+        with profiler.phase("render_markdown"):
+            render_report(result, repo_root, cfg, args.details_per_page)
 
     if args.issues:
+        with profiler.phase("issues"):
+            try:
+                from .utils import create_umbrella_issue
+                create_umbrella_issue(result, repo_root, assignee=args.owner)
+            except Exception as e:
+                print(f"[warn] Failed to create GitHub issue: {e}")
+
+    if args.profile:
+        print(f"Wrote {profiler.write(repo_root)}")
+
+
+def render_report(result, repo_root: str, cfg, details_per_page=None):
+    from .renderer import render_markdown
+
+    opts = cfg.data.get("report") or {}
+    if details_per_page is None:
+        details_per_page = opts.get("details_per_page", 0)
+    render_markdown(
+        result, repo_root, details_per_page=int(details_per_page), max_detail_pages=int(opts.get("max_detail_pages", 0))
+    )
+
+
+def record_scan(result, repo_root: str, db_path=None, items=None):
+    # A scan is dated by its commit, so re-recording a commit (or backfilling) lines up
+    from .trends import TrendStore, default_db_path
+
+    sha = result.get("commit_sha")
+    at = (git_commit_time(repo_root, sha) if sha else None) or datetime.utcnow()
+    with TrendStore(db_path or default_db_path(repo_root)) as store:
+        store.record(result, at, items)
+        counts = store.counts()
+    print(f"Recorded scan in {store.path} ({counts['scans']} scans, {counts['open']} open items)")
+
+
+def run_backfill(args):
+    from .backfill import backfill, parse_every
+    from .trends import TrendStore, default_db_path
+
+    try:
+        parse_every(args.every)
+    except ValueError as e:
+        raise SystemExit(f"[error] {e}")
+    repo_root = find_repo_root(args.path)
+    cfg = load_config(repo_root)
+
+    def progress(p):
+        blobs = p["stats"]["blobs_analysed"]
+        print(f"[backfill] {p['time']:%Y-%m-%d} {p['commit'][:10]}: {p['items']} items ({blobs} blobs read so far)")
+
+    with TrendStore(args.trend_db or default_db_path(repo_root)) as store:
+        try:
+            stats = backfill(
+                repo_root,
+                cfg,
+                store,
+                args.from_ref,
+                to_ref=args.to_ref,
+                every=args.every,
+                since_days=args.since_days,
+                max_items=args.max_items,
+                force=args.force,
+                progress=progress,
+            )
+        except ValueError as e:
+            raise SystemExit(f"[error] {e}")
+    print(
+        f"Backfilled {stats['snapshots']} of {stats['commits']} commits into {store.path} "
+        f"({stats['recorded']} already recorded); read {stats['blobs_analysed']} blobs for {stats['files']} files"
+    )
+
+
+def run_trends(args):
+    from .trends import TrendStore, default_db_path
+
+    repo_root = find_repo_root(args.path)
+    path = args.trend_db or default_db_path(repo_root)
+    if not os.path.exists(path):
+        raise SystemExit(f"[error] No trend store at {path}; record scans with `techdebt scan --record`")
+    with TrendStore(path) as store:
+        doc = {
+            "counts": store.counts(),
+            "weekly": store.weekly(args.weeks),
+            "open_longest": store.open_longest(args.limit),
+            "scans": store.scans(args.limit),
+        }
+    if args.json:
+        print(json.dumps(doc, indent=2))
+        return
+    counts = doc["counts"]
+    print(f"{counts['scans']} scans, {counts['open']} open items, {counts['resolved']} resolved")
+    print(f"\n{'week of':<12}{'added':>7}{'resolved':>10}")
+    for row in doc["weekly"]:
+        print(f"{row['week']:<12}{row['added']:>7}{row['resolved']:>10}")
+    print("\nOpen longest:")
+    for it in doc["open_longest"]:
+        meta = it["meta"]
+        where = f"{it['path']}:{meta['line']}" if "line" in meta else it["path"]
+        if "dep" in meta:
+            where += f" ({meta['dep']})"
+        print(f"  {it['first_seen'][:10]}  {it['score']:>6.2f}  {it['kind']:<14} {where}")
+
+
+def run_rescore(args):
+    from .rescore import load_report, rescore_result
+
+    try:
+        report = load_report(args.report)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"[error] Cannot load report: {e}")
+    repo_root = find_repo_root(args.repo or os.path.dirname(os.path.abspath(args.report)))
+    cfg = load_config(repo_root)
+    result = rescore_result(report, cfg, max_items=args.max_items, summary_scope=args.summary_scope)
+    # With no output flag, re-emit both reports
+    emit_all = not (args.json or args.markdown or args.ndjson)
+    if args.json or emit_all:
+        write_json(result, repo_root)
+    if args.ndjson:
+        write_ndjson(result, repo_root)
+    if args.markdown or emit_all:
+        render_report(result, repo_root, cfg, args.details_per_page)
+
+
+def run_sync_issues(args):
+    from .issues import DEFAULT_API_URL, github_token, remote_slug, sync_issues
+    from .rescore import load_report
+
+    try:
+        report = load_report(args.report)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"[error] Cannot load report: {e}")
+    repo_root = find_repo_root(args.repo or os.path.dirname(os.path.abspath(args.report)))
+    slug = args.github_repo or remote_slug(repo_root)
+    if not slug:
+        raise SystemExit("[error] No GitHub origin remote; pass --github-repo OWNER/NAME")
+    api_url = args.api_url or DEFAULT_API_URL
+    # A stand-in server (--api-url) may need no token; GitHub itself does
+    token = github_token()
+    if not token and api_url == DEFAULT_API_URL:
+        raise SystemExit("[error] Set GITHUB_TOKEN (or log in with `gh auth login`) to sync issues")
+    try:
+        stats = sync_issues(
+            report,
+            slug,
+            api_url=api_url,
+            token=token,
+            group=args.group,
+            label=args.label,
+            top=args.top,
+            min_score=args.min_score,
+            assign_owners=args.assign_owners,
+            jobs=max(1, args.jobs),
+            dry_run=args.dry_run,
+        )
+    except (ValueError, RuntimeError) as e:
+        raise SystemExit(f"[error] Issue sync failed: {e}")
+    verb = "Would sync" if args.dry_run else "Synced"
+    print(
+        f"{verb} {slug}: {stats['created']} created, {stats['updated']} updated, {stats['closed']} closed, "
+        f"{stats['unchanged']} unchanged, {stats['kept']} left open below --top/--min-score "
+        f"({stats['api_calls']} API calls)"
+    )
+    for err in stats["failed"]:
+        print(f"[error] {err}")
+    if stats["failed"]:
+        raise SystemExit(1)
+
+
+def run_scan_many(args):
+    from .batch import BatchOptions, read_manifest, scan_many, write_summary
+
+    repos = list(args.paths)
+    if args.manifest:
         try:
-            from .utils import create_umbrella_issue
-            create_umbrella_issue(result, repo_root, assignee=args.owner)
-        except Exception as e:
-            print(f"[warn] Failed to create GitHub issue: {e}")
+            repos.extend(read_manifest(args.manifest))
+        except OSError as e:
+            raise SystemExit(f"[error] Cannot read manifest: {e}")
+    if not repos:
+        raise SystemExit("[error] No repositories given (pass paths or --manifest)")
+    opts = BatchOptions(
+        since_days=args.since_days,
+        max_items=args.max_items,
+        age_mode=args.age_mode,
+        max_file_bytes=args.max_file_bytes,
+        cache=args.cache,
+        walker=args.walker,
+        summary_scope=args.summary_scope,
+    )
+
+    def emit(result, out, cfg):
+        if args.json:
+            write_json(result, out)
+        if args.ndjson:
+            write_ndjson(result, out)
+        if args.markdown:
+            render_report(result, out, cfg)
+
+    def progress(entry):
+        if entry["status"] == "ok":
+            print(f"[ok] {entry['repo']}: {entry['summary']['count']} items in {entry['seconds']}s")
+        else:
+            print(f"[error] {entry['repo']}: {entry['error']}")
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    doc = scan_many(
+        repos,
+        opts,
+        emit,
+        jobs=jobs,
+        parallel=args.parallel,
+        per_repo_jobs=args.per_repo_jobs,
+        out_dir=args.out_dir,
+        progress=progress,
+    )
+    print(f"Wrote {write_summary(doc, args.out_dir or os.getcwd())}")
+    totals = doc["summary"]
+    print(f"{totals['repos']} repos, {totals['failed']} failed, {totals['count']} items")
+    if totals["failed"]:
+        raise SystemExit(1)
+
+
+def run_watch(args):
+    from .watch import DEFAULT_INTERVAL, DEFAULT_PORT, LiveIndex, serve, watch
+
+    repo_root = find_repo_root(args.path)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    try:
+        live = LiveIndex(
+            repo_root,
+            since_days=args.since_days,
+            max_items=args.max_items,
+            age_mode=args.age_mode,
+            summary_scope=args.summary_scope,
+            jobs=jobs,
+            skip_outputs=args.json or args.markdown,
+        )
+    except ValueError as e:
+        raise SystemExit(f"[error] {e}")
+
+    def on_update(live):
+        st = live.status()
+        last = st["last_update"]
+        print(f"[watch] v{st['version']}: {st['items']} items ({last['files_analyzed']} files, {last['seconds']}s)")
+        if args.json:
+            write_json(live.snapshot.result, repo_root)
+        if args.markdown:
+            render_report(live.snapshot.result, repo_root, live.cfg)
+
+    on_update(live)
+    server = serve(live, args.host, DEFAULT_PORT if args.port is None else args.port)
+    print(f"Serving {repo_root} on http://{server.server_address[0]}:{server.server_address[1]}/result")
+    try:
+        interval = DEFAULT_INTERVAL if args.interval is None else args.interval
+        watch(live, interval=interval, events=not args.poll, on_update=on_update)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,98 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Dict, Optional, Set
+from .utils import run, run_lines
+
+AGE_MODES = ("file", "line")
+
+
+# Answers "when was this last touched" without one git process per lookup.
+# File mode resolves every path from a single streaming `git log --name-only` pass.
+# Line mode runs `git blame --incremental` once per file and answers per line,
+# falling back to the file time for lines blame does not cover.
+class AgeEngine:
+    def __init__(self, repo_root: str, mode: str = "file", rev: Optional[str] = None):
+        if mode not in AGE_MODES:
+            raise ValueError(f"unknown age mode: {mode}")
+        self.repo_root = repo_root
+        self.mode = mode
+        self.rev = rev  # answer as of this commit instead of the worktree/HEAD
+        self._files: Optional[Dict[str, int]] = None
+        self._blame: Dict[str, Dict[int, int]] = {}
+
+    def file_times(self) -> Dict[str, int]:
+        if self._files is None:
+            self._files = self._load_file_times()
+        return self._files
+
+    def _load_file_times(self) -> Dict[str, int]:
+        # Newest commits come first, so the first time a path shows up is its last change.
+        # Stop as soon as every tracked path has been seen instead of walking all history.
+        if self.rev:
+            listing = ["git", "ls-tree", "-r", "-z", "--name-only", self.rev]
+        else:
+            listing = ["git", "ls-files", "-z"]
+        pending: Set[str] = set(run(listing, cwd=self.repo_root).split("\0"))
+        pending.discard("")
+        times: Dict[str, int] = {}
+        ts = None
+        cmd = ["git", "-c", "core.quotePath=false", "log", "--name-only", "--no-renames", "--format=@%ct"]
+        if self.rev:
+            cmd.append(self.rev)
+        lines = run_lines(cmd, cwd=self.repo_root)
+        for line in lines:
+            if line.startswith("@") and line[1:].isdigit():
+                ts = int(line[1:])
+            elif line and ts is not None and line not in times:
+                times[line] = ts
+                pending.discard(line)
+                if not pending:
+                    break
+        lines.close()
+        return times
+
+    def _load_blame(self, rel_path: str) -> Dict[int, int]:
+        cmd = ["git", "blame", "--incremental"] + ([self.rev] if self.rev else []) + ["--", rel_path]
+        commit_times: Dict[str, int] = {}
+        by_line: Dict[int, int] = {}
+        block = None
+        for line in run_lines(cmd, cwd=self.repo_root):
+            parts = line.split(" ")
+            if len(parts) == 4 and len(parts[0]) == 40 and all(p.isdigit() for p in parts[1:]):
+                block = (parts[0], int(parts[2]), int(parts[3]))
+            elif block and line.startswith("committer-time "):
+                commit_times[block[0]] = int(line.split(" ", 1)[1])
+            elif block and line.startswith("filename "):
+                sha, start, count = block
+                ts = commit_times.get(sha)
+                if ts is not None:
+                    for n in range(start, start + count):
+                        by_line[n] = ts
+                block = None
+        return by_line
+
+    @classmethod
+    def from_times(cls, repo_root: str, times: Dict[str, int]) -> "AgeEngine":
+        # File-mode engine over last-change times the caller already has (e.g. backfill)
+        engine = cls(repo_root)
+        engine._files = times
+        return engine
+
+    def forget(self, rel_path: str):
+        # Drop cached blame for a file whose worktree copy changed
+        self._blame.pop(rel_path, None)
+
+    def timestamp(self, rel_path: str, line: Optional[int] = None) -> Optional[int]:
+        if self.mode == "line" and line is not None:
+            if rel_path not in self._blame:
+                self._blame[rel_path] = self._load_blame(rel_path)
+            ts = self._blame[rel_path].get(line)
+            if ts is not None:
+                return ts
+        return self.file_times().get(rel_path)
+
+    def last_modified(self, rel_path: str, line: Optional[int] = None) -> Optional[datetime]:
+        ts = self.timestamp(rel_path, line)
+        if ts is None:
+            return None
+        return datetime.utcfromtimestamp(ts)
@@ -0,0 +1,226 @@
+from __future__ import annotations
+import re
+from itertools import chain
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Any, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from .age import AgeEngine
+from .collector import TopItems
+from .config import Config
+from .fileindex import FileIndex
+from .scanner import (
+    AnalyzeOptions, analyze_blob, build_result, file_items, item_to_json, repo_items, skipped_entries,
+)
+from .scoring import Scorer
+from .trends import TrendStore
+from .utils import GitCatFile, is_text_blob, run, run_lines
+from .walker import IgnoreRules
+
+EVERY = re.compile(r"(\d+)([dw]?)\Z")
+SKIP_MODES = ("160000", "120000")  # submodules and symlinks: nothing to read
+
+
+class Commit(NamedTuple):
+    sha: str
+    time: int
+    changes: Dict[str, int]  # path -> lines added + deleted (0 for binary files)
+
+
+def parse_every(text: str) -> Tuple[int, Optional[timedelta]]:
+    # "N" = every Nth first-parent commit; "Nd" / "Nw" = first commit at least N days/weeks on
+    m = EVERY.match(text.strip())
+    if not m or int(m.group(1)) < 1:
+        raise ValueError(f"--every expects N (commits), Nd (days) or Nw (weeks), got {text!r}")
+    n, unit = int(m.group(1)), m.group(2)
+    if unit == "d":
+        return 0, timedelta(days=n)
+    if unit == "w":
+        return 0, timedelta(weeks=n)
+    return n, None
+
+
+def _log_commits(lines: Iterable[str]) -> Iterator[Commit]:
+    # Parses `git log --numstat --format=@%H %ct`
+    sha, ts, changes = None, 0, {}
+    for line in lines:
+        if line.startswith("@"):
+            if sha is not None:
+                yield Commit(sha, ts, changes)
+            head, _, when = line[1:].partition(" ")
+            sha, ts, changes = head, int(when or 0), {}
+        elif sha is not None and line.count("\t") >= 2:
+            adds, dels, path = line.split("\t", 2)
+            lines_changed = int(adds) + int(dels) if adds.isdigit() and dels.isdigit() else 0
+            changes[path] = changes.get(path, 0) + lines_changed
+    if sha is not None:
+        yield Commit(sha, ts, changes)
+
+
+def _git_log(repo_root: str, *args: str) -> Iterator[Commit]:
+    cmd = ["git", "-c", "core.quotePath=false", "log", "--first-parent", "--no-renames", "--numstat"]
+    return _log_commits(run_lines(cmd + ["--format=@%H %ct", *args], cwd=repo_root))
+
+
+# Churn and last-change times as of the commit the history stream has reached. Seeded once
+# at the start commit, then moved forward by each commit's numstat, so no snapshot runs its
+# own `git log` over the whole history.
+class _History:
+    def __init__(self, repo_root: str, start: Commit, since_days: int):
+        self.window = since_days * 86400
+        self.times: Dict[str, int] = dict(AgeEngine(repo_root, rev=start.sha).file_times())
+        self.churn: Counter = Counter()
+        self._recent: deque = deque()
+        since = datetime.utcfromtimestamp(start.time - self.window).strftime("%Y-%m-%d")
+        for commit in reversed(list(_git_log(repo_root, f"--since={since}", start.sha))):
+            self._add(commit)
+        self._expire(start.time)
+
+    def _add(self, commit: Commit):
+        self._recent.append(commit)
+        self.churn.update(commit.changes)
+
+    def _expire(self, now: int):
+        while self._recent and self._recent[0].time < now - self.window:
+            self.churn.subtract(self._recent.popleft().changes)
+
+    def advance(self, commit: Commit):
+        self._add(commit)
+        self._expire(commit.time)
+        for path in commit.changes:
+            self.times[path] = max(self.times.get(path, 0), commit.time)
+
+    def churn_map(self) -> Dict[str, int]:
+        return {path: n for path, n in self.churn.items() if n > 0}
+
+
+def _parse_ls_tree(out: str) -> Dict[str, Tuple[str, str]]:
+    tree: Dict[str, Tuple[str, str]] = {}
+    for entry in out.split("\0"):
+        info, _, rel = entry.partition("\t")
+        parts = info.split()
+        if len(parts) == 3 and parts[1] == "blob":
+            tree[rel] = (parts[0], parts[2])
+    return tree
+
+
+def _apply_diff_tree(tree: Dict[str, Tuple[str, str]], out: str):
+    # `git diff-tree -r -z` between two snapshots: ":oldmode newmode oldsha newsha status\0path\0"
+    parts = out.split("\0")
+    for info, rel in zip(parts[0::2], parts[1::2]):
+        fields = info.lstrip(":").split()
+        if len(fields) != 5 or not rel:
+            continue
+        if fields[4].startswith("D"):
+            tree.pop(rel, None)
+        else:
+            tree[rel] = (fields[1], fields[3])
+
+
+def _walk_key(rel: str) -> List[str]:
+    return rel.split("/")
+
+
+# Scores a sample of past commits into the trend store without checking anything out.
+# Trees come from one ls-tree and then a diff-tree per snapshot; contents come from one
+# `git cat-file --batch` pipe; a file's analysis is reused for as long as its blob is
+# unchanged, so each snapshot only reads and analyses the blobs that changed since the
+# previous one. Churn and ages roll forward from a single `git log` stream.
+def backfill(
+    repo_root: str, cfg: Config, store: TrendStore, from_ref: str, to_ref: str = "HEAD", every: str = "1",
+    since_days: int = 30, max_items: int = 2000, force: bool = False,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, int]:
+    start_sha = run(["git", "rev-parse", "--verify", "--quiet", f"{from_ref}^{{commit}}"], cwd=repo_root).strip()
+    end_sha = run(["git", "rev-parse", "--verify", "--quiet", f"{to_ref}^{{commit}}"], cwd=repo_root).strip()
+    if not start_sha or not end_sha:
+        raise ValueError(f"Unknown revision: {from_ref if not start_sha else to_ref}")
+    step, spacing = parse_every(every)
+    start_time = run(["git", "show", "-s", "--format=%ct", start_sha], cwd=repo_root).strip()
+    start = Commit(start_sha, int(start_time or 0), {})
+
+    rules = IgnoreRules(repo_root, cfg.data.get("exclude", []))
+    scorer = Scorer(cfg.data.get("weights", {}))
+    opts = AnalyzeOptions.from_config(cfg)
+    history = _History(repo_root, start, since_days)
+    excluded: Dict[str, bool] = {}
+    analysed: Dict[Tuple[str, str], Tuple[int, Optional[Tuple[int, List[tuple]]]]] = {}
+    tree: Dict[str, Tuple[str, str]] = {}
+    stats = {"commits": 0, "snapshots": 0, "recorded": 0, "blobs_analysed": 0, "files": 0}
+    prev: Optional[str] = None
+    last_time: Optional[int] = None
+
+    def analyse(cat: GitCatFile, rel: str, sha: str) -> Tuple[int, Optional[Tuple[int, List[tuple]]]]:
+        # Over-limit blobs are reported as skipped without reading them, even binary ones;
+        # that only affects the `skipped` list, never the items.
+        size, data = cat.read_sized(sha, opts.max_file_bytes)
+        stats["blobs_analysed"] += 1
+        if data is None:
+            return size, ((0, [("skipped", size)]) if size else None)
+        if not is_text_blob(rel, data):
+            return size, None
+        return size, analyze_blob(rel, data, opts)
+
+    def snapshot(cat: GitCatFile, commit: Commit):
+        nonlocal prev
+        if prev is None:
+            tree.update(_parse_ls_tree(run(["git", "ls-tree", "-r", "-z", commit.sha], cwd=repo_root, timeout=300)))
+        else:
+            diff = run(["git", "diff-tree", "-r", "-z", "--no-renames", prev, commit.sha], cwd=repo_root, timeout=300)
+            _apply_diff_tree(tree, diff)
+        prev = commit.sha
+        if not force and store.has_scan(commit.sha):
+            stats["recorded"] += 1
+            return
+
+        ages = AgeEngine.from_times(repo_root, history.times)
+        churn_map = history.churn_map()
+        now = datetime.utcfromtimestamp(commit.time)
+        items = TopItems(max_items, keep_all=True)
+        index = FileIndex()
+        skipped: List[Dict[str, Any]] = []
+        live: Dict[Tuple[str, str], Tuple[int, Optional[Tuple[int, List[tuple]]]]] = {}
+        for rel in sorted(tree, key=_walk_key):
+            mode, sha = tree[rel]
+            if mode in SKIP_MODES:
+                continue
+            if rel not in excluded:
+                excluded[rel] = bool(rules.exclude_spec.match_file(rel))
+            if excluded[rel]:
+                continue
+            key = (rel, sha)
+            hit = analysed.get(key)
+            if hit is None:
+                hit = analyse(cat, rel, sha)
+            live[key] = hit
+            size, res = hit
+            index.add(rel, size, res[1] if res is not None else None)
+            if res is None:
+                continue
+            skipped.extend(skipped_entries(rel, res[1]))
+            items.extend(file_items(rel, res[0], res[1], scorer, churn_map, ages, now))
+        # Only blobs still in the tree are worth keeping
+        analysed.clear()
+        analysed.update(live)
+        items.extend(repo_items(index, cfg, scorer))
+        result = build_result(repo_root, items, max_items, skipped=skipped, commit_sha=commit.sha)
+        store.record(result, now, [item_to_json(it) for it in items.all_items])
+        stats["snapshots"] += 1
+        stats["files"] += len(live)
+        if progress is not None:
+            progress({"commit": commit.sha, "time": now, "items": result["summary"]["count"], "stats": dict(stats)})
+
+    with GitCatFile(repo_root) as cat:
+        commits = _git_log(repo_root, "--reverse", f"{start_sha}..{end_sha}")
+        for i, commit in enumerate(chain([start], commits)):
+            if i:
+                history.advance(commit)
+            stats["commits"] += 1
+            due = i == 0 or commit.sha == end_sha
+            if step:
+                due = due or i % step == 0
+            elif last_time is not None:
+                due = due or commit.time >= last_time + spacing.total_seconds()
+            if due:
+                snapshot(cat, commit)
+                last_time = commit.time
+    return stats
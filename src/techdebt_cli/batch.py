@@ -0,0 +1,160 @@
+from __future__ import annotations
+import os, json, time, heapq, multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Dict, Any, List, Optional
+from .cache import ScanCache
+from .config import load_config
+from .scanner import scan_repo
+from .utils import find_repo_root
+
+SUMMARY_FILE = "techdebt-summary.json"
+AGGREGATE_TOP_N = 20
+
+
+@dataclass(frozen=True)
+class BatchOptions:
+    # The `scan` options that apply to every repo in the batch
+    since_days: int = 30
+    max_items: int = 2000
+    age_mode: str = "file"
+    max_file_bytes: Optional[int] = None
+    cache: bool = False
+    walker: str = "scandir"
+    summary_scope: str = "kept"
+
+
+def read_manifest(path: str) -> List[str]:
+    # One repo path per line; blank lines and `#` comments are skipped, relative paths
+    # are relative to the manifest
+    base = os.path.dirname(os.path.abspath(path))
+    repos = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                repos.append(os.path.join(base, os.path.expanduser(line)))
+    return repos
+
+
+def _out_dirs(roots: List[str], out_dir: Optional[str]) -> List[str]:
+    # Reports go into each repo, or into OUT_DIR/<repo name> (name-2, name-3, ... on clashes)
+    if not out_dir:
+        return list(roots)
+    dirs, seen = [], set()
+    for root in roots:
+        name = os.path.basename(root.rstrip(os.sep)) or "repo"
+        candidate, n = name, 1
+        while candidate in seen:
+            n += 1
+            candidate = f"{name}-{n}"
+        seen.add(candidate)
+        dirs.append(os.path.join(out_dir, candidate))
+    return dirs
+
+
+def _pool_context():
+    # Repo scans run on threads; forking a threaded process can copy held locks into the
+    # child, so workers come from a forkserver (or spawn) instead.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def scan_one(
+    repo_root: str, out: str, opts: BatchOptions, per_repo_jobs: int, pool: Optional[Executor],
+    emit: Callable[[Dict[str, Any], str, Any], None],
+) -> Dict[str, Any]:
+    start = time.perf_counter()
+    entry: Dict[str, Any] = {"repo": repo_root, "status": "ok"}
+    try:
+        if not os.path.isdir(repo_root):
+            raise FileNotFoundError(f"not a directory: {repo_root}")
+        cfg = load_config(repo_root)
+        if opts.max_file_bytes is not None:
+            cfg.data["limits"] = dict(cfg.data.get("limits") or {}, max_file_bytes=opts.max_file_bytes)
+        cache = ScanCache(repo_root, cfg) if opts.cache else None
+        result = scan_repo(
+            repo_root,
+            cfg,
+            since_days=opts.since_days,
+            max_items=opts.max_items,
+            age_mode=opts.age_mode,
+            jobs=per_repo_jobs if pool is not None else 1,
+            cache=cache,
+            walker=opts.walker,
+            summary_scope=opts.summary_scope,
+            pool=pool,
+        )
+        os.makedirs(out, exist_ok=True)
+        emit(result, out, cfg)
+        entry["out"] = out
+        entry["commit_sha"] = result.get("commit_sha")
+        entry["summary"] = result["summary"]
+        # Only each repo's own top N can make the cross-repo top N
+        entry["top"] = [dict(it, repo=repo_root) for it in result["items"][:AGGREGATE_TOP_N]]
+    except Exception as e:
+        entry["status"] = "error"
+        entry["error"] = f"{type(e).__name__}: {e}"
+    entry["seconds"] = round(time.perf_counter() - start, 3)
+    return entry
+
+
+def aggregate(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    ok = [e for e in entries if e["status"] == "ok"]
+    count = sum(e["summary"]["count"] for e in ok)
+    by_kind: Dict[str, int] = {}
+    for e in ok:
+        for kind, n in e["summary"]["by_kind"].items():
+            by_kind[kind] = by_kind.get(kind, 0) + n
+    score_sum = sum(e["summary"]["avg_score"] * e["summary"]["count"] for e in ok)
+    top = heapq.nlargest(AGGREGATE_TOP_N, (it for e in ok for it in e.pop("top")), key=lambda it: it["score"])
+    return {
+        "summary": {
+            "repos": len(entries),
+            "failed": len(entries) - len(ok),
+            "count": count,
+            "by_kind": dict(sorted(by_kind.items(), key=lambda kv: -kv[1])),
+            "avg_score": round(score_sum / count, 2) if count else 0.0,
+        },
+        "repos": entries,
+        "top": top,
+    }
+
+
+# Scans many repos in one process: config, templates and the worker pool are set up once.
+# Up to `parallel` repos are scanned at a time on threads, all feeding one shared process
+# pool; each keeps at most `per_repo_jobs` chunks in it, so a huge or slow repo holds a few
+# workers while the rest of the batch keeps moving. A repo that fails is reported, not fatal.
+def scan_many(
+    repos: List[str], opts: BatchOptions, emit: Callable[[Dict[str, Any], str, Any], None], jobs: int = 1,
+    parallel: int = 0, per_repo_jobs: int = 2, out_dir: Optional[str] = None,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    roots = [find_repo_root(p) for p in repos]
+    outs = _out_dirs(roots, out_dir)
+    parallel = parallel if parallel > 0 else max(1, jobs)
+    pool = ProcessPoolExecutor(max_workers=jobs, mp_context=_pool_context()) if jobs > 1 else None
+    entries: List[Optional[Dict[str, Any]]] = [None] * len(roots)
+    try:
+        with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="techdebt-repo") as threads:
+            futures = {
+                threads.submit(scan_one, root, out, opts, per_repo_jobs, pool, emit): i
+                for i, (root, out) in enumerate(zip(roots, outs))
+            }
+            for fut in as_completed(futures):
+                entry = fut.result()
+                entries[futures[fut]] = entry
+                if progress is not None:
+                    progress(entry)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return aggregate([e for e in entries if e is not None])
+
+
+def write_summary(doc: Dict[str, Any], out_dir: str) -> str:
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, SUMMARY_FILE)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2)
+    return path
@@ -0,0 +1,106 @@
+from __future__ import annotations
+import os, json, hashlib
+from typing import Dict, Any, List, Optional, Tuple
+from .utils import run
+from .config import Config
+from .walker import FileEntry
+
+# Bump whenever analyze_file() records change shape or meaning.
+CACHE_VERSION = 8
+
+_MISS = object()
+
+
+def cache_dir_for(repo_root: str) -> str:
+    git_dir = run(["git", "rev-parse", "--git-dir"], cwd=repo_root).strip()
+    if git_dir:
+        return os.path.join(repo_root, git_dir, "techdebt-cache")
+    return os.path.join(repo_root, ".techdebt-cache")
+
+
+def config_fingerprint(cfg: Config) -> str:
+    # Anything that can change which files are scanned or what is found in them.
+    relevant = {
+        "version": CACHE_VERSION,
+        "weights": cfg.data.get("weights"),
+        "markers": cfg.data.get("markers"),
+        "exclude": cfg.data.get("exclude"),
+        "limits": cfg.data.get("limits"),
+        "complexity": cfg.data.get("complexity"),
+        "dependencies": cfg.data.get("dependencies"),
+    }
+    blob = json.dumps(relevant, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(blob).hexdigest()
+
+
+def git_blob_shas(repo_root: str) -> Dict[str, str]:
+    # Index blob SHAs for tracked files whose worktree copy matches the index.
+    shas: Dict[str, str] = {}
+    for entry in run(["git", "ls-files", "-s", "-z"], cwd=repo_root).split("\0"):
+        if "\t" not in entry:
+            continue
+        info, path = entry.split("\t", 1)
+        parts = info.split()
+        if len(parts) == 3 and parts[2] == "0":
+            shas[path] = parts[1]
+    for path in run(["git", "diff", "--name-only", "-z"], cwd=repo_root).split("\0"):
+        shas.pop(path, None)
+    return shas
+
+
+# On-disk store of analyze_file() results, keyed per path by the git blob SHA when the
+# file is clean and by (size, mtime) otherwise. The whole store is dropped when the
+# config fingerprint or CACHE_VERSION changes.
+class ScanCache:
+    def __init__(self, repo_root: str, cfg: Config, cache_dir: Optional[str] = None):
+        self.repo_root = repo_root
+        self.path = os.path.join(cache_dir or cache_dir_for(repo_root), "scan.json")
+        self.fingerprint = config_fingerprint(cfg)
+        self.hits = 0
+        self.misses = 0
+        self._old: Dict[str, List[Any]] = {}
+        self._new: Dict[str, List[Any]] = {}
+        self._blobs: Optional[Dict[str, str]] = None
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            return
+        if data.get("fingerprint") == self.fingerprint:
+            self._old = data.get("files") or {}
+
+    def key_for(self, entry: FileEntry) -> str:
+        if self._blobs is None:
+            self._blobs = git_blob_shas(self.repo_root)
+        sha = self._blobs.get(entry.rel)
+        if sha:
+            return f"blob:{sha}"
+        return f"stat:{entry.size}:{entry.mtime_ns}"
+
+    def get(self, rel: str, key: Optional[str]) -> Any:
+        entry = self._old.get(rel)
+        if key is None or not entry or entry[0] != key:
+            self.misses += 1
+            return _MISS
+        self.hits += 1
+        self._new[rel] = entry
+        return entry[1]
+
+    def put(self, rel: str, key: Optional[str], res: Optional[Tuple[int, List[tuple]]]):
+        if key is not None:
+            self._new[rel] = [key, res]
+
+    def save(self):
+        # Only paths seen in this scan are kept, so deleted files age out naturally.
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": self.fingerprint, "files": self._new}, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+
+def is_miss(value: Any) -> bool:
+    return value is _MISS
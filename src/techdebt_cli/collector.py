@@ -0,0 +1,57 @@
+from __future__ import annotations
+import heapq
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from .signals import DebtItem
+
+SUMMARY_SCOPES = ("kept", "all")
+
+
+# Keeps only the `max_items` highest-scoring items while counting every item offered.
+# The min-heap is keyed on (score, -arrival), so it keeps exactly what a stable sort by
+# descending score followed by [:max_items] would: on equal scores, earlier items win.
+# With keep_all, every item offered is also kept in `all_items` (arrival order), for the
+# trend store, which must see items under the cut too.
+class TopItems:
+    def __init__(self, max_items: int, items: Iterable[DebtItem] = (), keep_all: bool = False):
+        self.max_items = max(0, max_items)
+        self.total = 0
+        self.score_sum = 0.0
+        self.by_kind: Dict[str, int] = {}
+        self._heap: List[Tuple[float, int, DebtItem]] = []
+        self.all_items: Optional[List[DebtItem]] = [] if keep_all else None
+        self.extend(items)
+
+    def add(self, it: DebtItem):
+        if self.all_items is not None:
+            self.all_items.append(it)
+        seq = self.total
+        self.total += 1
+        self.score_sum += it.score
+        self.by_kind[it.kind] = self.by_kind.get(it.kind, 0) + 1
+        if len(self._heap) < self.max_items:
+            heapq.heappush(self._heap, (it.score, -seq, it))
+        elif self._heap and it.score > self._heap[0][0]:
+            # Equal scores never displace: the newcomer has the latest arrival
+            heapq.heapreplace(self._heap, (it.score, -seq, it))
+
+    def extend(self, items: Iterable[DebtItem]):
+        for it in items:
+            self.add(it)
+
+    def items(self) -> List[DebtItem]:
+        # Highest score first, arrival order within a score
+        return [entry[2] for entry in sorted(self._heap, key=lambda e: (-e[0], -e[1]))]
+
+    def summary(self, scope: str = "kept", kept: Optional[List[DebtItem]] = None) -> Dict[str, Any]:
+        # "kept" describes the reported items only; "all" counts every item found and
+        # adds how many of them were reported.
+        if scope == "all":
+            avg = round(self.score_sum / self.total, 2) if self.total else 0.0
+            return {"count": self.total, "by_kind": dict(self.by_kind), "avg_score": avg, "reported": len(self._heap)}
+        kept = self.items() if kept is None else kept
+        totals: Dict[str, Any] = {"count": len(kept), "by_kind": {}, "avg_score": 0.0}
+        if kept:
+            totals["avg_score"] = round(sum(it.score for it in kept) / len(kept), 2)
+            for it in kept:
+                totals["by_kind"][it.kind] = totals["by_kind"].get(it.kind, 0) + 1
+        return totals
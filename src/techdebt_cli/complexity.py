@@ -0,0 +1,527 @@
+from __future__ import annotations
+import ast, os, re
+from collections import Counter
+from itertools import chain
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+# Languages with per-function analysis: Python through `ast`, the brace languages through
+# the brace tokenizer below. Everything else only gets the file-length check, if any.
+COMPLEXITY_LANG = {
+    ".py": "py",
+    ".js": "js", ".jsx": "js", ".mjs": "js", ".cjs": "js", ".ts": "js", ".tsx": "js",
+    ".java": "java",
+    ".go": "go",
+}
+
+# Source files are parsed only when they arrive as one buffer (under reader.SMALL_FILE_BYTES);
+# bigger ones are almost always generated or vendored and only get the file-length check.
+MAX_PARSE_BYTES = 1 << 20
+
+# (name, line, lines, nesting, cyclomatic, snippet) for one function over a limit
+FunctionRecord = Tuple[str, int, int, int, int, str]
+
+
+class ComplexityLimits(NamedTuple):
+    # The `complexity` config block; a function over any limit becomes an item
+    fn_lines: int = 60
+    nesting: int = 4
+    cyclomatic: int = 10
+    file_lines: int = 600
+
+    @classmethod
+    def from_config(cls, block: Optional[Dict[str, Any]]) -> Optional["ComplexityLimits"]:
+        block = block or {}
+        if not block.get("enabled", True):
+            return None
+        return cls(
+            fn_lines=int(block.get("max_fn_lines", cls._field_defaults["fn_lines"])),
+            nesting=int(block.get("max_nesting", cls._field_defaults["nesting"])),
+            cyclomatic=int(block.get("max_cyclomatic", cls._field_defaults["cyclomatic"])),
+            file_lines=int(block.get("max_file_lines", cls._field_defaults["file_lines"])),
+        )
+
+    def exceeded(self, lines: int, nesting: int, cyclomatic: int) -> bool:
+        return lines > self.fn_lines or nesting > self.nesting or cyclomatic > self.cyclomatic
+
+    def overrun(self, lines: int, nesting: int, cyclomatic: int) -> Tuple[float, List[str]]:
+        # How far past its worst limit a function is (measure / limit), and which limits it is over
+        ratios = {
+            "lines": lines / max(self.fn_lines, 1),
+            "nesting": nesting / max(self.nesting, 1),
+            "cyclomatic": cyclomatic / max(self.cyclomatic, 1),
+        }
+        return round(max(ratios.values()), 2), [k for k, r in ratios.items() if r > 1.0]
+
+
+def complexity_lang(rel: str) -> str:
+    return COMPLEXITY_LANG.get(os.path.splitext(rel)[1].lower(), "")
+
+
+def _line_text(buf: bytes, offset: int) -> str:
+    start = buf.rfind(b"\n", 0, offset) + 1
+    end = buf.find(b"\n", offset)
+    line = buf[start : end if end >= 0 else len(buf)]
+    return line.decode("utf-8", errors="ignore").strip()[:240]
+
+
+# --- Python -------------------------------------------------------------------------------
+
+_PY_BRANCH_NODES = (ast.If, ast.For, ast.AsyncFor, ast.While)
+_PY_BLOCK_NODES = _PY_BRANCH_NODES + (ast.With, ast.AsyncWith, ast.Try, ast.Match) + (
+    (ast.TryStar,) if hasattr(ast, "TryStar") else ()
+)
+_PY_BODIES = ("body", "orelse", "handlers", "finalbody", "cases")
+
+
+class _PyFunctions(ast.NodeVisitor):
+    # McCabe-style: 1 + if/elif, loops, except clauses, match cases, conditional expressions,
+    # comprehension clauses and each extra operand of and/or. Nesting counts compound
+    # statements; an elif stays at its if's level. Nested defs are functions of their own,
+    # named after what encloses them ("Class.method", "outer.inner"); their decorators,
+    # arguments and annotations count for the enclosing def. Nothing counts outside a def.
+    def __init__(self) -> None:
+        self.stats: List[List[Any]] = []  # [qualified name, node, nesting, cyclomatic]
+        self.names: List[str] = []
+        self.fn: Optional[List[Any]] = None
+        self.depth = 0
+
+    # Per node type: the visit_ method (or generic_visit) and the fields that can hold
+    # statements or expressions (not expression contexts or operators; leaves have none)
+    _methods: Dict[type, Any] = {}
+    _fields: Dict[type, Tuple[str, ...]] = {
+        t: () for t in (ast.Name, ast.Constant, ast.alias, ast.Pass, ast.Break, ast.Continue, ast.Global, ast.Nonlocal)
+    }
+
+    def visit(self, node) -> None:
+        t = type(node)
+        method = self._methods.get(t)
+        if method is None:
+            method = self._methods[t] = getattr(type(self), "visit_" + t.__name__, type(self).generic_visit)
+        method(self, node)
+
+    def _visit_all(self, values) -> None:
+        # Outside a def only statements are walked: an expression cannot hold a def
+        for value in values:
+            if isinstance(value, list):
+                self._visit_all(value)
+            elif isinstance(value, ast.AST) and (self.fn is not None or not isinstance(value, ast.expr)):
+                self.visit(value)
+
+    def generic_visit(self, node) -> None:
+        t = type(node)
+        fields = self._fields.get(t)
+        if fields is None:
+            fields = self._fields[t] = tuple(f for f in t._fields if f not in ("ctx", "op", "ops"))
+        self._visit_all([getattr(node, field, None) for field in fields])
+
+    def _count(self, n: int) -> None:
+        if self.fn is not None:
+            self.fn[3] += n
+
+    def visit_FunctionDef(self, node) -> None:
+        self._visit_all([node.decorator_list, node.args, node.returns])
+        self.names.append(node.name)
+        entry = [".".join(self.names), node, 0, 1]
+        self.stats.append(entry)
+        outer = self.fn, self.depth
+        self.fn, self.depth = entry, 0
+        self._visit_all(node.body)
+        self.fn, self.depth = outer
+        self.names.pop()
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node) -> None:
+        self._visit_all([node.decorator_list, node.bases, node.keywords])
+        self.names.append(node.name)
+        self._visit_all(node.body)
+        self.names.pop()
+
+    def _visit_block(self, node) -> None:
+        if self.fn is None:
+            self.generic_visit(node)
+            return
+        if isinstance(node, _PY_BRANCH_NODES):
+            self.fn[3] += 1
+        inner = self.depth + 1
+        self.fn[2] = max(self.fn[2], inner)
+        for field, value in ast.iter_fields(node):
+            if field not in _PY_BODIES:
+                self._visit_all([value])  # test, iter, items, subject: at the statement's own depth
+            elif field == "orelse" and isinstance(node, ast.If) and len(value) == 1 and isinstance(value[0], ast.If):
+                self.visit(value[0])  # elif
+            else:
+                outer, self.depth = self.depth, inner
+                self._visit_all(value)
+                self.depth = outer
+
+    visit_If = visit_For = visit_AsyncFor = visit_While = _visit_block
+    visit_With = visit_AsyncWith = visit_Try = visit_TryStar = visit_Match = _visit_block
+
+    def visit_ExceptHandler(self, node) -> None:
+        self._count(1)
+        self.generic_visit(node)
+
+    visit_match_case = visit_IfExp = visit_ExceptHandler
+
+    def visit_BoolOp(self, node) -> None:
+        self._count(len(node.values) - 1)
+        self.generic_visit(node)
+
+    def visit_comprehension(self, node) -> None:
+        self._count(1 + len(node.ifs))
+        self.generic_visit(node)
+
+
+# Most files have no function near a limit, and ast.parse is most of the cost of measuring
+# one, so the text is checked first. A def's lines run at most to the next statement at or
+# left of its indent, its branches are at most the branch keywords in those lines, and its
+# nesting is at most the number of distinct indents of the lines there. The whole file bounds
+# every def at once; failing that, each def is bounded from a token scan that only skips
+# strings, comments and bracketed or continued lines. The file is parsed only when a bound
+# reaches a limit, and then ast alone decides what is reported.
+# Each match is a run of code that cannot hide a line break (plain text, comments, one-line
+# strings and bracket pairs), then group 1: a bracket, a string (triple-quoted, or continued
+# with a backslash), a backslash continuation, any other byte, or nothing at the very end.
+# Group 1 always matches where the run stops, so no search ever backtracks into the run.
+_PY_TOKENS = re.compile(
+    rb'(?:[^(\[{)\]}#\\"\']+|#[^\n]*|\([^()\[\]{}#\\"\'\n]*\)|\[[^()\[\]{}#\\"\'\n]*\]'
+    rb'|(?!""")"(?:\\[^\n]|[^"\\\n])*"|(?!\'\'\')\'(?:\\[^\n]|[^\'\\\n])*\')*'
+    rb'([(\[{]|[)\]}]|\\\r?\n|"""(?:\\.|[^\\])*?"""|\'\'\'(?:\\.|[^\\])*?\'\'\''
+    rb'|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|.|\Z)',
+    re.S,
+)
+_PY_FIRST_LINE = re.compile(rb"([ \t]*)(?:(?:async[ \t]+)?(def)\b|[^\s#])")
+_PY_LINES = re.compile(rb"\n([ \t]*)(?:(?:async[ \t]+)?(def)\b|[^\s#])")
+_PY_INDENTS = re.compile(rb"\n([ \t]*)[^\s#]")
+_PY_TOP_LEVEL = re.compile(rb"\n[^\s#]")
+_PY_BRANCH_WORDS = re.compile(rb"\b(?:if|elif|for|while|except|case|and|or)\b")
+
+
+def _py_hidden(buf: bytes) -> Optional[List[Tuple[int, int]]]:
+    # (start, end] ranges holding line starts that do not start a statement: inside brackets,
+    # multi-line strings or after a backslash continuation. None if the brackets do not pair.
+    hidden: List[Tuple[int, int]] = []
+    depth, opened = 0, 0
+    for m in _PY_TOKENS.finditer(buf):
+        start, end = m.span(1)
+        if start == end:
+            break
+        c = buf[start]
+        if c in (40, 91, 123):  # ( [ {
+            if depth == 0:
+                opened = start
+            depth += 1
+        elif c in (41, 93, 125):  # ) ] }
+            depth -= 1
+            if depth < 0:
+                return None
+            if depth == 0:
+                hidden.append((opened, end))
+        elif depth == 0 and buf.find(b"\n", start, end) >= 0:
+            hidden.append((start, end))
+    return hidden if depth == 0 else None
+
+
+def _py_top_level_within(buf: bytes, hidden: List[Tuple[int, int]], fn_lines: int) -> bool:
+    # Every def lies inside one top-level statement: none of those may be longer than fn_lines
+    ranges = iter(hidden)
+    skip = next(ranges, None)
+    last = 0
+    for m in _PY_TOP_LEVEL.finditer(buf):
+        off = m.start() + 1
+        while skip is not None and skip[1] < off:
+            skip = next(ranges, None)
+        if skip is not None and skip[0] < off:
+            continue
+        if buf.count(b"\n", last, off) > fn_lines:
+            return False
+        last = off
+    return buf.count(b"\n", last) < fn_lines
+
+
+def _py_may_exceed(buf: bytes, limits: ComplexityLimits) -> bool:
+    if b"\f" in buf or buf.count(b"\r") != buf.count(b"\r\n"):
+        return True  # form feeds and lone CRs change indents and line breaks: leave those to ast
+    first = _PY_FIRST_LINE.match(buf)
+    branches_ok = len(_PY_BRANCH_WORDS.findall(buf)) < limits.cyclomatic
+    indents = set(_PY_INDENTS.findall(buf))
+    indents.add(first.group(1) if first else b"")
+    nesting_ok = len(indents) <= limits.nesting + 1  # one of them is the def's own
+    if branches_ok and nesting_ok and buf.count(b"\n") < limits.fn_lines:
+        return False
+    hidden = _py_hidden(buf)
+    if hidden is None:
+        return True
+    if branches_ok and nesting_ok and _py_top_level_within(buf, hidden, limits.fn_lines):
+        return False
+    ranges = iter(hidden)
+    skip = next(ranges, None)
+    defs: List[List[Any]] = []  # open defs: [indent, line, offset, indents of the statements inside]
+    line, last = 1, 0
+
+    def within(d: List[Any], end_line: int, end: int) -> bool:
+        _, first_line, start, inner = d
+        return (
+            end_line - first_line < limits.fn_lines
+            and (nesting_ok or len(inner) <= limits.nesting)
+            and (branches_ok or len(_PY_BRANCH_WORDS.findall(buf, start, end)) < limits.cyclomatic)
+        )
+
+    for m in chain([first] if first else [], _PY_LINES.finditer(buf)):
+        off = m.start(1)
+        while skip is not None and skip[1] < off:
+            skip = next(ranges, None)
+        if skip is not None and skip[0] < off:
+            continue
+        indent = len(m.group(1))
+        if defs and defs[-1][0] >= indent or m.group(2):
+            line += buf.count(b"\n", last, off)
+            last = off
+        while defs and defs[-1][0] >= indent:
+            if not within(defs.pop(), line - 1, off):
+                return True
+        if not nesting_ok:
+            for d in defs:
+                d[3].add(indent)
+        if m.group(2):
+            defs.append([indent, line, off, set()])
+    line += buf.count(b"\n", last)
+    return not all(within(d, line, len(buf)) for d in defs)
+
+
+def python_functions(buf: bytes, limits: ComplexityLimits) -> List[FunctionRecord]:
+    if not _py_may_exceed(buf, limits):
+        return []
+    try:
+        visitor = _PyFunctions()
+        visitor.visit(ast.parse(buf))
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return []
+    out: List[FunctionRecord] = []
+    text: Optional[List[bytes]] = None
+    for name, node, nesting, cyclomatic in sorted(visitor.stats, key=lambda entry: entry[1].lineno):
+        line = node.lineno
+        lines = (node.end_lineno or line) - line + 1
+        if limits.exceeded(lines, nesting, cyclomatic):
+            text = text if text is not None else buf.split(b"\n")
+            snippet = text[line - 1].decode("utf-8", errors="ignore").strip()[:240] if line <= len(text) else ""
+            out.append((name, line, lines, nesting, cyclomatic, snippet))
+    return out
+
+
+# --- Brace languages ----------------------------------------------------------------------
+
+# One token per match: a brace, a branch keyword or operator, or a whole comment or string
+# literal, which is ignored along with everything in it. Backticks open JS template literals
+# (`${...}` is not looked into) and Go raw strings (no escapes); regex literals are not
+# recognised, but a quote in one only runs to the end of its line.
+_BRACE_SKIPS = (
+    rb'//[^\n]*(?:\n[ \t]*//[^\n]*)*|/\*.*?(?:\*/|\Z)|"""(?:.*?)(?:"""|\Z)|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|'
+)
+_BRACE_TOKENS = rb"[{}]|&&|\|\||(?:if|for|while|case|catch)\b|" + _BRACE_SKIPS
+BRACE_SCAN = re.compile(_BRACE_TOKENS + rb"`(?:\\.|[^`\\])*`", re.S)
+GO_SCAN = re.compile(_BRACE_TOKENS + rb"`[^`]*`", re.S)
+WORD_BYTE = bytes(1 if chr(i).isalnum() or chr(i) in "_$" else 0 for i in range(256))
+CONTROL_WORDS = frozenset([b"if", b"for", b"while", b"switch", b"catch", b"with", b"synchronized", b"select"])
+CONTROL_TAIL = re.compile(rb"\b(?:else|do|try|finally)\Z")
+RETURN_TAIL = re.compile(rb"\s*(?::\s*[\w<>\[\],.|&?\s'\"]+|throws\s+[\w<>\[\],.\s]+)")
+WORD_TAIL = re.compile(rb"(\w+)\s*(?:<[^<>()]*>\s*)?\Z")
+TYPE_TAIL = re.compile(rb"\b(?:new|class|record|interface|enum)\s*\Z")  # `record P(int x) {` is a type
+ARROW_NAME = re.compile(rb"(\w+)\s*[:=]\s*(?:async\s+)?(?:\([^()]*\)|\w+)\s*(?::[^=]*)?=>\Z")
+SWITCH_ARROW = re.compile(rb"\b(?:case|default)\b[^\n]*\Z")
+GO_FUNC = re.compile(rb"\bfunc\b\s*(?:\([^()]*\)\s*)?(?:(\w+)\s*[(\[])?")
+GO_CONTROL = re.compile(rb"\s*(?:else|if|for|switch|select)\b")
+NOT_A_NAME = frozenset([b"function", b"return", b"new", b"typeof", b"await", b"yield", b"in", b"of"])
+HEADER_BYTES = 1024
+TAIL_BYTES = 160
+
+_PLAIN, _CONTROL, _FUNCTION = 0, 1, 2
+
+
+def _open_paren(h: bytes) -> int:
+    # Offset of the "(" matching the ")" that ends `h`, or -1
+    depth = 0
+    for i in range(len(h) - 1, -1, -1):
+        c = h[i]
+        if c == 41:  # )
+            depth += 1
+        elif c == 40:  # (
+            depth -= 1
+            if depth == 0:
+                return i
+    return -1
+
+
+def _classify_c(h: bytes) -> Tuple[int, Optional[bytes], int]:
+    # JS/TS/Java block header (the code since the previous brace) -> (kind, name, name offset).
+    # Only the end of the header is looked at, so the cost does not grow with its length.
+    h = h.rstrip()
+    if h.endswith((b"=>", b"->")):
+        base = max(len(h) - TAIL_BYTES, 0)
+        tail = h[base:]
+        if SWITCH_ARROW.search(tail):
+            return _PLAIN, None, 0
+        m = ARROW_NAME.search(tail)
+        if m:
+            return _FUNCTION, m.group(1), base + m.start(1)
+        return _FUNCTION, None, len(h) - 2
+    close = h.rfind(b")")
+    if 0 <= close < len(h) - 1 and RETURN_TAIL.fullmatch(h, close + 1):
+        h = h[: close + 1]  # drop a TS return type or a Java throws clause
+    if h.endswith(b")"):
+        start = _open_paren(h)
+        if start < 0:
+            return _PLAIN, None, 0
+        base = max(start - TAIL_BYTES, 0)
+        before = h[base:start]
+        m = WORD_TAIL.search(before)
+        if m is None:
+            return _PLAIN, None, 0
+        word = m.group(1)
+        if word in CONTROL_WORDS:
+            return _CONTROL, None, 0
+        if word == b"function":
+            return _FUNCTION, None, base + m.start(1)
+        if word in NOT_A_NAME or TYPE_TAIL.search(before, 0, m.start()):
+            return _PLAIN, None, 0
+        return _FUNCTION, word, base + m.start(1)
+    if CONTROL_TAIL.search(h[-10:]):
+        return _CONTROL, None, 0
+    return _PLAIN, None, 0
+
+
+def _classify_go(h: bytes) -> Tuple[int, Optional[bytes], int]:
+    # Go keeps a block's header on one line (gofmt), `if x := f(); x {` included
+    start = h.rfind(b"\n") + 1
+    line = h[start:]
+    m = GO_FUNC.search(line)
+    if m:
+        if m.group(1):
+            return _FUNCTION, m.group(1), start + m.start(1)
+        return _FUNCTION, None, start + m.start()
+    if GO_CONTROL.match(line):
+        return _CONTROL, None, 0
+    return _PLAIN, None, 0
+
+
+# Bounds for the walk below, as for Python: no function has more branches than the branch
+# tokens in its text or nests deeper than its control keywords, and none is longer than the
+# top-level block it is in, counted from the end of the block before (where its header may
+# start). Blocks are found with the walk's own string and comment skipping.
+BRACE_BRANCHES = frozenset([b"if", b"for", b"while", b"case", b"catch", b"&&", b"||"])
+BRACE_CONTROL = CONTROL_WORDS | {b"else", b"do", b"try", b"finally"}
+BRACE_WORDS = re.compile(
+    rb"\b(?:" + b"|".join(sorted((BRACE_BRANCHES | BRACE_CONTROL) - {b"&&", b"||"})) + rb")\b|&&|\|\|"
+)
+_BRACE_BLOCKS = rb"(?:[^{}/\"'`]+|" + _BRACE_SKIPS + rb"%s|[^{}])*([{}]|\Z)"
+BRACE_BLOCKS = re.compile(_BRACE_BLOCKS % rb"`(?:\\.|[^`\\])*`", re.S)
+GO_BLOCKS = re.compile(_BRACE_BLOCKS % rb"`[^`]*`", re.S)
+
+
+def _brace_words_within(buf: bytes, limits: ComplexityLimits, start: int = 0, end: Optional[int] = None) -> bool:
+    end = len(buf) if end is None else end
+    # Substring counts first: they can only overcount the words, and need no regex pass
+    if (
+        sum(buf.count(w, start, end) for w in BRACE_CONTROL) <= limits.nesting
+        and 1 + sum(buf.count(w, start, end) for w in BRACE_BRANCHES) <= limits.cyclomatic
+    ):
+        return True
+    words = Counter(BRACE_WORDS.findall(buf, start, end))
+    return (
+        sum(words[w] for w in BRACE_CONTROL) <= limits.nesting
+        and 1 + sum(words[w] for w in BRACE_BRANCHES) <= limits.cyclomatic
+    )
+
+
+def _brace_may_exceed(buf: bytes, lang: str, limits: ComplexityLimits) -> bool:
+    words_ok = _brace_words_within(buf, limits)
+    if words_ok and buf.count(b"\n") < limits.fn_lines:
+        return False
+    depth, start = 0, 0  # start: the end of the previous top-level block
+    for m in (GO_BLOCKS if lang == "go" else BRACE_BLOCKS).finditer(buf):
+        pos, end = m.span(1)
+        if pos == end:
+            break
+        if buf[pos] == 123:  # {
+            depth += 1
+            continue
+        depth -= 1
+        if depth < 0:
+            return True
+        if depth == 0:
+            if buf.count(b"\n", start, end) >= limits.fn_lines or not (
+                words_ok or _brace_words_within(buf, limits, start, end)
+            ):
+                return True
+            start = end
+    return depth != 0
+
+
+def brace_functions(buf: bytes, lang: str, limits: ComplexityLimits) -> List[FunctionRecord]:
+    # One pass over the tokens: braces keep a stack of (kind, function index, depth) frames; a
+    # block is a function, a control block (nesting + 1) or plain (object literal, class body,
+    # ...), judged from the code just before its "{". Branch tokens count towards the innermost
+    # function: 1 + if/for/while/case/catch and each && / ||.
+    if not _brace_may_exceed(buf, lang, limits):
+        return []
+    classify = _classify_go if lang == "go" else _classify_c
+    scan = GO_SCAN if lang == "go" else BRACE_SCAN
+    stats: List[List[Any]] = []  # [name, name offset, start line, end line, nesting, cyclomatic]
+    frames: List[Tuple[int, int, int]] = []
+    fn, depth = -1, 0
+    line, cursor, header_start = 1, 0, 0
+    for m in scan.finditer(buf):
+        pos = m.start()
+        c = buf[pos]
+        if c == 123:  # {
+            base = max(header_start, pos - HEADER_BYTES)
+            block, name, off = classify(buf[base:pos])
+            frames.append((block, fn, depth))
+            if block == _FUNCTION:
+                off += base
+                line += buf.count(b"\n", cursor, off)
+                cursor = off
+                label = name.decode("utf-8", errors="ignore") if name else "<anonymous>"
+                stats.append([label, off, line, line, 0, 1])
+                fn, depth = len(stats) - 1, 0
+            elif block == _CONTROL and fn >= 0:
+                depth += 1
+                stats[fn][4] = max(stats[fn][4], depth)
+            header_start = pos + 1
+        elif c == 125:  # }
+            if frames:
+                block, outer_fn, outer_depth = frames.pop()
+                if block == _FUNCTION:
+                    line += buf.count(b"\n", cursor, pos)
+                    cursor = pos
+                    stats[fn][3] = line
+                fn, depth = outer_fn, outer_depth
+            header_start = pos + 1
+        elif fn >= 0 and (c in (38, 124) or (c not in (34, 39, 96, 47) and not (pos and WORD_BYTE[buf[pos - 1]]))):
+            stats[fn][5] += 1
+
+    out: List[FunctionRecord] = []
+    for name, off, start, end, nesting, cyclomatic in stats:
+        lines = end - start + 1
+        if limits.exceeded(lines, nesting, cyclomatic):
+            out.append((name, start, lines, nesting, cyclomatic, _line_text(buf, off)))
+    return out
+
+
+def analyze_complexity(rel: str, buf, loc: int, limits: ComplexityLimits) -> List[tuple]:
+    # ("complexity", *FunctionRecord, overrun, exceeded limits) per function over a limit, and
+    # ("long_file", loc, overrun) when the file's non-blank lines are over `file_lines`. `buf`
+    # is the whole file, or None when it was read in chunks (then only its length is checked).
+    lang = complexity_lang(rel)
+    if not lang:
+        return []
+    records: List[tuple] = []
+    if loc > limits.file_lines:
+        records.append(("long_file", loc, round(loc / max(limits.file_lines, 1), 2)))
+    if isinstance(buf, bytes) and len(buf) <= MAX_PARSE_BYTES:
+        found = python_functions(buf, limits) if lang == "py" else brace_functions(buf, lang, limits)
+        for rec in found:
+            over, exceeds = limits.overrun(rec[2], rec[3], rec[4])
+            records.append(("complexity",) + rec + (over, exceeds))
+    return records
@@ -1,8 +1,10 @@
 from __future__ import annotations
-import os, yaml
+import os, copy
 from dataclasses import dataclass, field
 from typing import Any, Dict
 
+CONFIG_FILE = ".techdebt.yml"
+
 DEFAULT_CONFIG = {
     "weights": {
         "inline_priority": 1.0,
@@ -17,7 +19,7 @@ DEFAULT_CONFIG = {
     "markers": [
         {
             "pattern": r"(TODO|FIXME|HACK|XXX|BUG|OPTIMIZE)",
-            "priority_from": r"\\[(P\\d)\\]",
+            "priority_from": r"\[(P\d)\]",
             "owner_from": r"@([a-z0-9_-]+)",
         }
     ],
@@ -32,27 +34,36 @@ DEFAULT_CONFIG = {
             "package_file": "package.json",
             "lock_files": ["package-lock.json", "pnpm-lock.yaml", "yarn.lock"],
             "allow_loose_ranges": False,
-        }
+        },
+        "python": {
+            "manifest_files": ["pyproject.toml", "requirements*.txt", "requirements/*.txt"],
+            "allow_loose_ranges": False,
+        },
     },
-    "complexity": {"max_fn_lines": 60, "max_file_lines": 600, "max_nesting": 4},
+    "complexity": {"enabled": True, "max_fn_lines": 60, "max_file_lines": 600, "max_nesting": 4, "max_cyclomatic": 10},
+    "limits": {"max_file_bytes": 64 * 1024 * 1024},
+    "report": {"details_per_page": 0, "max_detail_pages": 0},
     "exclude": ["dist/**", "vendor/**", "**/*.min.js"],
 }
 
 
 @dataclass
 class Config:
-    data: Dict[str, Any] = field(default_factory=lambda: DEFAULT_CONFIG.copy())
+    data: Dict[str, Any] = field(default_factory=lambda: copy.deepcopy(DEFAULT_CONFIG))
 
 
 def load_config(repo_root: str) -> Config:
-    path = os.path.join(repo_root, ".techdebt.yml")
-    merged = DEFAULT_CONFIG.copy()
+    path = os.path.join(repo_root, CONFIG_FILE)
+    # A deep copy: merging a repo's sections must not leak into DEFAULT_CONFIG (and the next repo)
+    merged = copy.deepcopy(DEFAULT_CONFIG)
     if os.path.exists(path):
+        import yaml  # only repos that have a config file pay for PyYAML
+
         with open(path, "r", encoding="utf-8") as f:
             try:
                 user = yaml.safe_load(f) or {}
                 for k, v in user.items():
-                    if isinstance(v, dict) and k in merged:
+                    if isinstance(v, dict) and isinstance(merged.get(k), dict):
                         merged[k].update(v)
                     else:
                         merged[k] = v
@@ -0,0 +1,493 @@
+from __future__ import annotations
+import json, os, re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from .utils import glob_to_regex
+
+# Lockfile formats, by file name. `dependencies.node.lock_files` picks which paths are read.
+LOCK_FORMATS = {
+    "package-lock.json": "npm",
+    "npm-shrinkwrap.json": "npm",
+    "pnpm-lock.yaml": "pnpm",
+    "yarn.lock": "yarn",
+}
+PYPROJECT = "pyproject.toml"
+LOCK_DEP_BLOCKS = ("dependencies", "devDependencies", "optionalDependencies")
+
+# Specs that point somewhere other than the registry: never a loose range, never in a lockfile
+NPM_LOCAL_SPEC = re.compile(
+    r"(?:workspace|file|link|portal|patch|git|git\+[a-z]+|https?|github):|[\w.-]+/[\w.-]+(?:#|\Z)"
+)
+# `key: value`, `"key": value` (YAML) or `key "value"` (yarn v1), either side optionally quoted
+LOCK_LINE = re.compile(
+    r"""^( *)((?:"([^"\n]*)"|'([^'\n]*)'|([^\s:'"#][^\s:]*))(?:[ \t]*:)?[ \t]*"""
+    r"""(?:"([^"\n]*)"|'([^'\n]*)'|([^\r\n]*)))""",
+    re.M,
+)
+PEP508 = re.compile(r"\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*(.*)")
+
+
+class DepFiles(NamedTuple):
+    # The `dependencies` config block: which files the dependency passes parse
+    lock_files: Tuple[str, ...] = ("package-lock.json", "pnpm-lock.yaml", "yarn.lock")
+    manifests: Tuple[str, ...] = ("pyproject.toml", "requirements*.txt", "requirements/*.txt")
+
+    @classmethod
+    def from_config(cls, block: Optional[Dict[str, Any]]) -> "DepFiles":
+        block = block or {}
+        node = block.get("node") or {}
+        python = block.get("python") or {}
+        return cls(
+            lock_files=tuple(node.get("lock_files", cls._field_defaults["lock_files"]) or ()),
+            manifests=tuple(python.get("manifest_files", cls._field_defaults["manifests"]) or ()),
+        )
+
+    def kind(self, rel: str) -> Optional[str]:
+        base = os.path.basename(rel)
+        if _globs(self.lock_files).match(rel):
+            return LOCK_FORMATS.get(base)
+        if _globs(self.manifests).match(rel):
+            return "pyproject" if base == PYPROJECT else "requirements"
+        return None
+
+
+@lru_cache(maxsize=16)
+def _globs(patterns: Tuple[str, ...]) -> "re.Pattern[str]":
+    if not patterns:
+        return re.compile(r"(?!)")
+    return re.compile("|".join(f"(?:{glob_to_regex(p).pattern})" for p in patterns))
+
+
+# --- Loose ranges -------------------------------------------------------------------------
+
+def loose_npm_range(spec: Any) -> bool:
+    # Anything but one exact version: ^ ~ > < ranges, ||, hyphen ranges, x/X/* wildcards,
+    # partial versions ("1.2" is 1.2.x) and dist-tags ("latest", "next"). An "x" elsewhere,
+    # e.g. in a prerelease tag, does not make a version loose.
+    s = str(spec).strip()
+    if s.startswith("npm:"):
+        s = s[s.rfind("@") + 1 :] if s.rfind("@") > 4 else ""
+    elif NPM_LOCAL_SPEC.match(s):
+        return False
+    if not s or "||" in s or " - " in s:
+        return True
+    parts = s.split()
+    if len(parts) != 1 or s[0] in "^~<>":
+        return True
+    core = re.split(r"[-+]", s.lstrip("=v").strip(), maxsplit=1)[0]
+    fields = core.split(".")
+    return len(fields) != 3 or not all(f.isdigit() for f in fields)
+
+
+def loose_python_spec(spec: str) -> bool:
+    # Pinned means one `==` without a wildcard, `===`, a direct URL (`@ https://...`) or a bare
+    # version (Poetry's exact form); no specifier at all or any range is loose
+    s = spec.strip()
+    if s.startswith("@"):
+        return False
+    parts = [p.strip() for p in s.split(",") if p.strip()]
+    if len(parts) != 1:
+        return True
+    p = parts[0]
+    if p.startswith("==="):
+        return False
+    if p.startswith("=="):
+        p = p[2:].strip()
+    elif not p[:1].isdigit():
+        return True
+    return "*" in p
+
+
+# --- Dependency graph ---------------------------------------------------------------------
+
+class _Nodes:
+    # Interns name@version nodes while a lockfile is parsed
+    def __init__(self):
+        self.nodes: List[list] = []
+        self.ids: Dict[Tuple[str, str], int] = {}
+
+    def node(self, name: str, version: str) -> int:
+        key = (name, version)
+        idx = self.ids.get(key)
+        if idx is None:
+            idx = self.ids[key] = len(self.nodes)
+            self.nodes.append([name, version, []])
+        return idx
+
+    def edge(self, src: int, dst: Optional[int]):
+        if dst is not None and dst != src and dst not in self.nodes[src][2]:
+            self.nodes[src][2].append(dst)
+
+
+class DepGraph:
+    # A parsed lockfile with name and reverse-edge indexes, built in the parent from the record
+    def __init__(self, rel: str, manager: str, direct: Dict[str, str], nodes: List[list]):
+        self.rel = rel
+        self.manager = manager
+        self.direct = direct
+        self.nodes = nodes
+        self.by_name: Dict[str, List[int]] = {}
+        for i, node in enumerate(nodes):
+            self.by_name.setdefault(node[0], []).append(i)
+        self._dependents: Optional[List[List[int]]] = None
+
+    def has(self, name: str) -> bool:
+        return name in self.by_name or name in self.direct
+
+    def versions(self, name: str) -> List[str]:
+        return sorted({self.nodes[i][1] for i in self.by_name.get(name, ())})
+
+    def resolved(self, name: str) -> Optional[str]:
+        if name in self.direct:
+            return self.direct[name]
+        versions = self.versions(name)
+        return versions[0] if len(versions) == 1 else None
+
+    def dependents(self, name: str, version: str) -> List[str]:
+        # name@version of every package that depends on this one
+        if self._dependents is None:
+            self._dependents = [[] for _ in self.nodes]
+            for i, node in enumerate(self.nodes):
+                for dep in node[2]:
+                    self._dependents[dep].append(i)
+        out = []
+        for i in self.by_name.get(name, ()):
+            if self.nodes[i][1] == version:
+                out.extend(f"{self.nodes[j][0]}@{self.nodes[j][1]}" for j in self._dependents[i])
+        return sorted(out)
+
+
+# --- Parsers ------------------------------------------------------------------------------
+# Fed the same buffers as the other per-file passes, so a lockfile is read once. Line-based
+# formats are parsed buffer by buffer (buffers always end on a line boundary, see
+# reader.iter_buffers); JSON and TOML need the whole document. close() returns the record
+# for FileIndex, or None if the file could not be parsed:
+#   ("dep_lock", manager, direct, nodes)  nodes: [name, version, [indexes of its dependencies]];
+#                                         direct: the root project's dependencies -> resolved version
+#   ("dep_manifest", "python", {normalized name: version specifier})
+# Plain lists and dicts, so records pickle back from workers and round-trip through the JSON
+# scan cache. Only with the cache (--cache) is an unchanged lockfile skipped, by blob SHA;
+# without it every scan parses the lockfile again.
+
+class _LineParser(ABC):
+    # pnpm-lock.yaml and yarn.lock lines as (indent, key, value, line), quotes removed; blank
+    # and comment lines never reach line()
+    def feed(self, buf):
+        line = self.line
+        for indent, text, qk, sk, bk, qv, sv, bv in LOCK_LINE.findall(bytes(buf).decode("utf-8", errors="replace")):
+            line(len(indent), qk or sk or bk, qv or sv or bv, text)
+
+    @abstractmethod
+    def line(self, indent: int, key: str, value: str, text: str):
+        ...
+
+    @abstractmethod
+    def close(self) -> Optional[tuple]:
+        ...
+
+
+class _WholeParser(ABC):
+    def __init__(self):
+        self._parts: List[bytes] = []
+
+    def feed(self, buf):
+        self._parts.append(bytes(buf))
+
+    def close(self) -> Optional[tuple]:
+        return self.parse(b"".join(self._parts))
+
+    @abstractmethod
+    def parse(self, data: bytes) -> Optional[tuple]:
+        ...
+
+
+def _unquote(s: str) -> str:
+    s = s.strip()
+    if len(s) >= 2 and s[0] == s[-1] and s[0] in "'\"":
+        return s[1:-1]
+    return s
+
+
+class _NpmLock(_WholeParser):
+    # package-lock.json / npm-shrinkwrap.json. v2 and v3 list every install location under
+    # `packages`; a dependency resolves to the nearest node_modules/<name> walking up from
+    # the dependent, exactly as Node does. v1 nests `dependencies` the same way.
+    def parse(self, data: bytes) -> Optional[tuple]:
+        try:
+            doc = json.loads(data.decode("utf-8"))
+        except ValueError:
+            return None
+        if not isinstance(doc, dict):
+            return None
+        g = _Nodes()
+        direct: Dict[str, str] = {}
+        packages = doc.get("packages")
+        if isinstance(packages, dict):
+            at: Dict[str, int] = {}
+            links: List[Tuple[str, str]] = []
+            for path, meta in packages.items():
+                if not path or not isinstance(meta, dict):
+                    continue
+                if meta.get("link"):
+                    links.append((path, str(meta.get("resolved", ""))))
+                    continue
+                # Installed under its folder name (an alias, for `npm:` specs); workspaces by package name
+                name = path.rpartition("node_modules/")[2] if "node_modules/" in path else meta.get("name") or path
+                at[path] = g.node(name, str(meta.get("version", "")))
+            # Workspace packages are linked into node_modules; depending on one resolves to it
+            for path, target in links:
+                if target in at:
+                    at[path] = at[target]
+            for path, meta in packages.items():
+                if not isinstance(meta, dict) or meta.get("link"):
+                    continue
+                for block in LOCK_DEP_BLOCKS + ("peerDependencies",):
+                    for name in meta.get(block) or {}:
+                        dst = _npm_resolve(at, path, name)
+                        if not path and dst is not None:
+                            direct[name] = g.nodes[dst][1]
+                        elif path:
+                            g.edge(at[path], dst)
+        elif isinstance(doc.get("dependencies"), dict):
+            _npm_v1(g, doc["dependencies"], [])
+        return ("dep_lock", "npm", direct, g.nodes)
+
+
+def _npm_resolve(at: Dict[str, int], path: str, name: str) -> Optional[int]:
+    base = path
+    while True:
+        found = at.get(f"{base}/node_modules/{name}" if base else f"node_modules/{name}")
+        if found is not None or not base:
+            return found
+        cut = base.rfind("/node_modules/")
+        base = base[:cut] if cut >= 0 else ""
+
+
+def _npm_v1(g: _Nodes, deps: Dict[str, Any], scopes: List[Dict[str, int]]) -> Dict[str, int]:
+    scope = {name: g.node(name, str(meta.get("version", ""))) for name, meta in deps.items() if isinstance(meta, dict)}
+    chain = scopes + [scope]
+    for name, idx in scope.items():
+        meta = deps[name]
+        inner = chain
+        if isinstance(meta.get("dependencies"), dict):
+            inner = chain + [_npm_v1(g, meta["dependencies"], chain)]
+        for req in meta.get("requires") or {}:
+            g.edge(idx, next((s[req] for s in reversed(inner) if req in s), None))
+    return scope
+
+
+def _pnpm_id(key: str) -> Tuple[str, str]:
+    # "/name/1.0.0_peer" (v5), "/name@1.0.0(peer)" (v6) or "name@1.0.0(peer)" (v9)
+    key = key.lstrip("/").split("(", 1)[0]
+    at = key.rfind("@")
+    if at > 0:
+        return key[:at], key[at + 1 :]
+    name, _, version = key.rpartition("/")
+    return name, version.split("_", 1)[0]
+
+
+def _pnpm_version(value: str) -> str:
+    return value.split("(", 1)[0].split("_", 1)[0]
+
+
+class _PnpmLock(_LineParser):
+    # pnpm-lock.yaml, v5 to v9, read line by line rather than through a YAML parser: the
+    # format is fixed two-space block YAML, and only these keys matter.
+    def __init__(self):
+        self.g = _Nodes()
+        self.direct: Dict[str, str] = {}
+        self.edges: List[Tuple[int, str, str]] = []
+        self.section = ""
+        self.importer = ""
+        self.pkg: Optional[int] = None
+        self.block = ""
+        self.dep = ""
+
+    def line(self, indent: int, key: str, value: str, text: str):
+        if indent == 0:
+            self.section, self.importer, self.pkg, self.block, self.dep = key, "", None, "", ""
+            return
+        if self.section in LOCK_DEP_BLOCKS:
+            # Single-project lockfiles (v5/v6) list the root's dependencies at the top level
+            self._direct(indent - 2, key, value)
+        elif self.section == "importers":
+            if indent == 2:
+                self.importer, self.block = key, ""
+            elif indent == 4:
+                self.block = key if key in LOCK_DEP_BLOCKS else ""
+            elif self.block and self.importer == ".":
+                self._direct(indent - 6, key, value)
+        elif self.section in ("packages", "snapshots"):
+            if indent == 2:
+                self.pkg, self.block = self.g.node(*_pnpm_id(key)), ""
+            elif indent == 4:
+                self.block = key if key in LOCK_DEP_BLOCKS else ""
+            elif indent == 6 and self.block and self.pkg is not None:
+                self.edges.append((self.pkg, key, value))
+
+    def _direct(self, depth: int, key: str, value: str):
+        # `name: 1.0.0` (v5) or `name:` followed by `specifier:` and `version:` (v6+)
+        if depth == 0:
+            self.dep = key
+            if value:
+                self.direct[key] = _pnpm_version(value)
+        elif depth == 2 and key == "version" and self.dep:
+            self.direct[self.dep] = _pnpm_version(value)
+
+    def close(self) -> Optional[tuple]:
+        for src, name, value in self.edges:
+            if value.startswith("link:"):
+                continue
+            version = _pnpm_version(value)
+            if version.rfind("@") > 0:  # an alias: `name: real-name@1.0.0`
+                name, version = _pnpm_id(version)
+            self.g.edge(src, self.g.ids.get((name, version)))
+        return ("dep_lock", "pnpm", self.direct, self.g.nodes)
+
+
+def _descriptor_name(spec: str) -> str:
+    at = spec.find("@", 1)
+    return spec[:at] if at > 0 else spec
+
+
+class _YarnLock(_LineParser):
+    # yarn.lock, classic (v1) and Berry. Each entry lists the descriptors ("name@range") it
+    # satisfies; dependencies name a range, resolved through those descriptors at the end.
+    def __init__(self):
+        self.g = _Nodes()
+        self.descriptors: Dict[str, int] = {}
+        self.edges: List[Tuple[int, str, str]] = []
+        self.specs: List[str] = []
+        self.pkg: Optional[int] = None
+        self.root: Optional[int] = None
+        self.block = ""
+
+    def line(self, indent: int, key: str, value: str, text: str):
+        if indent == 0:
+            self.specs = [_unquote(s) for s in _unquote(text.rstrip().rstrip(":")).split(",")]
+            self.pkg, self.block = None, ""
+            if self.specs[0] == "__metadata":
+                self.specs = []
+            return
+        if indent == 2 and self.specs:
+            self.block = key if key in LOCK_DEP_BLOCKS and not value else ""
+            if key == "version":
+                self.pkg = self.g.node(_descriptor_name(self.specs[0]), value)
+                for spec in self.specs:
+                    self.descriptors[spec] = self.pkg
+                    if spec.endswith("@workspace:."):
+                        self.root = self.pkg
+        elif indent == 4 and self.block and self.pkg is not None:
+            self.edges.append((self.pkg, key, value))
+
+    def close(self) -> Optional[tuple]:
+        direct: Dict[str, str] = {}
+        for src, name, rng in self.edges:
+            dst = self.descriptors.get(f"{name}@{rng}")
+            if dst is None:
+                dst = self.descriptors.get(f"{name}@npm:{rng}")
+            self.g.edge(src, dst)
+            if src == self.root and dst is not None:
+                direct[name] = self.g.nodes[dst][1]
+        return ("dep_lock", "yarn", direct, self.g.nodes)
+
+
+def _norm_name(name: str) -> str:
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _pep508(req: str) -> Optional[Tuple[str, str]]:
+    # (normalized name, version specifier) with extras and environment markers dropped
+    m = PEP508.match(req)
+    if m is None:
+        return None
+    spec = m.group(2).split(";", 1)[0].strip()
+    if spec.startswith("(") and spec.endswith(")"):
+        spec = spec[1:-1].strip()
+    return _norm_name(m.group(1)), spec
+
+
+def _toml():
+    try:
+        import tomllib
+    except ImportError:  # Python 3.10
+        try:
+            import tomli as tomllib
+        except ImportError:
+            return None
+    return tomllib
+
+
+class _Pyproject(_WholeParser):
+    # PEP 621 dependencies and optional dependencies, PEP 735 dependency groups and Poetry's tables
+    def parse(self, data: bytes) -> Optional[tuple]:
+        toml = _toml()
+        if toml is None:
+            return None
+        try:
+            doc = toml.loads(data.decode("utf-8"))
+        except ValueError:
+            return None
+        deps: Dict[str, str] = {}
+        project = doc.get("project") or {}
+        reqs = list(project.get("dependencies") or [])
+        for group in list((project.get("optional-dependencies") or {}).values()) + list(
+            (doc.get("dependency-groups") or {}).values()
+        ):
+            if isinstance(group, list):
+                reqs.extend(group)
+        for req in reqs:
+            parsed = _pep508(req) if isinstance(req, str) else None
+            if parsed is not None:
+                deps.setdefault(*parsed)
+        poetry = (doc.get("tool") or {}).get("poetry") or {}
+        tables = [poetry.get("dependencies"), poetry.get("dev-dependencies")]
+        tables.extend(g.get("dependencies") for g in (poetry.get("group") or {}).values() if isinstance(g, dict))
+        for table in tables:
+            for name, spec in (table or {}).items():
+                if name == "python":
+                    continue
+                if isinstance(spec, dict):
+                    spec = spec.get("version") or "@ " + str(spec.get("git") or spec.get("path") or spec.get("url"))
+                if isinstance(spec, str):
+                    deps.setdefault(_norm_name(name), spec)
+        return ("dep_manifest", "python", deps)
+
+
+class _Requirements:
+    # pip requirements files; options (-r, -e, --hash ...) and bare URLs or paths are skipped
+    def __init__(self):
+        self.deps: Dict[str, str] = {}
+        self.pending = ""
+
+    def feed(self, buf):
+        for raw in bytes(buf).decode("utf-8", errors="replace").splitlines():
+            if raw.strip() and not raw.lstrip().startswith("#"):
+                self.line(raw)
+
+    def line(self, text: str):
+        text = self.pending + re.split(r"\s#", text, maxsplit=1)[0].strip()
+        if text.endswith("\\"):
+            self.pending = text[:-1] + " "
+            return
+        self.pending = ""
+        text = text.split(" --", 1)[0].strip()
+        if not text or text.startswith(("-", ".", "/")) or re.match(r"[a-z+]+://", text):
+            return
+        parsed = _pep508(text)
+        if parsed is not None:
+            self.deps.setdefault(*parsed)
+
+    def close(self) -> Optional[tuple]:
+        return ("dep_manifest", "python", self.deps)
+
+
+PARSERS = {
+    "npm": _NpmLock, "pnpm": _PnpmLock, "yarn": _YarnLock, "pyproject": _Pyproject, "requirements": _Requirements,
+}
+
+
+def dependency_parser(rel: str, files: DepFiles):
+    kind = files.kind(rel)
+    return PARSERS[kind]() if kind else None
@@ -0,0 +1,222 @@
+from __future__ import annotations
+import os, stat
+from collections import Counter
+from contextlib import closing
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from .signals import DebtItem, fingerprint
+from .utils import is_text_blob, run, git_churn, glob_to_regex, GitCatFile
+from .walker import FileEntry, IgnoreRules, walk_files
+from .fileindex import FileIndex
+from .profiler import Profiler, NULL_PROFILER
+from .age import AgeEngine
+from .cache import ScanCache, is_miss
+from .matcher import extract_imports, language_for
+from .deps import dependency_parser
+from .scanner import (
+    PACKAGE_JSON, AnalyzeOptions, analyze_blob, iter_analyzed, file_items, parse_manifest, dependency_items,
+    test_gap_items, item_to_json, skipped_entries, build_result,
+)
+from .config import Config
+from .scoring import Scorer
+
+
+def changed_paths(repo_root: str, base: str) -> Dict[str, str]:
+    # path -> status letter (A/M/D/T) between `base` and the working tree. Untracked files that
+    # are not .gitignore'd count as added: a full scan reads them too.
+    out = run(["git", "diff", "--name-status", "--no-renames", "-z", base], cwd=repo_root)
+    parts = out.split("\0")
+    changes: Dict[str, str] = {}
+    for status, path in zip(parts[0::2], parts[1::2]):
+        if status and path:
+            changes[path] = status[0]
+    untracked = run(["git", "ls-files", "--others", "--exclude-standard", "-z"], cwd=repo_root)
+    for path in untracked.split("\0"):
+        if path:
+            changes.setdefault(path, "A")
+    return changes
+
+
+def _read_blob(cat: GitCatFile, base: str, rel: str) -> Optional[bytes]:
+    data = cat.read(f"{base}:{rel}")
+    if data is None or not is_text_blob(rel, data):
+        return None
+    return data
+
+
+def _delta(before: List[DebtItem], after: List[DebtItem]) -> List[DebtItem]:
+    # Items in `after` with no matching fingerprint left in `before` (multiset difference)
+    remaining = Counter(fingerprint(it.path, it.kind, it.meta) for it in before)
+    out = []
+    for it in after:
+        fp = fingerprint(it.path, it.kind, it.meta)
+        if remaining[fp] > 0:
+            remaining[fp] -= 1
+        else:
+            out.append(it)
+    out.sort(key=lambda it: it.score, reverse=True)
+    return out
+
+
+def _imports(records: Optional[List[tuple]]) -> List[str]:
+    for rec in records or ():
+        if rec[0] == "imports":
+            return rec[1]
+    return []
+
+
+def _head_entry(repo_root: str, rel: str) -> Optional[FileEntry]:
+    abspath = os.path.join(repo_root, rel)
+    try:
+        st = os.stat(abspath)
+    except OSError:
+        return None
+    return FileEntry(rel, abspath, st.st_size, st.st_mtime_ns) if stat.S_ISREG(st.st_mode) else None
+
+
+def _unchanged_inputs(entry: FileEntry, opts: AnalyzeOptions, cache: Optional[ScanCache] = None) -> List[tuple]:
+    # imports/manifest/lockfile records for a file outside the diff, which nothing else reads
+    is_js = language_for(entry.rel) == "js"
+    deps = dependency_parser(entry.rel, opts.deps)
+    if entry.rel != PACKAGE_JSON and not is_js and deps is None:
+        return []
+    if cache is not None:
+        hit = cache.get(entry.rel, cache.key_for(entry))
+        if not is_miss(hit):
+            return hit[1] if hit else []
+    try:
+        with open(entry.abspath, "rb") as f:
+            data = f.read()
+    except OSError:
+        return []
+    if is_js:
+        return [("imports", sorted(extract_imports(data)))]
+    if deps is not None:
+        deps.feed(data)
+        record = deps.close()
+        return [record] if record is not None else []
+    return [("manifest", parse_manifest(data))]
+
+
+def scan_diff(
+    repo_root: str, cfg: Config, since_ref: str, since_days: int = 30, max_items: int = 2000,
+    age_mode: str = "file", jobs: int = 1, cache: Optional[ScanCache] = None, walker: str = "scandir",
+    profiler: Profiler = NULL_PROFILER, summary_scope: str = "kept",
+) -> Dict[str, Any]:
+    if not run(["git", "rev-parse", "--verify", "--quiet", f"{since_ref}^{{commit}}"], cwd=repo_root).strip():
+        raise ValueError(f"Unknown revision: {since_ref}")
+    base = run(["git", "merge-base", since_ref, "HEAD"], cwd=repo_root).strip()
+    if not base:
+        raise ValueError(f"Cannot find a merge base between {since_ref} and HEAD")
+
+    rules = IgnoreRules(repo_root, cfg.data.get("exclude", []))
+    scorer = Scorer(cfg.data.get("weights", {}))
+
+    with profiler.phase("changed_paths"):
+        changes = changed_paths(repo_root, base)
+        scoped = sorted(p for p in changes if not rules.file_ignored(p))
+    profiler.count("files_changed", len(scoped))
+
+    with profiler.phase("git_churn"):
+        churn_map = git_churn(repo_root, since_days)
+    ages = AgeEngine(repo_root, mode=age_mode)
+    now = datetime.utcnow()
+    opts = AnalyzeOptions.from_config(cfg)
+
+    head_items: List[DebtItem] = []
+    base_items: List[DebtItem] = []
+
+    # Per-file passes, only on changed paths: working tree for head, git objects for base.
+    # The scan cache is only read here: save() keeps just the paths a scan saw, and a diff scan
+    # sees a handful, so saving would evict everything else.
+    head_entries = [_head_entry(repo_root, p) for p in scoped if changes[p] != "D"]
+    head_entries = [e for e in head_entries if e is not None]
+    results: List[Optional[Tuple[int, List[tuple]]]] = [None] * len(head_entries)
+    todo = list(range(len(head_entries)))
+    if cache is not None:
+        with profiler.phase("cache_lookup"):
+            hits = [cache.get(e.rel, cache.key_for(e)) for e in head_entries]
+            todo = [i for i, hit in enumerate(hits) if is_miss(hit)]
+            results = [None if is_miss(hit) else hit for hit in hits]
+    analyzed = iter_analyzed(
+        [(head_entries[i].abspath, head_entries[i].rel) for i in todo], workers=jobs, opts=opts, profiler=profiler,
+    )
+    with profiler.phase("analyze_head"), closing(analyzed):
+        for i, res in zip(todo, analyzed):
+            results[i] = res
+    skipped: List[Dict[str, Any]] = []
+    head_records: Dict[str, List[tuple]] = {}
+    for entry, res in zip(head_entries, results):
+        if res is not None:
+            head_records[entry.rel] = res[1]
+            skipped.extend(skipped_entries(entry.rel, res[1]))
+            profiler.count("files_scanned")
+            head_items.extend(file_items(entry.rel, res[0], res[1], scorer, churn_map, ages, now))
+
+    base_records: Dict[str, List[tuple]] = {}
+    with profiler.phase("analyze_base"):
+        with GitCatFile(repo_root) as cat:
+            for rel in scoped:
+                if changes[rel] == "A":
+                    continue
+                data = _read_blob(cat, base, rel)
+                if data is None:
+                    continue
+                if len(data) > opts.max_file_bytes:
+                    loc, records = 0, [("skipped", len(data))]
+                else:
+                    loc, records = analyze_blob(rel, data, opts)
+                base_records[rel] = records
+                base_items.extend(file_items(rel, loc, records, scorer, churn_map, ages, now))
+
+    with profiler.phase("repo_passes"):
+        # Dependency risk: only when package.json, a lockfile or Python manifest, or the imports of
+        # a changed JS/TS file differ between base and head (both sides were analyzed above). Files
+        # outside the diff are the same on both sides.
+        dep_inputs = PACKAGE_JSON in changes or any(opts.deps.kind(p) for p in changes)
+        imports_changed = any(
+            _imports(head_records.get(p)) != _imports(base_records.get(p)) for p in scoped if language_for(p) == "js"
+        )
+        if dep_inputs or imports_changed:
+            head_index, base_index = FileIndex(), FileIndex()
+            for entry in walk_files(repo_root, backend=walker, rules=rules):
+                if entry.rel in changes:
+                    head_index.add(entry.rel, entry.size, head_records.get(entry.rel))
+                    continue
+                records = _unchanged_inputs(entry, opts, cache)
+                head_index.add(entry.rel, entry.size, records)
+                base_index.add(entry.rel, entry.size, records)
+            for rel, records in base_records.items():
+                base_index.add(rel, 0, records)
+            head_items.extend(dependency_items(head_index, cfg, scorer))
+            base_items.extend(dependency_items(base_index, cfg, scorer))
+
+        # Test gaps depend only on which files exist, so only adds/deletes can change them. Both
+        # sides see the files a full scan would: config excludes and .gitignore apply, and the
+        # head side includes untracked files.
+        conv = (cfg.data.get("tests") or {}).get("convention") or {}
+        src_res = [glob_to_regex(g) for g in conv.get("src_globs", [])]
+        test_res = [glob_to_regex(g) for g in conv.get("test_globs", [])]
+        moved = [p for p in scoped if changes[p] in ("A", "D")]
+        if any(r.match(p) for p in moved for r in src_res + test_res):
+            head_paths = [entry.rel for entry in walk_files(repo_root, backend="git", rules=rules)]
+            base_out = run(["git", "ls-tree", "-r", "--name-only", "-z", base], cwd=repo_root)
+            base_paths = [p for p in base_out.split("\0") if p and not rules.file_ignored(p)]
+            for paths, out in ((head_paths, head_items), (base_paths, base_items)):
+                test_set = {p for p in paths if any(r.match(p) for r in test_res)}
+                src_paths = [p for r in src_res for p in paths if r.match(p)]
+                out.extend(test_gap_items(src_paths, test_set, scorer))
+
+    with profiler.phase("build_result"):
+        added = _delta(base_items, head_items)
+        removed = _delta(head_items, base_items)
+        result = build_result(repo_root, head_items, max_items, skipped=skipped, summary_scope=summary_scope)
+    profiler.count("files_skipped", len(skipped))
+    result["delta"] = {
+        "base_ref": since_ref,
+        "base_sha": base,
+        "changed_files": len(scoped),
+        "added": [item_to_json(it) for it in added],
+        "removed": [item_to_json(it) for it in removed],
+    }
+    return result
@@ -0,0 +1,52 @@
+from __future__ import annotations
+import os
+from typing import Dict, Any, List, NamedTuple, Optional, Set, Tuple
+from .utils import glob_to_regex
+
+
+class IndexedFile(NamedTuple):
+    rel: str
+    ext: str
+    size: int
+    imports: Tuple[str, ...]  # packages imported by a JS/TS file, empty otherwise
+
+
+# What the repo-level analyzers need, filled in from the single walk and the one read
+# of each file. The dependency and test-gap passes query this instead of globbing or
+# re-reading the tree, so no file is enumerated or opened a second time.
+class FileIndex:
+    def __init__(self):
+        self.files: List[IndexedFile] = []
+        self.manifest: Optional[Dict[str, Any]] = None
+        self.locks: Dict[str, tuple] = {}  # lockfile -> (manager, direct, nodes), see deps.py
+        self.dep_manifests: Dict[str, Dict[str, str]] = {}  # pyproject/requirements -> {name: spec}
+
+    def add(self, rel: str, size: int, records: Optional[List[tuple]] = None):
+        imports: Tuple[str, ...] = ()
+        for rec in records or ():
+            if rec[0] == "imports":
+                imports = tuple(rec[1])
+            elif rec[0] == "manifest":
+                self.manifest = rec[1]
+            elif rec[0] == "dep_lock":
+                self.locks[rel] = tuple(rec[1:])
+            elif rec[0] == "dep_manifest":
+                self.dep_manifests[rel] = rec[2]
+        self.files.append(IndexedFile(rel, os.path.splitext(rel)[1].lower(), size, imports))
+
+    def paths(self) -> List[str]:
+        return [f.rel for f in self.files]
+
+    def glob(self, patterns: List[str]) -> List[str]:
+        # Pattern by pattern, in walk order, like one glob() call per pattern
+        out: List[str] = []
+        for pattern in patterns:
+            rx = glob_to_regex(pattern)
+            out.extend(f.rel for f in self.files if rx.match(f.rel))
+        return out
+
+    def used_imports(self) -> Set[str]:
+        used: Set[str] = set()
+        for f in self.files:
+            used.update(f.imports)
+        return used
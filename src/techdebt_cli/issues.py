@@ -0,0 +1,338 @@
+from __future__ import annotations
+import os, re, json, time, hashlib, threading
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from typing import Callable, Dict, Any, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote, urlencode, urlparse
+from .trends import item_keys
+from .utils import run
+
+DEFAULT_API_URL = "https://api.github.com"
+DEFAULT_LABEL = "tech-debt"
+USER_AGENT = "techdebt-cli"
+PAGE_SIZE = 100
+RETRIES = 5
+MAX_BACKOFF_S = 60.0
+RETRY_STATUS = frozenset([429, 500, 502, 503, 504])
+# Hidden at the end of every synced issue: which item (or owner) it tracks, and a digest of
+# what was last written, so unchanged issues need no request at all
+MARKER = re.compile(r"<!-- techdebt:(\S+) ([0-9a-f]+) -->")
+LINK_NEXT = re.compile(r'<([^>]+)>;\s*rel="next"')
+REMOTE_SLUG = re.compile(r"github[^/:]*[/:]([^/:]+)/([^/]+?)(?:\.git)?/?\Z")
+
+
+def github_token() -> Optional[str]:
+    token = os.environ.get("GITHUB_TOKEN") or os.environ.get("GH_TOKEN")
+    return token or run(["gh", "auth", "token"]).strip() or None
+
+
+def remote_slug(repo_root: str) -> Optional[str]:
+    # OWNER/NAME of the origin remote, for https and ssh remote URLs alike
+    m = REMOTE_SLUG.search(run(["git", "remote", "get-url", "origin"], cwd=repo_root).strip())
+    return f"{m.group(1)}/{m.group(2)}" if m else None
+
+
+# Rate limits are per token, so every connection shares one: a rate-limited response (or a
+# quota running out) holds back all workers until GitHub says to go on, not just the one
+# that saw it. Primary limits come with X-RateLimit-Reset, secondary ones with Retry-After.
+class Throttle:
+    def __init__(self, sleep: Callable[[float], None] = time.sleep):
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.not_before = 0.0
+        self.waited_s = 0.0
+
+    def wait(self):
+        while True:
+            with self._lock:
+                delay = self.not_before - time.time()
+                if delay > 0:
+                    self.waited_s += delay
+            if delay <= 0:
+                return
+            self._sleep(delay)
+
+    def observe(self, status: int, headers: Dict[str, str]) -> bool:
+        # Records the limits a response reports; True when it was refused for a rate limit
+        pause = 0.0
+        limited = status in (403, 429) and ("retry-after" in headers or headers.get("x-ratelimit-remaining") == "0")
+        if "retry-after" in headers and limited:
+            pause = float(headers["retry-after"])
+        elif headers.get("x-ratelimit-remaining") == "0":
+            pause = float(headers.get("x-ratelimit-reset", 0)) - time.time() + 1
+        elif status == 429:
+            pause = 60.0  # too many requests without saying for how long
+        if pause > 0:
+            with self._lock:
+                self.not_before = max(self.not_before, time.time() + min(pause, 3600))
+        return limited or status == 429
+
+
+# One keep-alive connection to the API; http.client connections are not thread-safe, so
+# each worker has its own client. Connection failures, 5xx and rate-limit refusals are
+# retried with backoff. A POST that failed mid-flight may have been applied; the markers
+# let the next sync spot and close such a duplicate.
+class GitHubClient:
+    def __init__(
+        self, api_url: str, token: Optional[str], throttle: Throttle, retries: int = RETRIES, timeout: float = 30,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        url = urlparse(api_url)
+        if url.scheme not in ("http", "https") or not url.netloc:
+            raise ValueError(f"--api-url must be an http(s) URL, got {api_url!r}")
+        self.https = url.scheme == "https"
+        self.host = url.netloc
+        self.base = url.path.rstrip("/")
+        self.headers = {
+            "Accept": "application/vnd.github+json",
+            "User-Agent": USER_AGENT,
+            "X-GitHub-Api-Version": "2022-11-28",
+        }
+        if token:
+            self.headers["Authorization"] = f"Bearer {token}"
+        self.throttle = throttle
+        self.retries = retries
+        self.timeout = timeout
+        self._sleep = sleep
+        self._conn: Optional[HTTPConnection] = None
+        self.calls = 0
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _connection(self) -> HTTPConnection:
+        if self._conn is None:
+            cls = HTTPSConnection if self.https else HTTPConnection
+            self._conn = cls(self.host, timeout=self.timeout)
+        return self._conn
+
+    def request(self, method: str, path: str, body: Optional[Dict[str, Any]] = None) -> Tuple[Any, Dict[str, str]]:
+        # (decoded JSON, lower-cased headers); `path` is relative to the API URL
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = dict(self.headers, **({"Content-Type": "application/json"} if payload is not None else {}))
+        for attempt in range(self.retries + 1):
+            self.throttle.wait()
+            backoff = min(2.0 ** attempt, MAX_BACKOFF_S)
+            try:
+                conn = self._connection()
+                conn.request(method, self.base + path, body=payload, headers=headers)
+                resp = conn.getresponse()
+                data = resp.read()
+            except (OSError, HTTPException) as e:
+                self.close()  # stale keep-alive socket or network trouble: reconnect
+                if attempt == self.retries:
+                    raise RuntimeError(f"{method} {path}: {e}")
+                self._sleep(backoff)
+                continue
+            self.calls += 1
+            got = {k.lower(): v for k, v in resp.getheaders()}
+            if got.get("connection", "").lower() == "close":
+                self.close()
+            limited = self.throttle.observe(resp.status, got)
+            if resp.status < 300:
+                return (json.loads(data) if data else None), got
+            if attempt == self.retries or not (limited or resp.status in RETRY_STATUS):
+                raise RuntimeError(f"{method} {path}: HTTP {resp.status} {_message(data)}")
+            if not limited:
+                self._sleep(backoff)
+        raise AssertionError("unreachable")
+
+    def paginate(self, path: str) -> Iterator[Dict[str, Any]]:
+        while path:
+            page, headers = self.request("GET", path)
+            yield from page or []
+            m = LINK_NEXT.search(headers.get("link", ""))
+            path = ""
+            if m:
+                url = urlparse(m.group(1))
+                rel = url.path[len(self.base):] if url.path.startswith(self.base) else url.path
+                path = rel + (f"?{url.query}" if url.query else "")
+
+
+def _message(data: bytes) -> str:
+    try:
+        return str(json.loads(data).get("message", ""))
+    except (ValueError, AttributeError):
+        return data[:200].decode("utf-8", errors="replace")
+
+
+class IssueSpec(NamedTuple):
+    # What one synced issue should say; `key` ties it to its item (or owner) across runs
+    key: str
+    title: str
+    body: str
+    assignees: Tuple[str, ...] = ()
+
+    def digest(self) -> str:
+        blob = "\0".join([self.title, self.body, ",".join(sorted(self.assignees))])
+        return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:16]
+
+    def payload(self, label: str) -> Dict[str, Any]:
+        doc = {"title": self.title, "body": f"{self.body}\n\n<!-- techdebt:{self.key} {self.digest()} -->"}
+        if label:
+            doc["labels"] = [label]
+        if self.assignees:
+            doc["assignees"] = list(self.assignees)
+        return doc
+
+
+def _where(it: Dict[str, Any]) -> str:
+    line = (it.get("meta") or {}).get("line")
+    return f"{it.get('path', '')}:{line}" if line else it.get("path", "")
+
+
+def _what(it: Dict[str, Any]) -> str:
+    meta = it.get("meta") or {}
+    if it.get("kind") == "complexity" and meta.get("function"):
+        return f"`{meta['function']}` is over its {'/'.join(meta.get('exceeds') or [])} limit"
+    return str(meta.get("snippet") or meta.get("dep") or meta.get("reason") or "").strip()
+
+
+def item_specs(items: List[Dict[str, Any]], assign_owners: bool = False) -> List[IssueSpec]:
+    # One issue per item. Scores move with churn and age on every scan, so only the bucket
+    # goes into the text; otherwise each run would rewrite every issue.
+    specs = []
+    for key, it in zip(item_keys(items), items):
+        meta = it.get("meta") or {}
+        owner = it.get("owner")
+        lines = [
+            f"**Path:** `{_where(it)}`",
+            f"**Kind:** `{it.get('kind', '')}`",
+            f"**Priority:** {meta.get('priority_bucket', '')}",
+        ]
+        if owner:
+            lines.append(f"**Owner:** @{owner}")
+        what = _what(it)
+        if what:
+            lines += ["", "```", what, "```"]
+        title = f"Tech debt: {it.get('kind', '')} in {it.get('path', '')}"
+        specs.append(IssueSpec(key, title, "\n".join(lines), (owner,) if assign_owners and owner else ()))
+    return specs
+
+
+def owner_specs(items: List[Dict[str, Any]], assign_owners: bool = False) -> List[IssueSpec]:
+    # One checklist issue per owner (items without one share an "unowned" issue), listed by
+    # path so that re-ranking alone does not change the text
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for it in items:
+        groups.setdefault(it.get("owner") or "", []).append(it)
+    specs = []
+    for owner in sorted(groups):
+        group = sorted(groups[owner], key=lambda it: (it.get("path", ""), (it.get("meta") or {}).get("line") or 0))
+        who = f"@{owner}" if owner else "unowned items"
+        lines = [f"Tech debt items for {who}:", ""]
+        for it in group:
+            what = _what(it).replace("\n", " ")[:120]
+            lines.append(f"- [ ] `{_where(it)}` {it.get('kind', '')}" + (f": {what}" if what else ""))
+        title = f"Tech debt: {len(group)} items for {who}"
+        assignees = (owner,) if assign_owners and owner else ()
+        specs.append(IssueSpec(f"owner:{owner or '-'}", title, "\n".join(lines), assignees))
+    return specs
+
+
+class SyncPlan(NamedTuple):
+    create: List[IssueSpec]
+    update: List[Tuple[int, IssueSpec]]
+    close: List[int]  # issue numbers: items that are gone, and duplicates of a key
+    unchanged: int
+    kept: int = 0  # open issues whose key is still in the report, but not wanted (under --top)
+
+
+def plan_sync(specs: List[IssueSpec], existing: List[Dict[str, Any]], present: Iterable[str] = ()) -> SyncPlan:
+    # Diffs the wanted issues against the open synced ones by marker: new keys are created,
+    # changed digests updated, keys gone from the report (not in `present`) closed, and the
+    # rest left alone. An item that only dropped under --top or --min-score is not resolved.
+    by_key: Dict[str, Tuple[int, str]] = {}
+    close: List[int] = []
+    for issue in sorted(existing, key=lambda i: i["number"]):
+        m = MARKER.search(issue.get("body") or "")
+        if m is None or "pull_request" in issue:
+            continue
+        if m.group(1) in by_key:
+            close.append(issue["number"])
+        else:
+            by_key[m.group(1)] = (issue["number"], m.group(2))
+    create: List[IssueSpec] = []
+    update: List[Tuple[int, IssueSpec]] = []
+    unchanged = 0
+    for spec in specs:
+        have = by_key.pop(spec.key, None)
+        if have is None:
+            create.append(spec)
+        elif have[1] != spec.digest():
+            update.append((have[0], spec))
+        else:
+            unchanged += 1
+    present = set(present)
+    gone = [number for key, (number, _) in by_key.items() if key not in present]
+    close.extend(gone)
+    return SyncPlan(create, update, sorted(close), unchanged, len(by_key) - len(gone))
+
+
+def wanted_items(report: Dict[str, Any], top: int = 50, min_score: float = 0.0) -> List[Dict[str, Any]]:
+    items = [it for it in report.get("items") or [] if it.get("score", 0.0) >= min_score]
+    items.sort(key=lambda it: it.get("score", 0.0), reverse=True)
+    return items[:top] if top > 0 else items
+
+
+# Brings the repo's open tech-debt issues in line with a report: one listing of the open
+# labelled issues (PAGE_SIZE per request), then one request per issue to create, update or
+# close, spread over `jobs` keep-alive connections. A run where nothing changed only lists.
+def sync_issues(
+    report: Dict[str, Any], slug: str, api_url: str = DEFAULT_API_URL, token: Optional[str] = None,
+    group: str = "item", label: str = DEFAULT_LABEL, top: int = 50, min_score: float = 0.0,
+    assign_owners: bool = False, jobs: int = 4, dry_run: bool = False, sleep: Callable[[float], None] = time.sleep,
+) -> Dict[str, Any]:
+    if not re.fullmatch(r"[\w.-]+/[\w.-]+", slug or ""):
+        raise ValueError(f"GitHub repository must be OWNER/NAME, got {slug!r}")
+    make_specs = owner_specs if group == "owner" else item_specs
+    specs = make_specs(wanted_items(report, top, min_score), assign_owners)
+    present = [spec.key for spec in make_specs(report.get("items") or [])]
+    throttle = Throttle(sleep)
+    local = threading.local()
+    clients: List[GitHubClient] = []
+
+    def client() -> GitHubClient:
+        c = getattr(local, "client", None)
+        if c is None:
+            c = local.client = GitHubClient(api_url, token, throttle, sleep=sleep)
+            clients.append(c)
+        return c
+
+    repo = "/repos/" + quote(slug)
+    query = {"state": "open", "per_page": PAGE_SIZE, **({"labels": label} if label else {})}
+    try:
+        plan = plan_sync(specs, list(client().paginate(f"{repo}/issues?{urlencode(query)}")), present)
+        ops: List[Tuple[str, str, Dict[str, Any]]] = []
+        ops += [("POST", f"{repo}/issues", spec.payload(label)) for spec in plan.create]
+        ops += [("PATCH", f"{repo}/issues/{number}", spec.payload(label)) for number, spec in plan.update]
+        closed = {"state": "closed", "state_reason": "completed"}
+        ops += [("PATCH", f"{repo}/issues/{number}", closed) for number in plan.close]
+        failed: List[str] = []
+
+        def apply(op: Tuple[str, str, Dict[str, Any]]):
+            try:
+                client().request(*op)
+            except RuntimeError as e:
+                failed.append(str(e))
+
+        if ops and not dry_run:
+            workers = max(1, min(jobs, len(ops)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="techdebt-issues") as pool:
+                list(pool.map(apply, ops))
+    finally:
+        for c in clients:
+            c.close()
+    return {
+        "created": len(plan.create),
+        "updated": len(plan.update),
+        "closed": len(plan.close),
+        "unchanged": plan.unchanged,
+        "kept": plan.kept,
+        "failed": failed,
+        "api_calls": sum(c.calls for c in clients),
+        "rate_limit_wait_s": round(throttle.waited_s, 1),
+        "dry_run": dry_run,
+    }
@@ -0,0 +1,64 @@
+from __future__ import annotations
+from typing import Tuple
+
+# Window for counting newlines in buffers without a count() method (mmap), so the
+# transient copy stays small no matter how large the mapped file is.
+COUNT_WINDOW = 1 << 20
+
+
+def count_newlines(buf, start: int, end: int) -> int:
+    if isinstance(buf, bytes):
+        return buf.count(b"\n", start, end)
+    n = 0
+    for a in range(start, end, COUNT_WINDOW):
+        n += buf[a : min(end, a + COUNT_WINDOW)].count(b"\n")
+    return n
+
+
+# Resolves byte offsets in one buffer (bytes or mmap) to 1-based (line, column) with a
+# running cursor. Matches arrive in increasing order, so all lookups together cost one
+# pass over the text, and nothing is stored per line however big the buffer is.
+# `line_base` is the number of lines in earlier chunks of the same file.
+class LineIndex:
+    __slots__ = ("buf", "line_base", "_pos", "_line", "_line_start")
+
+    def __init__(self, buf, line_base: int = 0):
+        self.buf = buf
+        self.line_base = line_base
+        self._pos = 0
+        self._line = 0
+        self._line_start = 0
+
+    def _seek(self, offset: int):
+        if offset < self._pos:
+            self._pos = self._line = self._line_start = 0
+        n = count_newlines(self.buf, self._pos, offset)
+        if n:
+            self._line += n
+            self._line_start = self.buf.rfind(b"\n", self._pos, offset) + 1
+        self._pos = offset
+
+    def line_of(self, offset: int) -> int:
+        self._seek(offset)
+        return self.line_base + self._line + 1
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        self._seek(offset)
+        prefix = offset - self._line_start
+        if prefix <= 4096:
+            # Report the column in characters, not bytes, for ordinary line lengths
+            prefix = len(self.buf[self._line_start : offset].decode("utf-8", errors="ignore"))
+        return self.line_base + self._line + 1, prefix + 1
+
+    def line_end(self, offset: int) -> int:
+        eol = self.buf.find(b"\n", offset)
+        return len(self.buf) if eol < 0 else eol
+
+    def text(self, start: int, end: int, limit: int = 240) -> str:
+        # Decoded slice capped at `limit` characters without copying a huge single line
+        raw = self.buf[start : min(end, start + limit * 4)]
+        return raw.decode("utf-8", errors="ignore")[:limit]
+
+    def line_text(self, offset: int, limit: int = 240) -> str:
+        self._seek(offset)
+        return self.text(self._line_start, self.line_end(offset), limit)
@@ -0,0 +1,203 @@
+from __future__ import annotations
+import os, re
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Set, Tuple
+from .lineindex import LineIndex
+
+# Simple deprecated API regexes (extend per language)
+DEPRECATED_JS = [r"\bfs\.rmdir\b", r"\bnew\s+Buffer\s*\("]
+DEPRECATED_PY = [r"\basyncio\.get_event_loop\s*\(", r"\blogging\.warn\s*\("]
+
+LINT_SUPPRESS_JS = [r"eslint-disable", r"@ts-ignore"]
+LINT_SUPPRESS_PY = [r"#\s*noqa"]
+LINT_SUPPRESS = LINT_SUPPRESS_JS + LINT_SUPPRESS_PY
+
+# Config drift checks are zero-width line anchors so they never swallow a marker on the same line.
+DOCKER_LATEST = r"(?m:^(?=[ \t\f\v]*(?i:from) [^\n]*:latest))"
+UNPINNED_ACTION = r"(?m:^(?=[^\n]*uses:)(?![^\n]*@[a-f0-9]{40}\b))"
+
+# ES module imports (static, side-effect and dynamic) and CommonJS require() of a string literal
+IMPORT_JS = (
+    r"""\bfrom\s+['"]([^'"\n]+)['"]"""
+    r"""|\bimport\s*\(?\s*['"]([^'"\n]+)['"]"""
+    r"""|\brequire\s*\(\s*['"]([^'"\n]+)['"]\s*\)"""
+)
+IMPORT_RE = re.compile(IMPORT_JS.encode("utf-8"))
+
+LANG_BY_EXT = {
+    ".js": "js", ".jsx": "js", ".mjs": "js", ".cjs": "js", ".ts": "js", ".tsx": "js",
+    ".py": "py", ".pyi": "py",
+}
+
+LANG_PATTERNS: Dict[str, List[Tuple[str, str]]] = {
+    "js": [("lint", p) for p in LINT_SUPPRESS_JS]
+    + [("deprecated", p) for p in DEPRECATED_JS]
+    + [("import", IMPORT_JS)],
+    "py": [("lint", p) for p in LINT_SUPPRESS_PY] + [("deprecated", p) for p in DEPRECATED_PY],
+    "dockerfile": [("drift", DOCKER_LATEST)],
+    "workflow": [("drift", UNPINNED_ACTION)],
+}
+
+INLINE_OWNER = r"@([a-z0-9_-]+)"
+INLINE_PRIORITY = r"\[(P\d)\]"
+
+MarkerSpec = Tuple[Optional[str], Optional[str], Optional[str]]
+
+
+def language_for(rel: str) -> str:
+    rel = rel.replace(os.sep, "/")
+    base = os.path.basename(rel).lower()
+    if base == "dockerfile":
+        return "dockerfile"
+    if rel.startswith(".github/workflows/") and rel.endswith((".yml", ".yaml")):
+        return "workflow"
+    return LANG_BY_EXT.get(os.path.splitext(base)[1], "")
+
+
+def import_root(mod: str) -> Optional[str]:
+    # Package a module specifier belongs to ("@scope/pkg/x" -> "@scope/pkg"); None for relative paths
+    if not mod or mod.startswith("."):
+        return None
+    parts = mod.split("/", 2)
+    return "/".join(parts[:2]) if mod.startswith("@") else parts[0]
+
+
+def _import_of(raw: bytes) -> Optional[str]:
+    m = IMPORT_RE.match(raw)
+    mod = next((g for g in m.groups() if g), None) if m else None
+    return import_root(mod.decode("utf-8", errors="ignore")) if mod else None
+
+
+def extract_imports(buf) -> Set[str]:
+    # Imported packages in a JS/TS buffer, for callers that need nothing else from the file
+    used = set()
+    for m in IMPORT_RE.finditer(buf):
+        root = _import_of(m.group(0))
+        if root:
+            used.add(root)
+    return used
+
+
+def marker_specs(markers: Optional[List[Dict[str, Any]]]) -> Tuple[MarkerSpec, ...]:
+    # Patterns are checked here, once, the way LineMatcher uses them: `pattern` as one branch of
+    # a bytes alternation, the others on their own. A bad one would otherwise break the combined
+    # regex in every worker. ValueError names the marker (1-based) and the offending key.
+    specs = []
+    for i, m in enumerate(markers or [], 1):
+        spec = (m.get("pattern"), m.get("priority_from"), m.get("owner_from"))
+        if not spec[0]:
+            continue
+        for key, pat in zip(("pattern", "priority_from", "owner_from"), spec):
+            if pat is not None:
+                _check_marker_pattern(i, key, pat)
+        specs.append(spec)
+    return tuple(specs)
+
+
+def _check_marker_pattern(i: int, key: str, pat: Any) -> None:
+    where = f"markers[{i}].{key}"
+    if not isinstance(pat, str):
+        raise ValueError(f"{where} must be a regex string, got {pat!r}")
+    try:
+        if key == "pattern":
+            rx = re.compile(f"(?:{pat})".encode("utf-8"))
+            if any(re.fullmatch(r"[mx]\d+", name) for name in rx.groupindex):
+                raise re.error("group names m<N> and x<N> are reserved")
+        else:
+            re.compile(pat, re.I)
+    except re.error as e:
+        hint = "; use scoped flags such as (?i:...) instead" if "global flags" in str(e) else ""
+        raise ValueError(f"{where} {pat!r} is not a valid regex: {e}{hint}") from None
+
+
+class ScanHits:
+    # Everything LineMatcher.scan() found in one file; positions are 1-based (line, col).
+    __slots__ = ("markers", "lint", "deprecated", "deprecated_at", "drift", "imports")
+
+    def __init__(self):
+        self.markers: List[Tuple[int, int, str, Optional[str], Optional[str]]] = []
+        self.lint: Optional[Tuple[int, int, str]] = None
+        self.deprecated = 0
+        self.deprecated_at: Optional[Tuple[int, int, str]] = None
+        self.drift: List[Tuple[int, int, str]] = []
+        self.imports: Set[str] = set()
+
+
+def _first_group(m: "re.Match[str]") -> str:
+    return m.group(1) if m.re.groups else m.group(0)
+
+
+class LineMatcher:
+    # All line signals for one language compiled into a single alternation with named
+    # groups, so each file is walked once and every hit is dispatched by group name.
+    # Owner/priority patterns run on the decoded marker snippet only.
+    def __init__(self, markers: Tuple[MarkerSpec, ...], lang: str):
+        parts: List[str] = []
+        self.kinds: Dict[str, Tuple[str, int]] = {}
+        # Drift anchors go first: they are zero-width, so a marker starting at the same
+        # position still matches on the next search step.
+        extra = LANG_PATTERNS.get(lang, [])
+        for i, (kind, pat) in enumerate(sorted(extra, key=lambda kp: kp[0] != "drift")):
+            parts.append(f"(?P<x{i}>{pat})")
+            self.kinds[f"x{i}"] = (kind, i)
+        self.markers: List[Tuple[Optional["re.Pattern[str]"], Optional["re.Pattern[str]"]]] = []
+        for i, (pattern, prio_from, owner_from) in enumerate(markers):
+            parts.append(f"(?P<m{i}>{pattern})")
+            self.kinds[f"m{i}"] = ("marker", i)
+            self.markers.append(
+                (
+                    re.compile(prio_from or INLINE_PRIORITY, re.I),
+                    re.compile(owner_from or INLINE_OWNER, re.I),
+                )
+            )
+        # Compiled as a bytes pattern so it runs directly on raw file buffers and mmaps
+        self.regex = re.compile("|".join(parts).encode("utf-8")) if parts else None
+
+    def scan(self, buf, index: Optional[LineIndex] = None, hits: Optional[ScanHits] = None) -> ScanHits:
+        # `buf` is bytes or an mmap; pass the same `hits` for successive chunks of one file.
+        hits = hits if hits is not None else ScanHits()
+        if self.regex is None:
+            return hits
+        index = index or LineIndex(buf)
+        marker_line_end = -1
+        for m in self.regex.finditer(buf):
+            kind, idx = self.kinds[m.lastgroup]
+            start = m.start()
+            if kind == "marker":
+                # Like the old `MARKER.*` scan: one marker per line, snippet runs to end of line
+                if start < marker_line_end or m.end() == start:
+                    continue
+                marker_line_end = index.line_end(start)
+                line = index.text(start, marker_line_end)
+                line_no, col = index.position(start)
+                prio_re, owner_re = self.markers[idx]
+                mo = owner_re.search(line)
+                mp = prio_re.search(line)
+                owner = _first_group(mo) if mo else None
+                prio = _first_group(mp).upper() if mp else None
+                hits.markers.append((line_no, col, line, owner, prio))
+            elif kind == "lint":
+                if hits.lint is None:
+                    hits.lint = self._where(index, start)
+            elif kind == "deprecated":
+                hits.deprecated += 1
+                if hits.deprecated_at is None:
+                    hits.deprecated_at = self._where(index, start)
+            elif kind == "import":
+                root = _import_of(m.group(0))
+                if root:
+                    hits.imports.add(root)
+            else:
+                hits.drift.append(self._where(index, start))
+        return hits
+
+    @staticmethod
+    def _where(index: LineIndex, offset: int) -> Tuple[int, int, str]:
+        # (line, col, stripped source line) for evidence on non-marker signals
+        line_no, col = index.position(offset)
+        return line_no, col, index.line_text(offset, 480).strip()[:240]
+
+
+@lru_cache(maxsize=None)
+def get_matcher(markers: Tuple[MarkerSpec, ...], lang: str) -> LineMatcher:
+    return LineMatcher(markers, lang)
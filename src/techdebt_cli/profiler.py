@@ -0,0 +1,82 @@
+from __future__ import annotations
+import os, json, time, heapq
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Tuple
+from .utils import SPAWNED
+
+PROFILE_FILE = "techdebt-profile.json"
+PROFILE_TOP_N = 20
+
+
+def _cpu_seconds() -> float:
+    # This process plus reaped children; worker pools are joined inside their phase
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+# Timing surface for one run: wall and CPU time per phase, git processes started in each,
+# running counters (files, bytes) and the slowest files. A disabled profiler records
+# nothing, so the scan passes can call it unconditionally.
+class Profiler:
+    def __init__(self, enabled: bool = True, top_n: int = PROFILE_TOP_N):
+        self.enabled = enabled
+        self.top_n = top_n
+        self.phases: List[Dict[str, Any]] = []
+        self.counters: Dict[str, int] = {}
+        self._slowest: List[Tuple[float, str]] = []  # min-heap of (seconds, path)
+        self._wall0 = time.perf_counter()
+        self._cpu0 = _cpu_seconds()
+        self._spawned0 = dict(SPAWNED)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        wall, cpu, git = time.perf_counter(), _cpu_seconds(), SPAWNED["git"]
+        try:
+            yield
+        finally:
+            self.phases.append(
+                {
+                    "name": name,
+                    "wall_s": round(time.perf_counter() - wall, 4),
+                    "cpu_s": round(_cpu_seconds() - cpu, 4),
+                    "git_processes": SPAWNED["git"] - git,
+                }
+            )
+
+    def count(self, name: str, n: int = 1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def file(self, rel: str, seconds: float):
+        if not self.enabled:
+            return
+        if len(self._slowest) < self.top_n:
+            heapq.heappush(self._slowest, (seconds, rel))
+        elif (seconds, rel) > self._slowest[0]:
+            heapq.heapreplace(self._slowest, (seconds, rel))
+
+    def to_json(self) -> Dict[str, Any]:
+        spawned = {k: v - self._spawned0.get(k, 0) for k, v in SPAWNED.items() if v > self._spawned0.get(k, 0)}
+        return {
+            "wall_s": round(time.perf_counter() - self._wall0, 4),
+            "cpu_s": round(_cpu_seconds() - self._cpu0, 4),
+            "git_processes": spawned.get("git", 0),
+            "subprocesses": spawned,
+            "counters": dict(self.counters),
+            "phases": self.phases,
+            "slowest_files": [
+                {"path": rel, "seconds": round(secs, 6)} for secs, rel in sorted(self._slowest, reverse=True)
+            ],
+        }
+
+    def write(self, repo_root: str) -> str:
+        path = os.path.join(repo_root, PROFILE_FILE)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, indent=2)
+        return path
+
+
+NULL_PROFILER = Profiler(enabled=False)
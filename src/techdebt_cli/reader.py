@@ -0,0 +1,47 @@
+from __future__ import annotations
+import mmap, re
+from typing import BinaryIO, Iterator
+
+# Size tiers for reading a file. Small files are read in one go, medium files in
+# line-aligned chunks and large files are memory-mapped, so peak memory stays around
+# CHUNK_BYTES regardless of the largest file. Files over `limits.max_file_bytes` are
+# not read at all and are reported as skipped.
+SMALL_FILE_BYTES = 1 << 20
+MMAP_FILE_BYTES = 32 << 20
+CHUNK_BYTES = 1 << 20
+DEFAULT_MAX_FILE_BYTES = 64 << 20
+
+NONBLANK_LINE = re.compile(rb"^[ \t\r\f\v]*[^\s]", re.M)
+
+
+def iter_buffers(f: BinaryIO, size: int) -> Iterator:
+    # Yields bytes (or one mmap) covering the file; chunk boundaries always fall after a newline
+    if size < SMALL_FILE_BYTES:
+        yield f.read()
+        return
+    if size >= MMAP_FILE_BYTES:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+        return
+    carry = b""
+    while True:
+        block = f.read(CHUNK_BYTES)
+        if not block:
+            break
+        buf = carry + block if carry else block
+        cut = buf.rfind(b"\n") + 1
+        if cut == 0:
+            carry = buf
+            continue
+        carry = buf[cut:]
+        yield buf[:cut]
+    if carry:
+        yield carry
+
+
+def count_loc(buf) -> int:
+    # Non-blank lines, without splitting the buffer into a list of lines
+    n = 0
+    for _ in NONBLANK_LINE.finditer(buf):
+        n += 1
+    return n
@@ -1,14 +1,81 @@
 from __future__ import annotations
-import os
-from jinja2 import Environment, FileSystemLoader, select_autoescape
-
-# TODO: This is a test todo
-def render_markdown(result, repo_root: str):
-    tmpl_dir = os.path.join(os.path.dirname(__file__), "templates")
-    env = Environment(loader=FileSystemLoader(tmpl_dir), autoescape=select_autoescape())
-    tmpl = env.get_template("report.md.j2")
-    md = tmpl.render(**result)
-    path = os.path.join(repo_root, "TECH_DEBT.md")
+import os, re
+from functools import lru_cache
+from itertools import islice, takewhile
+from typing import TYPE_CHECKING, Any, Dict, List
+
+if TYPE_CHECKING:
+    from jinja2 import Environment, Template
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
+REPORT_FILE = "TECH_DEBT.md"
+# The "More details" links report.md.j2 writes; a report only ever removes pages it linked to
+PAGE_LINK = re.compile(r"- \[(TECH_DEBT-\d+\.md)\]\(\1\)$")
+QUICK_WIN_SCORE = 60
+QUICK_WINS = 10
+
+
+# One environment per process: templates are compiled once and reused by every render.
+# Jinja is imported here, so only runs that write Markdown load it.
+@lru_cache(maxsize=None)
+def _environment() -> Environment:
+    from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+    return Environment(loader=FileSystemLoader(TEMPLATE_DIR), autoescape=select_autoescape())
+
+
+def _write(tmpl: Template, path: str, context: Dict[str, Any]):
+    # Template.generate() yields the output piece by piece; nothing holds the whole page
     with open(path, "w", encoding="utf-8") as f:
-        f.write(md)
-    print(f"Wrote {path}")
\ No newline at end of file
+        for chunk in tmpl.generate(**context):
+            f.write(chunk)
+
+
+def _linked_pages(path: str) -> List[str]:
+    # Detail pages an existing TECH_DEBT.md links to, read line by line like it was written
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return [m.group(1) for m in map(PAGE_LINK.match, f) if m]
+    except OSError:
+        return []
+
+
+def _remove_stale_pages(repo_root: str, old: List[str], new: List[str]):
+    # Pages the previous report linked to and this one does not (it was longer)
+    for name in set(old) - set(new):
+        try:
+            os.remove(os.path.join(repo_root, name))
+        except FileNotFoundError:
+            pass
+
+
+# TECH_DEBT.md, plus TECH_DEBT-<n>.md detail pages when `details_per_page` is set. Page 1
+# of the details stays in TECH_DEBT.md; `max_detail_pages` bounds the total, and items past
+# the last page are only counted.
+def render_markdown(result, repo_root: str, details_per_page: int = 0, max_detail_pages: int = 0):
+    items: List[Dict[str, Any]] = result.get("items") or []
+    per_page = details_per_page if details_per_page > 0 else max(len(items), 1)
+    pages = [items[i : i + per_page] for i in range(0, len(items), per_page)] or [[]]
+    if max_detail_pages > 0:
+        pages = pages[:max_detail_pages]
+    shown = sum(len(p) for p in pages)
+    names = [f"TECH_DEBT-{n}.md" for n in range(2, len(pages) + 1)]
+
+    env = _environment()
+    path = os.path.join(repo_root, REPORT_FILE)
+    old_names = _linked_pages(path)
+    # Items come sorted by score, so the quick wins are a prefix; the rest are never looked at
+    quick_wins = list(islice(takewhile(lambda it: it["score"] >= QUICK_WIN_SCORE, items), QUICK_WINS))
+    context = dict(
+        result, details=pages[0], detail_pages=names, details_omitted=len(items) - shown, quick_wins=quick_wins,
+    )
+    _write(env.get_template("report.md.j2"), path, context)
+    print(f"Wrote {path}")
+
+    page_tmpl = env.get_template("details_page.md.j2")
+    for n, (name, chunk) in enumerate(zip(names, pages[1:]), start=2):
+        page_ctx = {"repo_root": result.get("repo_root"), "commit_sha": result.get("commit_sha")}
+        page_path = os.path.join(repo_root, name)
+        _write(page_tmpl, page_path, dict(page_ctx, details=chunk, page=n, pages=len(pages)))
+        print(f"Wrote {page_path}")
+    _remove_stale_pages(repo_root, old_names, names)
@@ -0,0 +1,42 @@
+from __future__ import annotations
+import json
+from typing import Dict, Any, List
+from .collector import TopItems
+from .config import Config
+from .scanner import item_from_json, item_to_json
+from .scoring import rescore_items
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        report = json.load(f)
+    if not isinstance(report, dict) or not isinstance(report.get("items"), list):
+        raise ValueError(f"{path} is not a tech-debt.json report")
+    return report
+
+
+def _rerank(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    items.sort(key=lambda it: it.get("score", 0.0), reverse=True)
+    return items
+
+
+# Applies the current weights to a saved report: every item is re-scored from its
+# meta.components in one batch, re-ranked and cut to max_items. No git process runs and
+# no file is read. Only items present in the saved report can be ranked, so scan with a
+# larger --max-items first to keep more candidates around for re-weighting.
+def rescore_result(
+    report: Dict[str, Any], cfg: Config, max_items: int = 2000, summary_scope: str = "kept"
+) -> Dict[str, Any]:
+    weights = cfg.data.get("weights", {})
+    top = TopItems(max_items, (item_from_json(d) for d in rescore_items(report["items"], weights)))
+    kept = top.items()
+
+    result = dict(report)
+    result["summary"] = top.summary(summary_scope, kept)
+    result["items"] = [item_to_json(it) for it in kept]
+    delta = report.get("delta")
+    if delta:
+        result["delta"] = dict(delta)
+        for key in ("added", "removed"):
+            result["delta"][key] = _rerank(rescore_items(delta.get(key) or [], weights))
+    return result
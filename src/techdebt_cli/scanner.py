@@ -1,22 +1,38 @@
 from __future__ import annotations
-import os, re, json
-from typing import Dict, Any, List
-from glob import glob
+import os, json, time
+from collections import deque
+from contextlib import closing
+from datetime import datetime
+from functools import partial
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple, Iterator, Iterable
 from .signals import DebtItem
+from .complexity import ComplexityLimits, analyze_complexity
+from .deps import (
+    DepFiles, DepGraph, dependency_parser, loose_npm_range, loose_python_spec, NPM_LOCAL_SPEC, PYPROJECT,
+)
 from .utils import (
-    load_gitignore, iter_files, is_text_file, git_commit_sha, git_last_modified, git_churn,
+    is_text_blob, git_commit_sha, git_churn,
 )
-from .scoring import compute_score, bucket
-from .config import Config
+from .age import AgeEngine
+from .walker import IgnoreRules, walk_files
+from .fileindex import FileIndex
+from .collector import TopItems
+from .profiler import Profiler, NULL_PROFILER
+from .cache import ScanCache, is_miss
+from .scoring import COMPONENTS, Scorer, bucket, components, components_dict
+from .config import Config, DEFAULT_CONFIG
+from .matcher import MarkerSpec, ScanHits, marker_specs, get_matcher, language_for
+from .lineindex import LineIndex, count_newlines
+from .reader import DEFAULT_MAX_FILE_BYTES, iter_buffers, count_loc
 
-# Simple deprecated API regexes (extend per language)
-DEPRECATED_JS = [r"\bfs\.rmdir\b", r"\bnew\s+Buffer\s*\("]
-DEPRECATED_PY = [r"\basyncio\.get_event_loop\s*\(", r"\blogging\.warn\s*\("]
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
 
-LINT_SUPPRESS = [r"eslint-disable", r"#\s*noqa", r"@ts-ignore"]
+DEFAULT_MARKERS = marker_specs(DEFAULT_CONFIG["markers"])
 
-INLINE_OWNER = re.compile(r"@([a-z0-9_-]+)", re.I)
-INLINE_PRIORITY = re.compile(r"\[(P\d)\]", re.I)
+PACKAGE_JSON = "package.json"
+DEP_KEYS = ("dependencies", "devDependencies", "peerDependencies", "optionalDependencies")
 
 
 def norm(v: float, max_v: float) -> float:
@@ -25,305 +41,580 @@ def norm(v: float, max_v: float) -> float:
     return max(0.0, min(1.0, v / max_v))
 
 
-def scan_repo(repo_root: str, cfg: Config, since_days: int = 30, max_items: int = 2000) -> Dict[str, Any]:
-    ignore = load_gitignore(repo_root)
-    excludes = cfg.data.get("exclude", [])
-    weights = cfg.data.get("weights", {})
+@dataclass(frozen=True)
+class AnalyzeOptions:
+    # Everything the per-file passes need from the config; small and picklable for workers.
+    markers: Tuple[MarkerSpec, ...] = DEFAULT_MARKERS
+    max_file_bytes: int = DEFAULT_MAX_FILE_BYTES
+    complexity: Optional[ComplexityLimits] = ComplexityLimits()
+    deps: DepFiles = DepFiles()
 
-    # Precompute churn
-    churn_map = git_churn(repo_root, since_days)
+    @classmethod
+    def from_config(cls, cfg: Config) -> "AnalyzeOptions":
+        limits = cfg.data.get("limits") or {}
+        return cls(
+            markers=marker_specs(cfg.data.get("markers")),
+            max_file_bytes=int(limits.get("max_file_bytes", DEFAULT_MAX_FILE_BYTES)),
+            complexity=ComplexityLimits.from_config(cfg.data.get("complexity")),
+            deps=DepFiles.from_config(cfg.data.get("dependencies")),
+        )
 
-    items: List[DebtItem] = []
 
-    # Walk files, collect signals
-    for abspath in iter_files(repo_root, ignore, excludes):
-        rel = os.path.relpath(abspath, repo_root)
-        try:
-            if not is_text_file(abspath):
-                continue
-            with open(abspath, "r", encoding="utf-8", errors="ignore") as f:
-                txt = f.read()
-        except Exception:
-            continue
+DEFAULT_OPTIONS = AnalyzeOptions()
 
-        lines = txt.splitlines()
-        loc = sum(1 for ln in lines if ln.strip())
-
-        # Inline markers
-        for m in re.finditer(r"(TODO|FIXME|HACK|XXX|BUG|OPTIMIZE).*", txt):
-            line_no = txt.count("\n", 0, m.start()) + 1
-            line = m.group(0)[:240]
-            owner = None
-            prio = None
-            mo = INLINE_OWNER.search(line)
-            if mo:
-                owner = mo.group(1)
-            mp = INLINE_PRIORITY.search(line)
-            if mp:
-                prio = mp.group(1).upper()
-            comp = {
-                "inline_priority": 1.0 if (prio and prio.upper() == "P1") else 0.5 if prio else 0.2,
-                "age_days": 0.0,
-                "churn": norm(churn_map.get(rel, 0), 2000),
-                "complexity": norm(loc, 1000),
-                "deps_outdated": 0.0,
-                "no_tests": 0.0,
-                "lint_suppress": 0.0,
-                "deprecated": 0.0,
-            }
-            lm = git_last_modified(repo_root, rel)
-            if lm:
-                from datetime import datetime
 
-                age_days = (datetime.utcnow() - lm).days
-                comp["age_days"] = norm(age_days, 365)
-            score = compute_score(comp, weights)
+# Per-file signal passes. Returns (loc, records), or None for binary files and files that
+# cannot be read (OSError); any other error is a bug or a bad config and propagates.
+# Records are small tuples rather than DebtItems so they are cheap to pickle back from
+# worker processes; file_items() turns them into scored items in the parent. Files over
+# max_file_bytes produce a single ("skipped", size) record and are never read.
+def analyze_file(abspath: str, rel: str, opts: AnalyzeOptions = DEFAULT_OPTIONS) -> Optional[Tuple[int, List[tuple]]]:
+    try:
+        with open(abspath, "rb") as f:
+            if not is_text_blob(rel, f.read(2048)):
+                return None
+            size = os.fstat(f.fileno()).st_size
+            if size > opts.max_file_bytes:
+                return 0, [("skipped", size)]
+            f.seek(0)
+            return analyze_buffers(rel, iter_buffers(f, size), opts)
+    except OSError:
+        return None
+
+
+# Same passes over content that is already in memory (e.g. a blob read from git).
+def analyze_blob(rel: str, data: bytes, opts: AnalyzeOptions = DEFAULT_OPTIONS) -> Tuple[int, List[tuple]]:
+    return analyze_buffers(rel, [data], opts)
+
+
+def analyze_buffers(rel: str, buffers: Iterable, opts: AnalyzeOptions = DEFAULT_OPTIONS) -> Tuple[int, List[tuple]]:
+    matcher = get_matcher(opts.markers, language_for(rel))
+    hits = ScanHits()
+    loc = 0
+    line_base = 0
+    manifest: Optional[List[bytes]] = [] if rel == PACKAGE_JSON else None
+    deps = dependency_parser(rel, opts.deps)  # lockfiles, pyproject.toml, requirements files
+    whole = None  # the file's only buffer, for the complexity pass
+    # Markers, lint suppressions, deprecated APIs, config drift and imports in one pass per buffer
+    for n, buf in enumerate(buffers):
+        matcher.scan(buf, LineIndex(buf, line_base), hits)
+        loc += count_loc(buf)
+        line_base += count_newlines(buf, 0, len(buf))
+        if manifest is not None:
+            manifest.append(bytes(buf))
+        if deps is not None:
+            deps.feed(buf)
+        whole = buf if n == 0 else None
+
+    records: List[tuple] = []
+    for line_no, col, line, owner, prio in hits.markers:
+        records.append(("inline_marker", line_no, col, line, owner, prio))
+    if hits.lint:
+        records.append(("lint_suppress",) + hits.lint)
+    if hits.deprecated:
+        records.append(("deprecated", hits.deprecated) + hits.deprecated_at)
+
+    # Generated / built artifacts
+    base = os.path.basename(rel).lower()
+    if rel.startswith("dist/") or base.endswith(".min.js"):
+        records.append(("generated_artifact",))
+
+    # Config drift: Dockerfile latest, GH Actions not pinned
+    for where in hits.drift:
+        records.append(("config_drift",) + where)
+
+    # Per-function length, nesting and cyclomatic complexity, from the buffer already in memory
+    if opts.complexity is not None:
+        records.extend(analyze_complexity(rel, whole, loc, opts.complexity))
+
+    # Inputs for the repo-level passes, so they never have to open the file again
+    if hits.imports:
+        records.append(("imports", sorted(hits.imports)))
+    if manifest is not None:
+        records.append(("manifest", parse_manifest(b"".join(manifest))))
+    if deps is not None:
+        dep_record = deps.close()
+        if dep_record is not None:
+            records.append(dep_record)
+
+    return loc, records
+
+
+def _analyze_job(job: Tuple[str, str], opts: AnalyzeOptions) -> Optional[Tuple[int, List[tuple]]]:
+    return analyze_file(job[0], job[1], opts)
+
+
+def _timed_job(job: Tuple[str, str], opts: AnalyzeOptions) -> Tuple[Optional[Tuple[int, List[tuple]]], float]:
+    # Timed where the work happens, so per-file figures stay meaningful with a process pool
+    start = time.perf_counter()
+    res = analyze_file(job[0], job[1], opts)
+    return res, time.perf_counter() - start
+
+
+# Yields analyze_file() results in the same order as `jobs`, fanning out to processes if asked.
+# With a shared `pool` (scan-many) at most `workers` chunks of this scan are in flight at once.
+def iter_analyzed(
+    jobs: List[Tuple[str, str]], workers: int = 1, opts: AnalyzeOptions = DEFAULT_OPTIONS,
+    profiler: Profiler = NULL_PROFILER, pool: Optional[Executor] = None,
+) -> Iterator[Optional[Tuple[int, List[tuple]]]]:
+    if profiler.enabled:
+        with closing(_map_jobs(_timed_job, jobs, workers, opts, pool)) as timed:
+            for job, (res, secs) in zip(jobs, timed):
+                profiler.file(job[1], secs)
+                yield res
+        return
+    yield from _map_jobs(_analyze_job, jobs, workers, opts, pool)
+
+
+def _run_chunk(fn, chunk: List[Tuple[str, str]], opts: AnalyzeOptions) -> List[Any]:
+    return [fn(job, opts) for job in chunk]
+
+
+def _bounded_map(fn, jobs: List[Tuple[str, str]], window: int, opts: AnalyzeOptions, pool: Executor) -> Iterator[Any]:
+    # Small chunks, at most `window` submitted at a time: other scans sharing the pool get
+    # workers between our chunks instead of queueing behind all of them.
+    size = max(1, min(64, len(jobs) // (max(1, window) * 8)))
+    chunks = iter([jobs[i : i + size] for i in range(0, len(jobs), size)])
+    pending: deque = deque()
+    for chunk in chunks:
+        pending.append(pool.submit(_run_chunk, fn, chunk, opts))
+        if len(pending) >= window:
+            break
+    while pending:
+        yield from pending.popleft().result()
+        chunk = next(chunks, None)
+        if chunk is not None:
+            pending.append(pool.submit(_run_chunk, fn, chunk, opts))
+
+
+def _map_jobs(
+    fn, jobs: List[Tuple[str, str]], workers: int, opts: AnalyzeOptions, pool: Optional[Executor] = None
+) -> Iterator[Any]:
+    if pool is not None and jobs:
+        yield from _bounded_map(fn, jobs, max(1, workers), opts, pool)
+        return
+    if workers <= 1 or len(jobs) < 2:
+        for job in jobs:
+            yield fn(job, opts)
+        return
+    # Deferred: the process-pool machinery is a noticeable share of startup and -j1 never uses it
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, min(256, len(jobs) // (workers * 8)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(partial(fn, opts=opts), jobs, chunksize=chunksize)
+
+
+def file_items(
+    rel: str, loc: int, records: List[tuple], scorer: Scorer, churn_map: Dict[str, int], ages: AgeEngine,
+    now: datetime,
+) -> List[DebtItem]:
+    items: List[DebtItem] = []
+    for rec in records:
+        kind = rec[0]
+        if kind == "inline_marker":
+            _, line_no, col, line, owner, prio = rec
+            age = 0.0
+            lm = ages.last_modified(rel, line_no)
+            if lm:
+                age_days = (now - lm).days
+                age = norm(age_days, 365)
+            comp = components(
+                inline_priority=1.0 if (prio and prio.upper() == "P1") else 0.5 if prio else 0.2,
+                age_days=age,
+                churn=norm(churn_map.get(rel, 0), 2000),
+                complexity=norm(loc, 1000),
+            )
             item = DebtItem(
                 path=rel,
                 kind="inline_marker",
-                score=score,
-                meta={"line": line_no, "snippet": line, "components": comp},
+                score=scorer.score(comp),
+                meta={"line": line_no, "col": col, "snippet": line},
+                components=comp,
                 owner=owner,
                 priority=None,
             )
             items.append(item)
-
-        # Lint suppressions
-        if any(re.search(pat, txt) for pat in LINT_SUPPRESS):
-            comp = {
-                "inline_priority": 0.0,
-                "age_days": 0.0,
-                "churn": norm(churn_map.get(rel, 0), 2000),
-                "complexity": norm(loc, 1000),
-                "deps_outdated": 0.0,
-                "no_tests": 0.0,
-                "lint_suppress": 1.0,
-                "deprecated": 0.0,
-            }
-            score = compute_score(comp, weights)
+        elif kind == "lint_suppress":
+            _, line_no, col, line = rec
+            comp = components(
+                churn=norm(churn_map.get(rel, 0), 2000), complexity=norm(loc, 1000), lint_suppress=1.0
+            )
             items.append(
-                DebtItem(path=rel, kind="lint_suppress", score=score, meta={"lines": loc, "components": comp})
+                DebtItem(
+                    path=rel,
+                    kind="lint_suppress",
+                    score=scorer.score(comp),
+                    meta={"lines": loc, "line": line_no, "col": col, "snippet": line},
+                    components=comp,
+                )
+            )
+        elif kind == "deprecated":
+            _, hits, line_no, col, line = rec
+            comp = components(
+                churn=norm(churn_map.get(rel, 0), 2000), complexity=norm(loc, 1000), deprecated=min(1.0, hits / 5.0)
             )
-
-        # Deprecated API usage
-        pats = DEPRECATED_JS + DEPRECATED_PY
-        hits = 0
-        for pat in pats:
-            for _ in re.finditer(pat, txt):
-                hits += 1
-        if hits:
-            comp = {
-                "inline_priority": 0.0,
-                "age_days": 0.0,
-                "churn": norm(churn_map.get(rel, 0), 2000),
-                "complexity": norm(loc, 1000),
-                "deps_outdated": 0.0,
-                "no_tests": 0.0,
-                "lint_suppress": 0.0,
-                "deprecated": min(1.0, hits / 5.0),
-            }
-            score = compute_score(comp, weights)
             items.append(
-                DebtItem(path=rel, kind="deprecated", score=score, meta={"hits": hits, "components": comp})
+                DebtItem(
+                    path=rel,
+                    kind="deprecated",
+                    score=scorer.score(comp),
+                    meta={"hits": hits, "line": line_no, "col": col, "snippet": line},
+                    components=comp,
+                )
             )
-
-        # Generated / built artifacts
-        base = os.path.basename(rel).lower()
-        if rel.startswith("dist/") or base.endswith(".min.js"):
-            comp = {
-                "inline_priority": 0.0,
-                "age_days": 0.0,
-                "churn": 0.0,
-                "complexity": norm(loc, 1000),
-                "deps_outdated": 0.0,
-                "no_tests": 0.0,
-                "lint_suppress": 0.0,
-                "deprecated": 0.0,
-            }
-            score = compute_score(comp, weights)
+        elif kind == "generated_artifact":
+            comp = components(complexity=norm(loc, 1000))
             items.append(
-                DebtItem(path=rel, kind="generated_artifact", score=score, meta={"components": comp})
+                DebtItem(
+                    path=rel, kind="generated_artifact", score=scorer.score(comp), meta={}, components=comp
+                )
             )
+        elif kind == "complexity":
+            _, name, line_no, lines, nesting, cyclomatic, snippet, over, exceeds = rec
+            # At a limit the component is 0.5; at twice the limit (or more) it is 1.0
+            comp = components(churn=norm(churn_map.get(rel, 0), 2000), complexity=norm(over, 2.0))
+            items.append(
+                DebtItem(
+                    path=rel,
+                    kind="complexity",
+                    score=scorer.score(comp),
+                    meta={
+                        "function": name, "line": line_no, "lines": lines, "nesting": nesting,
+                        "cyclomatic": cyclomatic, "exceeds": list(exceeds), "snippet": snippet,
+                    },
+                    components=comp,
+                )
+            )
+        elif kind == "long_file":
+            _, lines, over = rec
+            comp = components(churn=norm(churn_map.get(rel, 0), 2000), complexity=norm(over, 2.0))
+            items.append(
+                DebtItem(
+                    path=rel,
+                    kind="complexity",
+                    score=scorer.score(comp),
+                    meta={"lines": lines, "reason": "file_length"},
+                    components=comp,
+                )
+            )
+        elif kind == "config_drift":
+            _, line_no, col, line = rec
+            comp = components(deprecated=0.3)
+            items.append(
+                DebtItem(
+                    path=rel,
+                    kind="config_drift",
+                    score=scorer.score(comp),
+                    meta={"line": line_no, "col": col, "snippet": line},
+                    components=comp,
+                )
+            )
+    return items
+
+
+def scan_repo(
+    repo_root: str, cfg: Config, since_days: int = 30, max_items: int = 2000, age_mode: str = "file",
+    jobs: int = 1, cache: Optional[ScanCache] = None, walker: str = "scandir", profiler: Profiler = NULL_PROFILER,
+    summary_scope: str = "kept", pool: Optional[Executor] = None, collector: Optional[TopItems] = None,
+) -> Dict[str, Any]:
+    rules = IgnoreRules(repo_root, cfg.data.get("exclude", []))
+    scorer = Scorer(cfg.data.get("weights", {}))
+
+    # Precompute churn and last-modified times (one git process each, not one per marker)
+    with profiler.phase("git_churn"):
+        churn_map = git_churn(repo_root, since_days)
+    ages = AgeEngine(repo_root, mode=age_mode)
+    now = datetime.utcnow()
+    opts = AnalyzeOptions.from_config(cfg)
+
+    # Only the top max_items are held in memory; everything is still counted for the summary.
+    # A caller that needs every item passes its own collector (TopItems(keep_all=True)).
+    items = collector if collector is not None else TopItems(max_items)
 
-        # Config drift: Dockerfile latest, GH Actions not pinned
-        if os.path.basename(rel).lower() == "dockerfile":
-            for ln in lines:
-                if ln.strip().lower().startswith("from ") and ":latest" in ln:
-                    comp = {
-                        "inline_priority": 0.0,
-                        "age_days": 0.0,
-                        "churn": 0.0,
-                        "complexity": 0.0,
-                        "deps_outdated": 0.0,
-                        "no_tests": 0.0,
-                        "lint_suppress": 0.0,
-                        "deprecated": 0.3,
-                    }
-                    score = compute_score(comp, weights)
+    # Walk files, collect signals. Results come back in walk order whatever the worker
+    # count, so the parallel path produces exactly the same report as the serial one.
+    with profiler.phase("walk"):
+        entries = list(walk_files(repo_root, backend=walker, rules=rules))
+    file_jobs = [(e.abspath, e.rel) for e in entries]
+    results: List[Optional[Tuple[int, List[tuple]]]] = [None] * len(file_jobs)
+    todo = list(range(len(file_jobs)))
+    keys: List[Optional[str]] = []
+    if cache is not None:
+        with profiler.phase("cache_lookup"):
+            keys = [cache.key_for(e) for e in entries]
+            todo = []
+            for i, (_, rel) in enumerate(file_jobs):
+                hit = cache.get(rel, keys[i])
+                if is_miss(hit):
+                    todo.append(i)
+                else:
+                    results[i] = hit
+    # Closed inside the phase: zip() stops before the generator does, and closing it is what
+    # shuts down (joins) its worker pool, so the workers' CPU time is counted towards "analyze"
+    analyzed = iter_analyzed([file_jobs[i] for i in todo], workers=jobs, opts=opts, profiler=profiler, pool=pool)
+    with profiler.phase("analyze"), closing(analyzed):
+        for i, res in zip(todo, analyzed):
+            results[i] = res
+            if cache is not None:
+                cache.put(file_jobs[i][1], keys[i], res)
+            if res is None:
+                profiler.count("files_unreadable_or_binary")
+            elif res[1] and res[1][0][0] == "skipped":
+                profiler.count("files_skipped")
+            else:
+                profiler.count("files_scanned")
+                profiler.count("bytes_read", entries[i].size)
+    if cache is not None:
+        with profiler.phase("cache_save"):
+            cache.save()
+    profiler.count("files_walked", len(entries))
+    profiler.count("files_cached", len(entries) - len(todo))
+
+    skipped: List[Dict[str, Any]] = []
+    index = FileIndex()
+    with profiler.phase("score_files"):
+        for entry, res in zip(entries, results):
+            index.add(entry.rel, entry.size, res[1] if res is not None else None)
+            if res is None:
+                continue
+            loc, records = res
+            skipped.extend(skipped_entries(entry.rel, records))
+            items.extend(file_items(entry.rel, loc, records, scorer, churn_map, ages, now))
+
+    with profiler.phase("repo_passes"):
+        items.extend(repo_items(index, cfg, scorer))
+
+    with profiler.phase("build_result"):
+        return build_result(repo_root, items, max_items, skipped=skipped, summary_scope=summary_scope)
+
+
+# Repo-level passes over the file index: dependency risk (Node, Python) and test gaps by convention
+def repo_items(index: FileIndex, cfg: Config, scorer: Scorer) -> List[DebtItem]:
+    items: List[DebtItem] = dependency_items(index, cfg, scorer)
+    conv = (cfg.data.get("tests") or {}).get("convention") or {}
+    test_set = set(index.glob(conv.get("test_globs", [])))
+    src_paths = index.glob(conv.get("src_globs", []))
+    items.extend(test_gap_items(src_paths, test_set, scorer))
+    return items
+
+
+def parse_manifest(data: bytes) -> Dict[str, Any]:
+    # Only the dependency sections of package.json are kept (and cached)
+    try:
+        pkg = json.loads(data.decode("utf-8"))
+    except Exception:
+        return {}
+    if not isinstance(pkg, dict):
+        return {}
+    return {key: pkg[key] for key in DEP_KEYS if isinstance(pkg.get(key), dict)}
+
+
+def dependency_items(index: FileIndex, cfg: Config, scorer: Scorer) -> List[DebtItem]:
+    block = cfg.data.get("dependencies") or {}
+    node_cfg = block.get("node") or {}
+    python_cfg = block.get("python") or {}
+    # The lockfile at the repo root is the one package.json installs from
+    locks = [DepGraph(rel, *rec) for rel, rec in index.locks.items()]
+    root_lock = next((g for g in locks if "/" not in g.rel), None)
+    items: List[DebtItem] = []
+    if index.manifest is not None:
+        allow_loose = bool(node_cfg.get("allow_loose_ranges"))
+        items.extend(node_dependency_items(index.manifest, index.used_imports(), scorer, root_lock, allow_loose))
+    for graph in locks:
+        names = set(graph.direct)
+        if graph is root_lock and index.manifest:
+            for key in DEP_KEYS:
+                names.update(index.manifest.get(key, {}))
+        items.extend(duplicate_items(graph, names, scorer))
+    if not python_cfg.get("allow_loose_ranges"):
+        # Only requirements files are expected to pin; a pyproject.toml declares the ranges a
+        # package supports, and `>=` there is normal
+        loose = components(deps_outdated=1.0)
+        loose_score = scorer.score(loose)
+        for rel, deps in index.dep_manifests.items():
+            if os.path.basename(rel) == PYPROJECT:
+                continue
+            for name, spec in deps.items():
+                if loose_python_spec(spec):
                     items.append(
                         DebtItem(
-                            path=rel, kind="config_drift", score=score, meta={"line": ln.strip(), "components": comp}
+                            path=rel,
+                            kind="dep_risk",
+                            score=loose_score,
+                            meta={"dep": name, "version": spec or "*", "reason": "loose_range"},
+                            components=loose,
                         )
                     )
-        if rel.startswith(".github/workflows/") and rel.endswith((".yml", ".yaml")):
-            for ln in lines:
-                if "uses:" in ln:
-                    if not re.search(r"@([a-f0-9]{40})\\b", ln):
-                        comp = {
-                            "inline_priority": 0.0,
-                            "age_days": 0.0,
-                            "churn": 0.0,
-                            "complexity": 0.0,
-                            "deps_outdated": 0.0,
-                            "no_tests": 0.0,
-                            "lint_suppress": 0.0,
-                            "deprecated": 0.3,
-                        }
-                        score = compute_score(comp, weights)
-                        items.append(
-                            DebtItem(
-                                path=rel, kind="config_drift", score=score, meta={"line": ln.strip(), "components": comp}
-                            )
-                        )
+    return items
 
-    # Dependency risk (Node)
-    pkg_json = os.path.join(repo_root, "package.json")
-    if os.path.exists(pkg_json):
-        try:
-            pkg = json.load(open(pkg_json, "r", encoding="utf-8"))
-        except Exception:
-            pkg = {}
-        deps = {}
-        for key in ("dependencies", "devDependencies", "peerDependencies", "optionalDependencies"):
-            deps.update(pkg.get(key, {}))
-        # Loose ranges
-        for name, ver in deps.items():
-            if any(ch in str(ver) for ch in ["^", "~", "*", "x", "X"]):
-                comp = {
-                    "inline_priority": 0.0,
-                    "age_days": 0.0,
-                    "churn": 0.0,
-                    "complexity": 0.0,
-                    "deps_outdated": 1.0,
-                    "no_tests": 0.0,
-                    "lint_suppress": 0.0,
-                    "deprecated": 0.0,
-                }
-                score = compute_score(comp, weights)
-                items.append(
-                    DebtItem(
-                        path="package.json",
-                        kind="dep_risk",
-                        score=score,
-                        meta={"dep": name, "version": ver, "reason": "loose_range", "components": comp},
-                    )
+
+def node_dependency_items(
+    pkg: Dict[str, Any], used: set, scorer: Scorer, lock: Optional[DepGraph] = None, allow_loose: bool = False,
+) -> List[DebtItem]:
+    items: List[DebtItem] = []
+    deps = {}
+    for key in DEP_KEYS:
+        deps.update(pkg.get(key, {}))
+    # Loose ranges, with the version the lockfile pins them to
+    loose = components(deps_outdated=1.0)
+    loose_score = scorer.score(loose)
+    for name, ver in deps.items():
+        if not allow_loose and loose_npm_range(ver):
+            meta = {"dep": name, "version": ver, "reason": "loose_range"}
+            resolved = lock.resolved(name) if lock is not None else None
+            if resolved:
+                meta["resolved"] = resolved
+            items.append(
+                DebtItem(
+                    path="package.json",
+                    kind="dep_risk",
+                    score=loose_score,
+                    meta=meta,
+                    components=loose,
                 )
-        # Unused deps (naive)
-        import_re = re.compile(r"from\\s+['\"]([^'\"]+)['\"]|require\\(\\s*['\"]([^'\"]+)['\"]\\s*\\)")
-        used = set()
-        for abspath in iter_files(repo_root, ignore, excludes):
-            if not abspath.endswith((".js", ".jsx", ".ts", ".tsx")):
-                continue
-            try:
-                txt = open(abspath, "r", encoding="utf-8", errors="ignore").read()
-            except Exception:
+            )
+    # Declared but missing from the lockfile: the lockfile is out of date. Peer dependencies
+    # are not installed by every package manager.
+    if lock is not None:
+        stale = components(deps_outdated=0.9)
+        stale_score = scorer.score(stale)
+        for key in DEP_KEYS:
+            if key == "peerDependencies":
                 continue
-            for m in import_re.finditer(txt):
-                mod = m.group(1) or m.group(2)
-                if mod and not mod.startswith("."):
-                    root = mod.split("/", 2)[:2] if mod.startswith("@") else [mod.split("/", 1)[0]]
-                    used.add("/".join(root) if isinstance(root, list) else root)
-        for name in deps.keys():
-            if name not in used:
-                comp = {
-                    "inline_priority": 0.0,
-                    "age_days": 0.0,
-                    "churn": 0.0,
-                    "complexity": 0.0,
-                    "deps_outdated": 0.7,
-                    "no_tests": 0.0,
-                    "lint_suppress": 0.0,
-                    "deprecated": 0.0,
-                }
-                score = compute_score(comp, weights)
+            for name, ver in pkg.get(key, {}).items():
+                if not lock.has(name) and not NPM_LOCAL_SPEC.match(str(ver)):
+                    items.append(
+                        DebtItem(
+                            path="package.json",
+                            kind="dep_risk",
+                            score=stale_score,
+                            meta={"dep": name, "version": ver, "reason": "not_in_lockfile", "lockfile": lock.rel},
+                            components=stale,
+                        )
+                    )
+    # Unused deps (naive)
+    unused = components(deps_outdated=0.7)
+    unused_score = scorer.score(unused)
+    for name in deps.keys():
+        if name not in used:
+            items.append(
+                DebtItem(
+                    path="package.json",
+                    kind="dep_risk",
+                    score=unused_score,
+                    meta={"dep": name, "reason": "possibly_unused"},
+                    components=unused,
+                )
+            )
+    return items
+
+
+def duplicate_items(graph: DepGraph, names: Iterable[str], scorer: Scorer) -> List[DebtItem]:
+    # Direct dependencies installed in more than one version, and what pulls in the others
+    items: List[DebtItem] = []
+    comp = components(deps_outdated=0.5)
+    score = scorer.score(comp)
+    for name in sorted(names):
+        versions = graph.versions(name)
+        if len(versions) < 2:
+            continue
+        resolved = graph.resolved(name)
+        required_by = sorted({d for v in versions if v != resolved for d in graph.dependents(name, v)})
+        items.append(
+            DebtItem(
+                path=graph.rel,
+                kind="dep_risk",
+                score=score,
+                meta={"dep": name, "versions": versions, "reason": "multiple_versions", "required_by": required_by[:5]},
+                components=comp,
+            )
+        )
+    return items
+
+
+def test_gap_items(src_paths: List[str], test_set: set, scorer: Scorer) -> List[DebtItem]:
+    items: List[DebtItem] = []
+    comp = components(complexity=0.5, no_tests=1.0)
+    score = scorer.score(comp)
+    for rel in src_paths:
+        base = os.path.basename(rel)
+        if base.endswith((".ts", ".py")):
+            stem = base.rsplit(".", 1)[0]
+            candidates = [
+                rel.replace("/src/", "/tests/").replace(".ts", ".test.ts"),
+                rel.replace("/app/", "/tests/").replace(".py", ".py"),
+                os.path.join("tests", f"{stem}.test.ts"),
+                os.path.join("tests", base),
+            ]
+            if not any(c in test_set for c in candidates):
                 items.append(
                     DebtItem(
-                        path="package.json",
-                        kind="dep_risk",
+                        path=rel,
+                        kind="test_gap",
                         score=score,
-                        meta={"dep": name, "reason": "possibly_unused", "components": comp},
+                        meta={"expected_tests": candidates},
+                        components=comp,
                     )
                 )
+    return items
 
-    # Test gaps by convention
-    conv = (cfg.data.get("tests") or {}).get("convention") or {}
-    src_globs = conv.get("src_globs", [])
-    test_globs = conv.get("test_globs", [])
-    test_set = set()
-    for g in test_globs:
-        for p in glob(os.path.join(repo_root, g), recursive=True):
-            test_set.add(os.path.relpath(p, repo_root))
-    for g in src_globs:
-        for p in glob(os.path.join(repo_root, g), recursive=True):
-            rel = os.path.relpath(p, repo_root)
-            base = os.path.basename(rel)
-            if base.endswith((".ts", ".py")):
-                stem = base.rsplit(".", 1)[0]
-                candidates = [
-                    rel.replace("/src/", "/tests/").replace(".ts", ".test.ts"),
-                    rel.replace("/app/", "/tests/").replace(".py", ".py"),
-                    os.path.join("tests", f"{stem}.test.ts"),
-                    os.path.join("tests", base),
-                ]
-                if not any(c in test_set for c in candidates):
-                    comp = {
-                        "inline_priority": 0.0,
-                        "age_days": 0.0,
-                        "churn": 0.0,
-                        "complexity": 0.5,
-                        "deps_outdated": 0.0,
-                        "no_tests": 1.0,
-                        "lint_suppress": 0.0,
-                        "deprecated": 0.0,
-                    }
-                    score = compute_score(comp, weights)
-                    items.append(
-                        DebtItem(
-                            path=rel,
-                            kind="test_gap",
-                            score=score,
-                            meta={"expected_tests": candidates, "components": comp},
-                        )
-                    )
 
-    # Sort by score and cap
-    items.sort(key=lambda it: it.score, reverse=True)
-    items = items[:max_items]
-
-    json_items = []
-    totals = {"count": len(items), "by_kind": {}, "avg_score": 0.0}
-    if items:
-        avg = sum(it.score for it in items) / len(items)
-        totals["avg_score"] = round(avg, 2)
-        for it in items:
-            totals["by_kind"][it.kind] = totals["by_kind"].get(it.kind, 0) + 1
-            meta = dict(it.meta)
-            meta["priority_bucket"] = bucket(it.score)
-            json_items.append(
-                {
-                    "path": it.path,
-                    "kind": it.kind,
-                    "score": it.score,
-                    "meta": meta,
-                    "owner": it.owner,
-                    "status": it.status,
-                }
-            )
+def item_to_json(it: DebtItem) -> Dict[str, Any]:
+    meta = dict(it.meta)
+    meta["components"] = components_dict(it.components)
+    meta["priority_bucket"] = bucket(it.score)
+    d = {
+        "path": it.path,
+        "kind": it.kind,
+        "score": it.score,
+        "meta": meta,
+        "owner": it.owner,
+        "status": it.status,
+    }
+    # Filled in by the trend store (`scan --record`)
+    if it.first_seen is not None:
+        d["first_seen"] = it.first_seen
+        d["last_seen"] = it.last_seen
+    return d
+
+
+def skipped_entries(rel: str, records: List[tuple]) -> List[Dict[str, Any]]:
+    return [{"path": rel, "bytes": rec[1], "reason": "max_file_bytes"} for rec in records if rec[0] == "skipped"]
+
+
+def item_from_json(d: Dict[str, Any]) -> DebtItem:
+    # Inverse of item_to_json(); the bucket is derived from the score again on output
+    meta = dict(d.get("meta") or {})
+    comp = meta.pop("components", None) or {}
+    meta.pop("priority_bucket", None)
+    return DebtItem(
+        path=d.get("path", ""),
+        kind=d.get("kind", ""),
+        score=float(d.get("score", 0.0)),
+        meta=meta,
+        components=tuple(float(comp.get(k, 0.0)) for k in COMPONENTS),
+        owner=d.get("owner"),
+        status=d.get("status", "open"),
+        first_seen=d.get("first_seen"),
+        last_seen=d.get("last_seen"),
+    )
+
+
+def build_result(
+    repo_root: str, items: Iterable[DebtItem], max_items: int, skipped: Optional[List[Dict[str, Any]]] = None,
+    summary_scope: str = "kept", commit_sha: Optional[str] = None,
+) -> Dict[str, Any]:
+    # Keep the top max_items by score (a TopItems collector already did this as it went)
+    top = items if isinstance(items, TopItems) else TopItems(max_items, items)
+    kept = top.items()
 
     result = {
         "repo_root": repo_root,
-        "commit_sha": git_commit_sha(repo_root),
-        "summary": totals,
-        "items": json_items,
+        "commit_sha": commit_sha or git_commit_sha(repo_root),
+        "summary": top.summary(summary_scope, kept),
+        "items": [item_to_json(it) for it in kept],
     }
-    return result
\ No newline at end of file
+    if skipped:
+        result["skipped"] = skipped
+    return result
@@ -1,18 +1,89 @@
 from __future__ import annotations
 import math
-from typing import Dict
+from array import array
+from operator import itemgetter
+from typing import Dict, Any, Iterable, List, Sequence, Tuple
+
+# Score components in their fixed order; DebtItem.components holds the values as a tuple.
+COMPONENTS = (
+    "inline_priority", "age_days", "churn", "complexity", "deps_outdated", "no_tests", "lint_suppress", "deprecated",
+)
+_COMPONENT_SET = frozenset(COMPONENTS)
+_COMPONENT_ROW = itemgetter(*COMPONENTS)
+
+
+def _numpy():
+    # Optional and slow to import, so only batch scoring loads it, on first use; without it
+    # batch scoring falls back to plain Python. Scans score item by item and never load it.
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
 
 
 def sigmoid(x: float) -> float:
     return 1.0 / (1.0 + math.exp(-x))
 
 
-def compute_score(components: Dict[str, float], weights: Dict[str, float]) -> float:
-    wsum = 0.0
-    for k, v in components.items():
-        w = weights.get(k, 0.0)
-        wsum += w * v
-    return round(100.0 * sigmoid(wsum), 2)
+def components(**values: float) -> Tuple[float, ...]:
+    # Component tuple in COMPONENTS order; anything not given is 0.0
+    for k in values:
+        if k not in _COMPONENT_SET:
+            raise ValueError(f"unknown score component: {k}")
+    return tuple([values.get(k, 0.0) for k in COMPONENTS])
+
+
+def components_dict(values: Tuple[float, ...]) -> Dict[str, float]:
+    return dict(zip(COMPONENTS, values))
+
+
+def component_matrix(rows: Iterable[Sequence[float]]):
+    # Rows of component values (COMPONENTS order) packed column-ready: a float64 ndarray
+    # of shape (n, len(COMPONENTS)) with numpy, else a flat row-major array('d').
+    flat = array("d")
+    for row in rows:
+        if len(row) != len(COMPONENTS):
+            raise ValueError(f"expected {len(COMPONENTS)} components, got {len(row)}")
+        flat.extend(row)
+    np = _numpy()
+    if np is not None:
+        return np.frombuffer(flat, dtype=np.float64).reshape(-1, len(COMPONENTS))
+    return flat
+
+
+# Weights resolved once into a vector in COMPONENTS order. score() is the per-item path used
+# while scanning; score_matrix()/buckets() score a whole component matrix in one pass, which
+# is what re-weighting a saved result needs. Both sum the terms in COMPONENTS order, so
+# every path gives the same scores.
+class Scorer:
+    def __init__(self, weights: Dict[str, float]):
+        self.weights = tuple(float(weights.get(k, 0.0)) for k in COMPONENTS)
+
+    def score(self, values: Sequence[float]) -> float:
+        wsum = 0.0
+        for w, v in zip(self.weights, values):
+            wsum += w * v
+        return round(100.0 * sigmoid(wsum), 2)
+
+    def score_matrix(self, matrix) -> Sequence[float]:
+        width = len(COMPONENTS)
+        np = _numpy()
+        if np is not None:
+            m = np.asarray(matrix, dtype=np.float64).reshape(-1, width)
+            wsum = np.zeros(m.shape[0])
+            for j, w in enumerate(self.weights):  # column by column keeps the scalar summation order
+                wsum += w * m[:, j]
+            return np.round(100.0 * (1.0 / (1.0 + np.exp(-wsum))), 2)
+        if isinstance(matrix, array):
+            return [self.score(matrix[i : i + width]) for i in range(0, len(matrix), width)]
+        return [self.score(row) for row in matrix]
+
+    def buckets(self, scores: Sequence[float]) -> List[str]:
+        np = _numpy()
+        if np is not None and isinstance(scores, np.ndarray):
+            return np.where(scores >= 70.0, "P1", np.where(scores >= 40.0, "P2", "P3")).tolist()
+        return [bucket(s) for s in scores]
 
 
 def bucket(score: float) -> str:
@@ -20,4 +91,29 @@ def bucket(score: float) -> str:
         return "P1"
     if score >= 40.0:
         return "P2"
-    return "P3"
\ No newline at end of file
+    return "P3"
+
+
+def _json_components(item: Dict[str, Any]) -> Tuple[float, ...]:
+    comp = (item.get("meta") or {}).get("components") or {}
+    try:
+        return _COMPONENT_ROW(comp)
+    except KeyError:
+        return tuple(comp.get(k, 0.0) for k in COMPONENTS)
+
+
+def rescore_items(items: List[Dict[str, Any]], weights: Dict[str, float]) -> List[Dict[str, Any]]:
+    # Re-weight serialized report items (tech-debt.json) in place from their meta.components,
+    # scoring and bucketing all of them in one batch.
+    scorer = Scorer(weights)
+    matrix = component_matrix(_json_components(it) for it in items)
+    scores = scorer.score_matrix(matrix)
+    buckets = scorer.buckets(scores)
+    np = _numpy()
+    if np is not None and isinstance(scores, np.ndarray):
+        scores = scores.tolist()
+    for it, score, b in zip(items, scores, buckets):
+        it["score"] = score
+        it.setdefault("meta", {})["priority_bucket"] = b
+    return items
+
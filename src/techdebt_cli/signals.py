@@ -1,14 +1,17 @@
 from __future__ import annotations
+import hashlib
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 
 
-@dataclass
+# Slotted: a scan can create hundreds of thousands of these before the top-K cut
+@dataclass(slots=True)
 class DebtItem:
     path: str
     kind: str  # inline_marker|dep_risk|test_gap|complexity|lint_suppress|churn|generated|deprecated|config_drift
     score: float
     meta: Dict[str, Any] = field(default_factory=dict)
+    components: Tuple[float, ...] = ()  # values in scoring.COMPONENTS order
     first_seen: Optional[str] = None
     last_seen: Optional[str] = None
     status: str = "open"
@@ -21,4 +24,15 @@ class ScanResult:
     repo_root: str
     commit_sha: Optional[str]
     items: List[DebtItem] = field(default_factory=list)
-    summary: Dict[str, Any] = field(default_factory=dict)
\ No newline at end of file
+    summary: Dict[str, Any] = field(default_factory=dict)
+
+# Kinds reported once per file; their snippet is just the first hit, not an identity.
+FILE_LEVEL_KINDS = {"lint_suppress", "deprecated", "generated_artifact", "test_gap"}
+
+
+def fingerprint(path: str, kind: str, meta: Dict[str, Any]) -> str:
+    # Stable identity of an item across scans. Line numbers and scores are left out so
+    # that edits elsewhere in the file do not make an existing item look new.
+    anchor = "" if kind in FILE_LEVEL_KINDS else str(meta.get("snippet") or "").strip()
+    ident = "\0".join([path, kind, anchor, str(meta.get("dep") or ""), str(meta.get("reason") or "")])
+    return hashlib.sha1(ident.encode("utf-8")).hexdigest()
@@ -0,0 +1,255 @@
+from __future__ import annotations
+import os, json, sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+from .signals import fingerprint
+from .utils import run
+
+TREND_DB = "techdebt-trends.sqlite"
+SCHEMA_VERSION = 1
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"  # sorts as text, and SQLite's date functions read it
+
+# One row per recorded scan (one per commit), one per distinct item ever seen, and the
+# scan x item observations linking them. first_seen / last_seen / status / resolved_at are
+# derived from the observations and kept on the item row, where the indexes below make the
+# trend queries range scans instead of passes over every observation.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    commit_sha TEXT UNIQUE,
+    at TEXT NOT NULL,
+    item_count INTEGER NOT NULL,
+    avg_score REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scans_at ON scans(at);
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    fingerprint TEXT NOT NULL UNIQUE,
+    path TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    score REAL NOT NULL,
+    meta TEXT NOT NULL,
+    first_seen TEXT,
+    last_seen TEXT,
+    status TEXT NOT NULL DEFAULT 'open',
+    resolved_at TEXT
+);
+CREATE INDEX IF NOT EXISTS items_status_first_seen ON items(status, first_seen);
+CREATE INDEX IF NOT EXISTS items_first_seen ON items(first_seen);
+CREATE INDEX IF NOT EXISTS items_resolved_at ON items(resolved_at);
+CREATE INDEX IF NOT EXISTS items_path ON items(path);
+CREATE TABLE IF NOT EXISTS observations (
+    scan_id INTEGER NOT NULL REFERENCES scans(id),
+    item_id INTEGER NOT NULL REFERENCES items(id),
+    score REAL NOT NULL,
+    PRIMARY KEY (scan_id, item_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS observations_item ON observations(item_id, scan_id);
+"""
+
+
+def default_db_path(repo_root: str) -> str:
+    git_dir = run(["git", "rev-parse", "--git-dir"], cwd=repo_root).strip()
+    if git_dir:
+        return os.path.join(repo_root, git_dir, TREND_DB)
+    return os.path.join(repo_root, "." + TREND_DB)
+
+
+def format_time(when: datetime) -> str:
+    return when.strftime(TIME_FORMAT)
+
+
+def item_keys(items: List[Dict[str, Any]]) -> List[str]:
+    # fingerprint() per item; repeats within one scan (the same TODO text twice in a file)
+    # get "#2", "#3", ... so each occurrence is tracked on its own
+    seen: Dict[str, int] = {}
+    keys = []
+    for it in items:
+        fp = fingerprint(it.get("path", ""), it.get("kind", ""), it.get("meta") or {})
+        n = seen.get(fp, 0) + 1
+        seen[fp] = n
+        keys.append(fp if n == 1 else f"{fp}#{n}")
+    return keys
+
+
+def _week(column: str) -> str:
+    # The Monday starting the week `column` falls in
+    return f"date({column}, 'weekday 0', '-6 days')"
+
+
+# Local SQLite history of scans. record() stores one scan keyed by its commit (recording the
+# same commit again replaces it) and fills first_seen / last_seen / status into the report;
+# the query methods answer from the indexes without loading any report.
+class TrendStore:
+    def __init__(self, path: str):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA foreign_keys=ON")
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            raise ValueError(f"{path}: trend store schema {version}, expected {SCHEMA_VERSION}")
+        with self.db:
+            self.db.executescript(SCHEMA)
+            self.db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self.db.execute("CREATE TEMP TABLE IF NOT EXISTS touched (id INTEGER PRIMARY KEY)")
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self) -> "TrendStore":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def has_scan(self, commit_sha: str) -> bool:
+        return self.db.execute("SELECT 1 FROM scans WHERE commit_sha = ?", (commit_sha,)).fetchone() is not None
+
+    def latest(self) -> Optional[str]:
+        return self.db.execute("SELECT MAX(at) FROM scans").fetchone()[0]
+
+    def record(self, result: Dict[str, Any], at: datetime, items: Optional[List[Dict[str, Any]]] = None) -> int:
+        # `items` is everything the scan found (default: the reported items). A report cut to
+        # --max-items must pass the uncapped list, or items that only fell under the cut would
+        # be resolved. Scans may arrive out of order (backfills): every item this scan can
+        # affect is collected in `touched` and its derived columns are brought up to date together.
+        reported = result.get("items") or []
+        items = reported if items is None else items
+        keys = item_keys(items)
+        when = format_time(at)
+        sha = result.get("commit_sha")
+        count = len(items)
+        avg = round(sum(it.get("score", 0.0) for it in items) / count, 2) if count else 0.0
+        db = self.db
+        with db:
+            latest = self.latest()
+            row = db.execute("SELECT id FROM scans WHERE commit_sha = ?", (sha,)).fetchone() if sha else None
+            replaced = row is not None
+            if replaced:
+                scan_id = row[0]
+                db.execute(
+                    "UPDATE scans SET at = ?, item_count = ?, avg_score = ? WHERE id = ?",
+                    (when, count, avg, scan_id),
+                )
+                db.execute(
+                    "INSERT OR IGNORE INTO touched SELECT item_id FROM observations WHERE scan_id = ?", (scan_id,)
+                )
+                db.execute("DELETE FROM observations WHERE scan_id = ?", (scan_id,))
+            else:
+                scan_id = db.execute(
+                    "INSERT INTO scans (commit_sha, at, item_count, avg_score) VALUES (?, ?, ?, ?)",
+                    (sha, when, count, avg),
+                ).lastrowid
+            db.executemany(
+                "INSERT INTO items (fingerprint, path, kind, score, meta, first_seen, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (fingerprint) DO UPDATE SET "
+                "score = iif(excluded.last_seen >= last_seen, excluded.score, score), "
+                "meta = iif(excluded.last_seen >= last_seen, excluded.meta, meta), "
+                "first_seen = min(first_seen, excluded.first_seen), "
+                "last_seen = max(last_seen, excluded.last_seen)",
+                (
+                    (key, it.get("path", ""), it.get("kind", ""), it.get("score", 0.0), _meta(it), when, when)
+                    for key, it in zip(keys, items)
+                ),
+            )
+            db.executemany(
+                "INSERT OR REPLACE INTO observations (scan_id, item_id, score) "
+                "SELECT ?, id, ? FROM items WHERE fingerprint = ?",
+                ((scan_id, it.get("score", 0.0), key) for key, it in zip(keys, items)),
+            )
+            db.execute("INSERT OR IGNORE INTO touched SELECT item_id FROM observations WHERE scan_id = ?", (scan_id,))
+            if latest is None or when >= latest:
+                # Open items this (newest) scan no longer has are now resolved
+                db.execute("INSERT OR IGNORE INTO touched SELECT id FROM items WHERE status = 'open'")
+            else:
+                # An older scan slotted in: it may be the new "first scan without" for resolved items
+                db.execute(
+                    "INSERT OR IGNORE INTO touched SELECT id FROM items WHERE resolved_at > ? AND last_seen < ?",
+                    (when, when),
+                )
+            self._derive(recompute=replaced)
+        self._annotate(result, keys if items is reported else item_keys(reported), scan_id)
+        return scan_id
+
+    def _derive(self, recompute: bool):
+        # Adding a scan only widens first_seen/last_seen (the upsert does that); replacing one
+        # can also narrow them, so then they are rebuilt from the observations.
+        db = self.db
+        if recompute:
+            db.execute(
+                "UPDATE items SET "
+                "first_seen = (SELECT MIN(s.at) FROM observations o JOIN scans s ON s.id = o.scan_id "
+                "WHERE o.item_id = items.id), "
+                "last_seen = (SELECT MAX(s.at) FROM observations o JOIN scans s ON s.id = o.scan_id "
+                "WHERE o.item_id = items.id) "
+                "WHERE id IN (SELECT id FROM touched)"
+            )
+            db.execute("DELETE FROM items WHERE id IN (SELECT id FROM touched) AND first_seen IS NULL")
+        latest = self.latest()
+        db.execute(
+            "UPDATE items SET "
+            "status = CASE WHEN last_seen = :latest THEN 'open' ELSE 'resolved' END, "
+            "resolved_at = CASE WHEN last_seen = :latest THEN NULL "
+            "ELSE (SELECT MIN(at) FROM scans WHERE at > items.last_seen) END "
+            "WHERE id IN (SELECT id FROM touched)",
+            {"latest": latest},
+        )
+        db.execute("DELETE FROM touched")
+
+    def _annotate(self, result: Dict[str, Any], keys: List[str], scan_id: int):
+        rows = self.db.execute(
+            "SELECT i.fingerprint, i.first_seen, i.last_seen, i.status FROM observations o "
+            "JOIN items i ON i.id = o.item_id WHERE o.scan_id = ?",
+            (scan_id,),
+        )
+        seen = {fp: (first, last, status) for fp, first, last, status in rows}
+        for key, it in zip(keys, result.get("items") or []):
+            first, last, status = seen[key]
+            it["status"] = status
+            it["first_seen"] = first
+            it["last_seen"] = last
+
+    def weekly(self, weeks: int = 12) -> List[Dict[str, Any]]:
+        # Items first seen / resolved per week, over the `weeks` before the latest scan
+        latest = self.latest()
+        if latest is None:
+            return []
+        since = format_time(datetime.strptime(latest, TIME_FORMAT) - timedelta(weeks=weeks))
+        rows: Dict[str, Dict[str, Any]] = {}
+        for column, key in (("first_seen", "added"), ("resolved_at", "resolved")):
+            query = f"SELECT {_week(column)} AS week, COUNT(*) FROM items WHERE {column} >= ? GROUP BY week"
+            for week, n in self.db.execute(query, (since,)):
+                rows.setdefault(week, {"week": week, "added": 0, "resolved": 0})[key] = n
+        return [rows[w] for w in sorted(rows)]
+
+    def open_longest(self, limit: int = 20) -> List[Dict[str, Any]]:
+        rows = self.db.execute(
+            "SELECT path, kind, score, meta, first_seen, last_seen FROM items "
+            "WHERE status = 'open' ORDER BY first_seen LIMIT ?",
+            (limit,),
+        )
+        return [
+            {"path": p, "kind": k, "score": s, "meta": json.loads(m), "first_seen": f, "last_seen": l}
+            for p, k, s, m, f, l in rows
+        ]
+
+    def scans(self, limit: int = 20) -> List[Dict[str, Any]]:
+        rows = self.db.execute(
+            "SELECT commit_sha, at, item_count, avg_score FROM scans ORDER BY at DESC LIMIT ?", (limit,)
+        )
+        return [{"commit_sha": c, "at": a, "count": n, "avg_score": s} for c, a, n, s in rows]
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "scans": self.db.execute("SELECT COUNT(*) FROM scans").fetchone()[0],
+            "open": self.db.execute("SELECT COUNT(*) FROM items WHERE status = 'open'").fetchone()[0],
+            "resolved": self.db.execute("SELECT COUNT(*) FROM items WHERE status = 'resolved'").fetchone()[0],
+        }
+
+
+def _meta(it: Dict[str, Any]) -> str:
+    # What a trend listing shows; scoring components stay in the reports
+    meta = it.get("meta") or {}
+    return json.dumps({k: meta[k] for k in ("line", "snippet", "dep", "reason") if k in meta})
@@ -1,14 +1,21 @@
 from __future__ import annotations
 import os, subprocess, json, re
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional, Iterable
-from pathspec import PathSpec
+from typing import Dict, Any, List, Optional, Iterator, Tuple
 
 TEXT_EXT = {
     ".py", ".ts", ".tsx", ".js", ".jsx", ".json", ".yml", ".yaml", ".md", ".txt", ".toml", ".ini", ".env",
     ".java", ".go", ".rs", ".cpp", ".c", ".h", ".hpp", ".cs", ".rb", ".php", ".sh", ".bat", ".ps1", ".dockerfile",
 }
 
+# Processes started by run()/run_lines()/GitCatFile, by executable name (read by the profiler)
+SPAWNED: Counter = Counter()
+
+
+def _spawned(cmd: List[str]):
+    SPAWNED[os.path.basename(cmd[0])] += 1
+
 
 def find_repo_root(start: str) -> str:
     start = os.path.abspath(start)
@@ -20,43 +27,36 @@ def find_repo_root(start: str) -> str:
     return start
 
 
-def load_gitignore(repo_root: str) -> PathSpec:
-    path = os.path.join(repo_root, ".gitignore")
-    if os.path.exists(path):
-        with open(path, "r", encoding="utf-8") as f:
-            return PathSpec.from_lines("gitwildmatch", f)
-    return PathSpec.from_lines("gitwildmatch", [])
-
-
-def is_text_file(path: str) -> bool:
+def is_text_blob(path: str, data: bytes) -> bool:
     _, ext = os.path.splitext(path.lower())
-    if ext in TEXT_EXT:
-        return True
-    try:
-        with open(path, "rb") as f:
-            chunk = f.read(2048)
-        if b"\0" in chunk:
-            return False
-        return True
-    except Exception:
-        return False
-
-
-def iter_files(repo_root: str, ignore: PathSpec, excludes: List[str]) -> Iterable[str]:
-    exclude_spec = PathSpec.from_lines("gitwildmatch", excludes or [])
-    for root, dirs, files in os.walk(repo_root):
-        # Always skip the Git metadata directory
-        dirs[:] = [d for d in dirs if not d.startswith(".git")]
-        if os.path.relpath(root, repo_root).startswith(".git"):
-            continue
-        for name in files:
-            rel = os.path.relpath(os.path.join(root, name), repo_root)
-            if ignore.match_file(rel) or exclude_spec.match_file(rel):
-                continue
-            yield os.path.join(repo_root, rel)
+    return ext in TEXT_EXT or b"\0" not in data[:2048]
+
+
+def glob_to_regex(pattern: str) -> "re.Pattern[str]":
+    # glob(recursive=True) semantics for matching repo-relative paths that are not on disk
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(out) + r"\Z")
 
 
 def run(cmd: List[str], cwd: Optional[str] = None, timeout: int = 30) -> str:
+    _spawned(cmd)
     try:
         res = subprocess.run(
             cmd,
@@ -72,13 +72,82 @@ def run(cmd: List[str], cwd: Optional[str] = None, timeout: int = 30) -> str:
         return ""
 
 
+def run_lines(cmd: List[str], cwd: Optional[str] = None) -> Iterator[str]:
+    # Streaming variant of run(): yields stdout lines as git produces them, so callers
+    # can stop early without buffering the whole output. Closing the generator kills git.
+    _spawned(cmd)
+    try:
+        proc = subprocess.Popen(
+            cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, errors="replace"
+        )
+    except Exception:
+        return
+    try:
+        for line in proc.stdout:
+            yield line.rstrip("\n")
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        proc.wait()
+
+
+class GitCatFile:
+    # One long-lived `git cat-file --batch` pipe for reading many objects (e.g. "<rev>:<path>")
+    # without a process per file.
+    def __init__(self, repo_root: str):
+        _spawned(["git"])
+        self.proc = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=repo_root,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def read(self, obj: str) -> Optional[bytes]:
+        return self.read_sized(obj)[1]
+
+    def read_sized(self, obj: str, max_size: Optional[int] = None) -> Tuple[int, Optional[bytes]]:
+        # (size, content). Content is None for a missing object, or for one larger than
+        # `max_size`, whose bytes are then drained from the pipe without being kept.
+        self.proc.stdin.write(obj.encode("utf-8") + b"\n")
+        self.proc.stdin.flush()
+        header = self.proc.stdout.readline().split()
+        if len(header) != 3 or not header[2].isdigit():
+            return 0, None
+        size = int(header[2])
+        if max_size is not None and size > max_size:
+            left = size + 1
+            while left > 0:
+                chunk = self.proc.stdout.read(min(left, 1 << 20))
+                if not chunk:
+                    break
+                left -= len(chunk)
+            return size, None
+        data = self.proc.stdout.read(size)
+        self.proc.stdout.read(1)
+        return size, data
+
+    def close(self):
+        if self.proc.poll() is None:
+            self.proc.stdin.close()
+            self.proc.wait()
+
+    def __enter__(self) -> "GitCatFile":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
 def git_commit_sha(repo_root: str) -> Optional[str]:
     out = run(["git", "rev-parse", "HEAD"], cwd=repo_root).strip()
     return out or None
 
 
-def git_last_modified(repo_root: str, rel_path: str) -> Optional[datetime]:
-    out = run(["git", "log", "-1", "--format=%ct", "--", rel_path], cwd=repo_root).strip()
+def git_commit_time(repo_root: str, ref: str = "HEAD") -> Optional[datetime]:
+    out = run(["git", "show", "-s", "--format=%ct", ref], cwd=repo_root).strip()
     if out.isdigit():
         return datetime.utcfromtimestamp(int(out))
     return None
@@ -101,10 +170,40 @@ def git_churn(repo_root: str, since_days: int) -> Dict[str, int]:
 def write_json(result: Any, repo_root: str):
     path = os.path.join(repo_root, "tech-debt.json")
     with open(path, "w", encoding="utf-8") as f:
+        # json.dump writes as it encodes; the text is never built in memory as a whole
         json.dump(result, f, indent=2, default=str)
     print(f"Wrote {path}")
 
 
+def ndjson_records(result: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    # Header with the summary first, then one record per item (and per delta/skipped entry),
+    # then an end marker, so a consumer tailing the file knows when it is complete.
+    header = {k: v for k, v in result.items() if k not in ("items", "skipped", "delta")}
+    delta = result.get("delta")
+    if delta:
+        header["delta"] = {k: v for k, v in delta.items() if k not in ("added", "removed")}
+    yield dict({"type": "header"}, **header)
+    n = 0
+    for it in result.get("items", ()):
+        n += 1
+        yield dict({"type": "item"}, **it)
+    for key in ("added", "removed"):
+        for it in (delta or {}).get(key, ()):
+            yield dict({"type": key}, **it)
+    for entry in result.get("skipped") or ():
+        yield dict({"type": "skipped"}, **entry)
+    yield {"type": "end", "items": n}
+
+
+def write_ndjson(result: Any, repo_root: str):
+    path = os.path.join(repo_root, "tech-debt.ndjson")
+    with open(path, "w", encoding="utf-8") as f:
+        for rec in ndjson_records(result):
+            f.write(json.dumps(rec, separators=(",", ":"), default=str))
+            f.write("\n")
+    print(f"Wrote {path}")
+
+
 def create_umbrella_issue(result: Any, repo_root: str, assignee: Optional[str] = None):
     items = result.get("items", [])[:50]
     title = "Tech Debt Report"
@@ -0,0 +1,145 @@
+from __future__ import annotations
+import os, stat
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from .utils import run
+
+if TYPE_CHECKING:
+    from pathspec import PathSpec
+
+WALK_BACKENDS = ("scandir", "git")
+
+
+class FileEntry(NamedTuple):
+    rel: str  # repo-relative, always "/"-separated
+    abspath: str
+    size: int
+    mtime_ns: int
+
+
+def _compile(lines: Iterable[str]) -> PathSpec:
+    # pathspec is imported on first use: commands that never walk a tree skip it
+    from pathspec import PathSpec
+
+    return PathSpec.from_lines("gitwildmatch", lines)
+
+
+# Git-style ignore rules for one repo: .git/info/exclude, the root .gitignore and every
+# nested .gitignore (relative to its own directory), plus the config `exclude` globs.
+# Each .gitignore is parsed once and directory decisions are memoized, so a pruned
+# directory costs one lookup and nothing below it is ever visited.
+class IgnoreRules:
+    def __init__(self, repo_root: str, excludes: Optional[List[str]] = None):
+        self.repo_root = repo_root
+        self.exclude_spec = _compile(excludes or [])
+        self._specs: Dict[str, List[PathSpec]] = {}
+        self._dirs: Dict[str, bool] = {"": False}
+
+    def _read_spec(self, path: str) -> Optional[PathSpec]:
+        try:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                spec = _compile(f)
+        except OSError:
+            return None
+        return spec if len(spec) else None
+
+    def _dir_specs(self, d: str) -> List[PathSpec]:
+        # Specs whose patterns are relative to directory `d`, lowest precedence first
+        specs = self._specs.get(d)
+        if specs is None:
+            specs = []
+            if d == "":
+                info = self._read_spec(os.path.join(self.repo_root, ".git", "info", "exclude"))
+                if info is not None:
+                    specs.append(info)
+            spec = self._read_spec(os.path.join(self.repo_root, d, ".gitignore"))
+            if spec is not None:
+                specs.append(spec)
+            self._specs[d] = specs
+        return specs
+
+    def _gitignored(self, rel: str, is_dir: bool) -> bool:
+        # Walk the .gitignore files from the root down to the path's parent; the last
+        # matching pattern wins, so nested files and `!negations` override outer ones.
+        parent = rel.rsplit("/", 1)[0] if "/" in rel else ""
+        dirs = [""]
+        if parent:
+            parts = parent.split("/")
+            dirs += ["/".join(parts[: i + 1]) for i in range(len(parts))]
+        ignored = False
+        for d in dirs:
+            sub = rel[len(d) + 1 :] if d else rel
+            if is_dir:
+                sub += "/"
+            for spec in self._dir_specs(d):
+                res = spec.check_file(sub)
+                if res.include is not None:
+                    ignored = res.include
+        return ignored
+
+    def dir_ignored(self, rel: str) -> bool:
+        hit = self._dirs.get(rel)
+        if hit is None:
+            parent = rel.rsplit("/", 1)[0] if "/" in rel else ""
+            hit = self.dir_ignored(parent) or self.exclude_spec.match_file(rel + "/") or self._gitignored(rel, True)
+            self._dirs[rel] = hit
+        return hit
+
+    def file_ignored(self, rel: str) -> bool:
+        parent = rel.rsplit("/", 1)[0] if "/" in rel else ""
+        return self.dir_ignored(parent) or self.exclude_spec.match_file(rel) or self._gitignored(rel, False)
+
+
+def _walk_scandir(rules: IgnoreRules, rel_dir: str, abs_dir: str) -> Iterator[FileEntry]:
+    # Entries are visited in name order, so the walk order (and with it the report) is stable
+    # across machines and identical to the sorted `git ls-files` backend.
+    try:
+        with os.scandir(abs_dir) as it:
+            entries = sorted(it, key=lambda e: e.name)
+    except OSError:
+        return
+    for entry in entries:
+        if entry.name == ".git":
+            continue  # repository metadata (a directory, or a file in worktrees/submodules)
+        rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                if not rules.dir_ignored(rel):
+                    yield from _walk_scandir(rules, rel, entry.path)
+                continue
+            if entry.is_symlink() and os.path.isdir(entry.path):
+                continue
+            if rules.file_ignored(rel):
+                continue
+            st = entry.stat()
+        except OSError:
+            continue
+        yield FileEntry(rel, entry.path, st.st_size, st.st_mtime_ns)
+
+
+def _walk_git(repo_root: str, rules: IgnoreRules) -> Iterator[FileEntry]:
+    # Let git enumerate tracked + untracked-but-not-ignored files; only config excludes remain
+    out = run(["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"], cwd=repo_root, timeout=300)
+    paths = sorted({rel for rel in out.split("\0") if rel}, key=lambda rel: rel.split("/"))
+    for rel in paths:
+        if rules.exclude_spec.match_file(rel):
+            continue
+        abspath = os.path.join(repo_root, rel)
+        try:
+            st = os.stat(abspath)
+        except OSError:
+            continue  # deleted in the worktree but still in the index
+        if not stat.S_ISREG(st.st_mode):
+            continue
+        yield FileEntry(rel, abspath, st.st_size, st.st_mtime_ns)
+
+
+def walk_files(
+    repo_root: str,
+    excludes: Optional[List[str]] = None,
+    backend: str = "scandir",
+    rules: Optional[IgnoreRules] = None,
+) -> Iterator[FileEntry]:
+    rules = rules or IgnoreRules(repo_root, excludes)
+    if backend == "git" and os.path.exists(os.path.join(repo_root, ".git")):
+        return _walk_git(repo_root, rules)
+    return _walk_scandir(rules, "", repo_root)
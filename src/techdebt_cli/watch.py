@@ -0,0 +1,370 @@
+from __future__ import annotations
+import os, re, json, math, stat, time, threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlparse
+from .age import AgeEngine
+from .collector import TopItems
+from .config import CONFIG_FILE, load_config
+from .fileindex import FileIndex
+from .scanner import (
+    AnalyzeOptions, build_result, file_items, item_to_json, iter_analyzed, repo_items, skipped_entries,
+)
+from .scoring import Scorer
+from .signals import DebtItem
+from .utils import git_churn, run
+from .walker import FileEntry, IgnoreRules, walk_files
+
+try:  # optional: OS change notifications (inotify, FSEvents, ...) instead of polling
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+DEFAULT_PORT = 8765
+DEFAULT_INTERVAL = 1.0
+SETTLE_S = 0.1  # editors save in bursts (temp file, rename, chmod); let them land together
+MAX_WAIT_S = 300
+# Reports `watch --json/--markdown` rewrites; left out of the index so writing them is not a change
+OUTPUT_FILE = re.compile(r"(tech-debt\.json|TECH_DEBT(-\d+)?\.md)\Z")
+
+
+def _walk_key(rel: str) -> List[str]:
+    # The order walk_files() yields paths in, so ties rank exactly like a one-shot scan
+    return rel.split("/")
+
+
+def _stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class Snapshot(NamedTuple):
+    version: int
+    result: Dict[str, Any]
+    body: bytes  # the result as JSON, encoded once per version rather than once per request
+    updated: float
+
+
+# A scan that stays in memory: walk entries, per-file analyze results and scored items,
+# churn and age data. refresh() re-reads only the files whose size or mtime moved, re-scores
+# everything without reading when HEAD moves, and starts over when .techdebt.yml changes.
+# The repo-level passes and the top-N cut are redone from memory on every change, so each
+# snapshot matches what `techdebt scan` would report for the same tree.
+class LiveIndex:
+    def __init__(
+        self, repo_root: str, since_days: int = 30, max_items: int = 2000, age_mode: str = "file",
+        summary_scope: str = "kept", jobs: int = 1, skip_outputs: bool = False,
+    ):
+        self.repo_root = repo_root
+        self.since_days = since_days
+        self.max_items = max_items
+        self.age_mode = age_mode
+        self.summary_scope = summary_scope
+        self.jobs = jobs
+        self.skip_outputs = skip_outputs
+        self.git_dir = run(["git", "rev-parse", "--absolute-git-dir"], cwd=repo_root).strip()
+        self.snapshot = Snapshot(0, {}, b"{}", 0.0)
+        self.last_update: Dict[str, Any] = {}
+        self._entries: Dict[str, FileEntry] = {}
+        self._results: Dict[str, Optional[Tuple[int, List[tuple]]]] = {}
+        self._items: Dict[str, List[DebtItem]] = {}
+        self._repo_items: List[DebtItem] = []
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        with self._lock:
+            self._load()
+
+    def _load(self):
+        # Config, ignore rules and history from scratch, then every file
+        start = time.perf_counter()
+        self._config_stamp = _stamp(os.path.join(self.repo_root, CONFIG_FILE))
+        self.cfg = load_config(self.repo_root)
+        self.opts = AnalyzeOptions.from_config(self.cfg)
+        self.scorer = Scorer(self.cfg.data.get("weights", {}))
+        self.rules = IgnoreRules(self.repo_root, self.cfg.data.get("exclude", []))
+        self._entries.clear()
+        self._results.clear()
+        self._items.clear()
+        self._load_history()
+        analyzed = self._sync(*self._walk_changes(), rewalk=False)
+        self._publish(start, analyzed, "load")
+
+    def _git_state(self) -> Tuple[Any, ...]:
+        # HEAD and its reflog move on commit, checkout, reset and merge; stat them, don't spawn git
+        if not self.git_dir:
+            return ()
+        return _stamp(os.path.join(self.git_dir, "HEAD")), _stamp(os.path.join(self.git_dir, "logs", "HEAD"))
+
+    def _load_history(self):
+        self.git_state = self._git_state()
+        self.churn_map = git_churn(self.repo_root, self.since_days)
+        self.ages = AgeEngine(self.repo_root, mode=self.age_mode)
+        self.now = datetime.utcnow()
+
+    def _score(self, rel: str, res: Optional[Tuple[int, List[tuple]]]) -> List[DebtItem]:
+        if res is None:
+            return []
+        return file_items(rel, res[0], res[1], self.scorer, self.churn_map, self.ages, self.now)
+
+    def _walk_changes(self) -> Tuple[List[FileEntry], List[str]]:
+        # Full stat walk; nothing is read
+        seen: Dict[str, FileEntry] = {}
+        for entry in walk_files(self.repo_root, rules=self.rules):
+            if not (self.skip_outputs and OUTPUT_FILE.match(entry.rel)):
+                seen[entry.rel] = entry
+        changed = [e for rel, e in seen.items() if self._entries.get(rel) != e]
+        removed = [rel for rel in self._entries if rel not in seen]
+        return changed, removed
+
+    def _stat_changes(self, rels: Set[str]) -> Tuple[List[FileEntry], List[str]]:
+        # Only the paths a change notification named
+        changed: List[FileEntry] = []
+        removed: List[str] = []
+        for rel in sorted(rels):
+            abspath = os.path.join(self.repo_root, rel)
+            try:
+                st = os.stat(abspath)
+            except OSError:
+                st = None
+            if st is None or not stat.S_ISREG(st.st_mode) or self._ignored(rel):
+                if rel in self._entries:
+                    removed.append(rel)
+                continue
+            entry = FileEntry(rel, abspath, st.st_size, st.st_mtime_ns)
+            if self._entries.get(rel) != entry:
+                changed.append(entry)
+        return changed, removed
+
+    def _ignored(self, rel: str) -> bool:
+        return bool(self.skip_outputs and OUTPUT_FILE.match(rel)) or self.rules.file_ignored(rel)
+
+    def _sync(self, changed: List[FileEntry], removed: List[str], rewalk: bool = True) -> int:
+        # Re-analyze what changed; returns how many files were read or dropped
+        for rel in removed:
+            del self._entries[rel]
+            del self._results[rel]
+            del self._items[rel]
+        jobs = [(e.abspath, e.rel) for e in changed]
+        for entry, res in zip(changed, iter_analyzed(jobs, workers=self.jobs, opts=self.opts)):
+            self._entries[entry.rel] = entry
+            self._results[entry.rel] = res
+            self.ages.forget(entry.rel)
+            self._items[entry.rel] = self._score(entry.rel, res)
+        analyzed = len(changed)
+        touched = [e.rel for e in changed] + removed
+        if rewalk and any(os.path.basename(rel) == ".gitignore" for rel in touched):
+            # Different ignore rules can bring files in or drop them anywhere in the tree
+            self.rules = IgnoreRules(self.repo_root, self.cfg.data.get("exclude", []))
+            more = self._walk_changes()
+            if more[0] or more[1]:
+                analyzed += self._sync(*more)
+        return analyzed + len(removed)
+
+    def refresh(self, rels: Optional[Set[str]] = None) -> bool:
+        # One update step. `rels` limits the file check to those paths (from change
+        # notifications); None stats the whole tree. Returns whether anything changed.
+        with self._lock:
+            start = time.perf_counter()
+            if _stamp(os.path.join(self.repo_root, CONFIG_FILE)) != self._config_stamp:
+                self._load()
+                return True
+            changed, removed = self._walk_changes() if rels is None else self._stat_changes(rels)
+            history = self._git_state() != self.git_state or datetime.utcnow().date() != self.now.date()
+            if not (changed or removed or history):
+                return False
+            if history:
+                # New commits move churn and ages; the analyze results themselves still hold
+                self._load_history()
+                for rel, res in self._results.items():
+                    self._items[rel] = self._score(rel, res)
+            analyzed = self._sync(changed, removed)
+            self._publish(start, analyzed, "history" if history else "files")
+            return True
+
+    def _publish(self, start: float, analyzed: int, reason: str):
+        items = TopItems(self.max_items)
+        index = FileIndex()
+        skipped: List[Dict[str, Any]] = []
+        for rel in sorted(self._entries, key=_walk_key):
+            res = self._results[rel]
+            index.add(rel, self._entries[rel].size, res[1] if res is not None else None)
+            if res is None:
+                continue
+            skipped.extend(skipped_entries(rel, res[1]))
+            items.extend(self._items[rel])
+        self._repo_items = repo_items(index, self.cfg, self.scorer)
+        items.extend(self._repo_items)
+        result = build_result(self.repo_root, items, self.max_items, skipped=skipped, summary_scope=self.summary_scope)
+        body = json.dumps(result).encode("utf-8")
+        self.snapshot = Snapshot(self.snapshot.version + 1, result, body, time.time())
+        self.last_update = {
+            "reason": reason,
+            "files_analyzed": analyzed,
+            "seconds": round(time.perf_counter() - start, 4),
+        }
+        self._changed.notify_all()
+
+    def wait(self, version: int, timeout: float) -> Snapshot:
+        # Block until a snapshot newer than `version` exists (or the timeout passes)
+        with self._changed:
+            self._changed.wait_for(lambda: self.snapshot.version != version, timeout=timeout)
+            return self.snapshot
+
+    def items_for(self, rel: str) -> List[Dict[str, Any]]:
+        # Every item for one path, including those below the --max-items cut
+        with self._lock:
+            found = list(self._items.get(rel, ()))
+            found.extend(it for it in self._repo_items if it.path == rel)
+        found.sort(key=lambda it: -it.score)
+        return [item_to_json(it) for it in found]
+
+    def status(self) -> Dict[str, Any]:
+        snap = self.snapshot
+        return {
+            "repo_root": self.repo_root,
+            "version": snap.version,
+            "updated": snap.updated,
+            "files": len(self._entries),
+            "items": snap.result.get("summary", {}).get("count", 0),
+            "last_update": self.last_update,
+        }
+
+
+# Collects changed paths from watchdog between two refresh() calls. Directory creates,
+# deletes and moves ask for a full stat walk instead of guessing what moved underneath.
+class ChangeQueue(FileSystemEventHandler):
+    def __init__(self, repo_root: str):
+        self.repo_root = repo_root
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self._rels: Set[str] = set()
+        self._full = False
+        self._observer = Observer()
+        self._observer.schedule(self, repo_root, recursive=True)
+        self._observer.start()
+
+    def on_any_event(self, event):
+        if event.is_directory and event.event_type not in ("created", "deleted", "moved"):
+            return
+        paths = [event.src_path, getattr(event, "dest_path", "")]
+        with self._lock:
+            for path in paths:
+                if not path:
+                    continue
+                rel = os.path.relpath(path, self.repo_root).replace(os.sep, "/")
+                if rel == ".git" or rel.startswith((".git/", "../")):
+                    continue
+                if event.is_directory:
+                    self._full = True
+                else:
+                    self._rels.add(rel)
+                self._event.set()
+
+    def take(self, timeout: float) -> Optional[Set[str]]:
+        # Paths changed since the last call (possibly none); None means walk everything
+        if self._event.wait(timeout):
+            time.sleep(SETTLE_S)
+        with self._lock:
+            rels, full = self._rels, self._full
+            self._rels, self._full = set(), False
+            self._event.clear()
+        return None if full else rels
+
+    def stop(self):
+        self._observer.stop()
+        self._observer.join()
+
+
+def wait_seconds(query: Dict[str, List[str]]) -> Optional[float]:
+    # `?wait=S` clamped to [0, MAX_WAIT_S] (0 without one); None when S is not a finite number
+    try:
+        wait = float((query.get("wait") or ["0"])[0])
+    except ValueError:
+        return None
+    if not math.isfinite(wait):
+        return None
+    return min(max(wait, 0.0), MAX_WAIT_S)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # GET /result    the live report (ETag = version; `?wait=S` long-polls with If-None-Match)
+    # GET /summary   version and summary only
+    # GET /file?path=REL   every item for one path
+    # GET /status    index size and what the last update did
+    server_version = "techdebt-watch"
+
+    def do_GET(self):
+        live: LiveIndex = self.server.live
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        snap = live.snapshot
+        if url.path == "/result":
+            wait = wait_seconds(query)
+            if wait is None:
+                self._send(400, b'{"error": "wait must be a number of seconds"}')
+                return
+            etag = f'"{snap.version}"'
+            if self.headers.get("If-None-Match") == etag and wait > 0:
+                snap = live.wait(snap.version, wait)
+                etag = f'"{snap.version}"'
+            if self.headers.get("If-None-Match") == etag:
+                self._send(304, b"", etag)
+            else:
+                self._send(200, snap.body, etag)
+        elif url.path == "/summary":
+            self._json({"version": snap.version, "summary": snap.result.get("summary", {})})
+        elif url.path == "/file":
+            rel = (query.get("path") or [""])[0]
+            self._json({"version": snap.version, "path": rel, "items": live.items_for(rel)})
+        elif url.path == "/status":
+            self._json(live.status())
+        else:
+            self._send(404, b'{"error": "not found"}')
+
+    def _json(self, doc: Dict[str, Any]):
+        self._send(200, json.dumps(doc).encode("utf-8"))
+
+    def _send(self, code: int, body: bytes, etag: Optional[str] = None):
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(live: LiveIndex, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    # HTTP on a background thread; the caller's thread keeps driving refresh()
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.live = live
+    threading.Thread(target=server.serve_forever, name="techdebt-http", daemon=True).start()
+    return server
+
+
+def watch(live: LiveIndex, interval: float = DEFAULT_INTERVAL, events: bool = True, on_update=None):
+    # Runs until interrupted. With watchdog installed only notified paths are stat'ed;
+    # otherwise (or with events=False) the tree is stat-walked every `interval` seconds.
+    queue = ChangeQueue(live.repo_root) if events and Observer is not None else None
+    try:
+        while True:
+            if queue is not None:
+                rels = queue.take(interval)
+            else:
+                time.sleep(interval)
+                rels = None
+            if live.refresh(rels) and on_update is not None:
+                on_update(live)
+    finally:
+        if queue is not None:
+            queue.stop()
@@ -0,0 +1,192 @@
+from __future__ import annotations
+import json, os, subprocess, sys, textwrap
+
+import pytest
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# A small repository touching every pass: markers in several languages, functions over the
+# complexity limits, package.json + lockfile, Python manifests, test-gap conventions, an
+# excluded directory and a .gitignore'd one. Enough files that -j 4 splits them into chunks.
+SAMPLE_FILES = {
+    ".gitignore": "build/\n",
+    ".techdebt.yml": "exclude:\n  - \"vendor/**\"\n",
+    "package.json": json.dumps(
+        {
+            "name": "sample",
+            "dependencies": {"lodash": "^4.17.0", "left-pad": "1.3.0", "missing": "2.0.0"},
+            "devDependencies": {"jest": "29.7.0"},
+        },
+        indent=2,
+    ),
+    "package-lock.json": json.dumps(
+        {
+            "name": "sample",
+            "lockfileVersion": 3,
+            "packages": {
+                "": {"name": "sample", "dependencies": {"lodash": "^4.17.0", "left-pad": "1.3.0"}},
+                "node_modules/lodash": {"version": "4.17.21"},
+                "node_modules/left-pad": {"version": "1.3.0", "dependencies": {"lodash": "^3.0.0"}},
+                "node_modules/left-pad/node_modules/lodash": {"version": "3.10.1"},
+                "node_modules/jest": {"version": "29.7.0", "dev": True},
+            },
+        },
+        indent=2,
+    ),
+    "requirements.txt": "requests>=2.31\nflask==3.0.0\n",
+    "pyproject.toml": '[project]\nname = "sample"\ndependencies = ["attrs>=23"]\n',
+    "app/service.py": '''
+        """Service layer.
+
+        def example(self):  # docs only, not a function
+            pass
+        """
+        import os
+
+
+        # TODO [P1]: @alice split this up
+        def dispatch(kind, payload, retries=3):
+            for attempt in range(retries):
+                if kind == "a" and payload:
+                    while payload:
+                        try:
+                            with open(os.devnull) as f:
+                                if f and payload.pop():
+                                    return attempt
+                        except OSError:
+                            continue
+                elif kind == "b" or kind == "c":
+                    return [p for p in payload if p] if payload else None
+                elif kind == "d":
+                    return 1
+            return -1
+
+
+        def fine(x):
+            return x + 1  # FIXME: off by one?
+    ''',
+    "app/util.py": "def helper(x):\n    return x * 2  # XXX: slow\n",
+    "tests/test_util.py": "def test_helper():\n    assert True\n",
+    "src/web/index.ts": '''
+        import _ from "lodash";
+        // TODO: @bob type this properly
+        export function render(items: any[], mode: string): string {
+          let out = "";
+          for (const it of items) {
+            if (mode === "a" && it) {
+              if (it.x || it.y) {
+                while (it.next) {
+                  if (it.deep) { out += "}"; }
+                }
+              }
+            }
+          }
+          return _.trim(out);
+        }
+    ''',
+    "src/web/index.test.ts": "// HACK: no assertions yet\n",
+    "cmd/main.go": '''
+        package main
+
+        // BUG: ignores errors
+        func (s *Server) Handle(req int) int {
+        \tfor i := 0; i < req; i++ {
+        \t\tif i > 2 && i < 9 || i == 11 {
+        \t\t\tswitch i {
+        \t\t\tcase 3:
+        \t\t\t\treturn 3
+        \t\t\tcase 4:
+        \t\t\t\treturn 4
+        \t\t\t}
+        \t\t}
+        \t}
+        \treturn 0
+        }
+    ''',
+    "vendor/lib.py": "# TODO: excluded by config\n",
+    "build/out.py": "# TODO: ignored by git\n",
+}
+SAMPLE_FILES.update(
+    {f"app/mod{i:02d}.py": f"# TODO: module {i}\ndef f{i}(x):\n    return x + {i}\n" for i in range(30)}
+)
+SAMPLE_FILES.update({f"src/web/part{i:02d}.js": f"// FIXME: part {i}\nexport const p{i} = {i};\n" for i in range(20)})
+
+
+def git(repo: str, *args: str, date: str = "2024-01-01T12:00:00Z"):
+    env = dict(os.environ, GIT_AUTHOR_DATE=date, GIT_COMMITTER_DATE=date)
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@example.com", *args],
+        cwd=repo, env=env, check=True, stdout=subprocess.DEVNULL,
+    )
+
+
+def write_files(repo: str, files: dict):
+    for rel, text in files.items():
+        path = os.path.join(repo, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(textwrap.dedent(text).lstrip("\n"))
+
+
+@pytest.fixture(scope="session")
+def sample_repo(tmp_path_factory) -> str:
+    repo = str(tmp_path_factory.mktemp("sample"))
+    git(repo, "init", "-q")
+    write_files(repo, SAMPLE_FILES)
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", "initial")
+    write_files(repo, {"app/util.py": "def helper(x):\n    return x * 3  # XXX: slow\n"})
+    git(repo, "commit", "-q", "-am", "tweak", date="2024-02-01T12:00:00Z")
+    write_files(repo, {"app/untracked.py": "# TODO: not committed yet\n"})
+    return repo
+
+
+@pytest.fixture
+def make_repo(tmp_path):
+    # Factory for throwaway repositories: `files` committed once, returns the path
+    def make(files: dict, name: str = "repo") -> str:
+        repo = str(tmp_path / name)
+        os.makedirs(repo)
+        git(repo, "init", "-q")
+        write_files(repo, files)
+        git(repo, "add", "-A")
+        git(repo, "commit", "-q", "-m", "initial")
+        return repo
+
+    return make
+
+
+@pytest.fixture(scope="session")
+def sample_items(sample_repo) -> list:
+    from techdebt_cli.config import load_config
+    from techdebt_cli.scanner import scan_repo
+
+    return scan_repo(sample_repo, load_config(sample_repo))["items"]
+
+
+@pytest.fixture(scope="session")
+def cli_json():
+    # tech-debt.json bytes from `techdebt scan REPO --json ARGS`, removed again afterwards
+    def run(repo: str, *args: str) -> bytes:
+        subprocess.run(
+            [sys.executable, "-m", "techdebt_cli", "scan", repo, "--json", *args],
+            env=dict(os.environ, PYTHONPATH=SRC), check=True, stdout=subprocess.DEVNULL,
+        )
+        path = os.path.join(repo, "tech-debt.json")
+        with open(path, "rb") as f:
+            data = f.read()
+        os.remove(path)
+        return data
+
+    return run
+
+
+@pytest.fixture
+def commit():
+    # Writes `files` into `repo` and commits everything, dated `date`
+    def run(repo: str, files: dict, date: str, message: str = "change"):
+        write_files(repo, files)
+        git(repo, "add", "-A")
+        git(repo, "commit", "-q", "-m", message, date=date)
+
+    return run
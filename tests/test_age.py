@@ -0,0 +1,40 @@
+from __future__ import annotations
+from datetime import datetime
+
+from techdebt_cli.age import AgeEngine
+from techdebt_cli.utils import SPAWNED
+
+JAN, MAR = "2024-01-01T12:00:00Z", "2024-03-01T12:00:00Z"
+
+
+def ts(date: str) -> int:
+    return int(datetime.fromisoformat(date.replace("Z", "+00:00")).timestamp())
+
+
+def history(make_repo, commit) -> str:
+    repo = make_repo({f"f{i}.py": f"x = {i}\n" for i in range(20)} | {"a.py": "one\ntwo\n"})
+    commit(repo, {"a.py": "one\nTWO\n", "f3.py": "x = 33\n"}, MAR)
+    return repo
+
+
+def test_file_times_come_from_one_log_pass(make_repo, commit):
+    repo = history(make_repo, commit)
+    before = SPAWNED["git"]
+    ages = AgeEngine(repo)
+    times = {rel: ages.timestamp(rel) for rel in ["a.py", "f0.py", "f3.py", "f19.py", "gone.py"]}
+    assert times == {"a.py": ts(MAR), "f0.py": ts(JAN), "f3.py": ts(MAR), "f19.py": ts(JAN), "gone.py": None}
+    assert SPAWNED["git"] - before == 2  # ls-files + log, however many paths are asked for
+
+
+def test_line_mode_blames_each_line(make_repo, commit):
+    repo = history(make_repo, commit)
+    ages = AgeEngine(repo, mode="line")
+    assert [ages.timestamp("a.py", n) for n in (1, 2)] == [ts(JAN), ts(MAR)]
+    # Lines blame does not cover fall back to the file time
+    assert ages.timestamp("a.py", 99) == ts(MAR)
+    assert ages.last_modified("f0.py", 1) == datetime(2024, 1, 1, 12)
+
+
+def test_times_as_of_an_older_commit(make_repo, commit):
+    repo = history(make_repo, commit)
+    assert AgeEngine(repo, rev="HEAD~1").timestamp("a.py") == ts(JAN)
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import pytest
+
+from techdebt_cli.backfill import backfill, parse_every
+from techdebt_cli.config import load_config
+from techdebt_cli.scanner import scan_repo
+from techdebt_cli.trends import TrendStore
+
+FILES = {f"m{i}.py": f"# TODO: module {i}\n" for i in range(6)}
+
+
+@pytest.fixture
+def history(make_repo, commit) -> str:
+    repo = make_repo(FILES)
+    commit(repo, {"m1.py": "# FIXME: one\n# HACK: two\n"}, "2024-01-08T12:00:00Z")
+    commit(repo, {"new.py": "# XXX: added\n"}, "2024-01-15T12:00:00Z")
+    commit(repo, {"m2.py": "x = 2\n"}, "2024-01-22T12:00:00Z")
+    return repo
+
+
+def test_every_commit_reads_only_changed_blobs(history, tmp_path):
+    cfg = load_config(history)
+    with TrendStore(str(tmp_path / "t.sqlite")) as store:
+        stats = backfill(history, cfg, store, "HEAD~3")
+        assert stats == {"commits": 4, "snapshots": 4, "recorded": 0, "blobs_analysed": 6 + 3, "files": 6 + 6 + 7 + 7}
+        counts = [s["count"] for s in reversed(store.scans())]
+        assert counts == [6, 7, 8, 7]
+        # The last snapshot reports what a scan of the same tree finds
+        assert counts[-1] == scan_repo(history, cfg)["summary"]["count"]
+        assert store.counts()["resolved"] == 2  # m1's TODO and m2's TODO
+
+        again = backfill(history, cfg, store, "HEAD~3")
+        assert (again["snapshots"], again["recorded"], again["blobs_analysed"]) == (0, 4, 0)
+
+
+def test_sampling(history, tmp_path):
+    cfg = load_config(history)
+    with TrendStore(str(tmp_path / "a.sqlite")) as store:
+        assert backfill(history, cfg, store, "HEAD~3", every="2")["snapshots"] == 3  # first, third and last
+    with TrendStore(str(tmp_path / "b.sqlite")) as store:
+        assert backfill(history, cfg, store, "HEAD~3", every="2w")["snapshots"] == 3  # Jan 1, Jan 15, last
+    with pytest.raises(ValueError, match="--every expects"):
+        parse_every("2m")
+    with TrendStore(str(tmp_path / "c.sqlite")) as store, pytest.raises(ValueError, match="Unknown revision"):
+        backfill(history, cfg, store, "no-such-ref")
@@ -0,0 +1,44 @@
+from __future__ import annotations
+import json, os, subprocess, sys
+
+from techdebt_cli.batch import AGGREGATE_TOP_N, SUMMARY_FILE, _out_dirs, read_manifest
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def test_scan_many_matches_single_scans_and_reports_failures(sample_repo, make_repo, cli_json, tmp_path):
+    other = make_repo({"a.py": "# TODO: other\n"}, name="other")
+    broken = make_repo({".techdebt.yml": "markers:\n  - pattern: 'TODO('\n", "a.py": "# TODO\n"}, name="broken")
+    manifest = tmp_path / "repos.txt"
+    manifest.write_text(f"# repos\n{other}\n\n{tmp_path / 'missing'}\n")
+    out = tmp_path / "out"
+    proc = subprocess.run(
+        [
+            sys.executable, "-m", "techdebt_cli", "scan-many", sample_repo, broken, "--manifest", str(manifest),
+            "--out-dir", str(out), "--json", "-j", "2",
+        ],
+        env=dict(os.environ, PYTHONPATH=SRC), capture_output=True, text=True,
+    )
+    assert proc.returncode == 1, proc.stderr
+    doc = json.loads((out / SUMMARY_FILE).read_text())
+    entries = doc["repos"]
+    assert [e["status"] for e in entries] == ["ok", "error", "ok", "error"]
+    assert "markers[1].pattern 'TODO('" in entries[1]["error"]
+    assert entries[3]["error"].startswith("FileNotFoundError: not a directory")
+    # Each repo's report is byte-for-byte what `techdebt scan` writes
+    for entry in (entries[0], entries[2]):
+        with open(os.path.join(entry["out"], "tech-debt.json"), "rb") as f:
+            assert f.read() == cli_json(entry["repo"])
+    summary = doc["summary"]
+    assert (summary["repos"], summary["failed"]) == (4, 2)
+    assert summary["count"] == entries[0]["summary"]["count"] + entries[2]["summary"]["count"]
+    scores = [it["score"] for it in doc["top"]]
+    assert len(scores) == AGGREGATE_TOP_N and scores == sorted(scores, reverse=True)
+
+
+def test_manifest_paths_and_output_names(tmp_path):
+    manifest = tmp_path / "m.txt"
+    manifest.write_text("a  # first\n/abs/b\n\n# skipped\n")
+    assert read_manifest(str(manifest)) == [str(tmp_path / "a"), "/abs/b"]
+    assert _out_dirs(["/x/app", "/y/app", "/z/lib"], "/out") == ["/out/app", "/out/app-2", "/out/lib"]
+    assert _out_dirs(["/x/app"], None) == ["/x/app"]
@@ -0,0 +1,60 @@
+from __future__ import annotations
+import importlib.util, os, subprocess, sys
+
+BENCHMARKS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+
+
+def load(name: str):
+    spec = importlib.util.spec_from_file_location(f"bench_{name}", os.path.join(BENCHMARKS, f"{name}.py"))
+    module = sys.modules[spec.name] = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+run = load("run")
+synthrepo = load("synthrepo")
+startup = load("startup")
+
+
+def scenario(wall: float, items: int = 10, off: float = None) -> dict:
+    return {"spec": {"files": 1}, "wall_s": wall, "items": items, "complexity_off_wall_s": off}
+
+
+def test_compare_flags_slowdowns_item_changes_and_complexity_overhead():
+    baseline = {"a": scenario(1.0), "b": scenario(1.0), "c": scenario(1.0)}
+    current = {"a": scenario(1.2), "b": scenario(1.3, items=11), "c": scenario(0.9, off=0.4), "new": scenario(5.0)}
+    assert run.compare(current, baseline, tolerance=0.25) == [
+        "b: 11 items, baseline had 10",
+        "b: 1.300s vs baseline 1.000s (+30%)",
+        "c: 0.900s, 2.25x the 0.400s without complexity analysis",
+    ]
+    assert run.compare({"c": current["c"]}, baseline, 0.25, max_complexity_overhead=0) == []
+    changed = dict(scenario(1.0), spec={"files": 2})
+    assert run.compare({"a": changed}, baseline, 0.25) == [
+        "a: spec differs from baseline, re-record with --update-baseline"
+    ]
+
+
+def test_synthetic_repos_are_reproducible(tmp_path):
+    spec = synthrepo.RepoSpec(files=12, file_bytes=512, commits=3, deps=5)
+    trees = []
+    for name in ("one", "two"):
+        repo = synthrepo.generate(str(tmp_path / name), spec)
+        # Commit ids carry the wall-clock time; the tree of every commit must not
+        log = ["git", "log", "--format=%T %s"]
+        trees.append(subprocess.run(log, cwd=repo, capture_output=True, text=True, check=True).stdout.splitlines())
+    assert trees[0] == trees[1] and len(trees[0]) == 3
+
+
+def test_json_scans_and_help_skip_the_heavy_imports(make_repo):
+    repo = make_repo({"a.py": "# TODO: one\n", "package.json": '{"dependencies": {"left-pad": "^1.0.0"}}\n'})
+    for name in ("help", "scan-json", "scan-markdown"):
+        case = startup.CASES[name]
+        argv = [a.format(repo=repo) for a in case["argv"]]
+        assert startup._loaded(argv, case["forbidden"], repo) == [], name
+    # The watched list is checked too: Jinja does get loaded for Markdown output
+    assert startup._loaded(["scan", repo, "--markdown"], ["jinja2"], repo) == ["jinja2"]
+    assert startup.compare(
+        {"help": {"argv": ["--help"], "overhead_ms": 30.0, "unexpected_imports": ["yaml"]}},
+        {"help": {"argv": ["--help"], "overhead_ms": 10.0}}, tolerance=0.5, slack_ms=5,
+    ) == ["help: imports yaml", "help: 30.0ms over bare startup, baseline 10.0ms"]
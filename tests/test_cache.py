@@ -0,0 +1,42 @@
+from __future__ import annotations
+import os
+
+from techdebt_cli.cache import ScanCache
+from techdebt_cli.config import load_config
+from techdebt_cli.scanner import scan_repo
+
+
+def test_warm_cache_writes_the_same_json(sample_repo, cli_json, tmp_path):
+    plain = cli_json(sample_repo, "-j", "1")
+    cache_dir = str(tmp_path / "cache")
+    assert cli_json(sample_repo, "--cache-dir", cache_dir) == plain  # cold
+    assert cli_json(sample_repo, "--cache-dir", cache_dir) == plain  # warm
+    assert cli_json(sample_repo, "--cache-dir", cache_dir, "-j", "4") == plain
+
+
+def test_warm_cache_reads_nothing(sample_repo, tmp_path):
+    cfg = load_config(sample_repo)
+    cold = ScanCache(sample_repo, cfg, cache_dir=str(tmp_path))
+    first = scan_repo(sample_repo, cfg, cache=cold)
+    assert cold.misses > 0 and cold.hits == 0
+    warm = ScanCache(sample_repo, cfg, cache_dir=str(tmp_path))
+    assert scan_repo(sample_repo, cfg, cache=warm) == first
+    assert (warm.hits, warm.misses) == (cold.misses, 0)
+
+
+def test_changed_files_and_config_are_rescanned(make_repo, tmp_path):
+    repo = make_repo({"a.py": "# TODO: one\n", "b.py": "# TODO: two\n"})
+    cfg = load_config(repo)
+    scan_repo(repo, cfg, cache=ScanCache(repo, cfg, cache_dir=str(tmp_path)))
+    with open(os.path.join(repo, "b.py"), "a") as f:
+        f.write("# FIXME: dirty\n")
+    cache = ScanCache(repo, cfg, cache_dir=str(tmp_path))
+    result = scan_repo(repo, cfg, cache=cache)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert sorted(it["meta"]["snippet"] for it in result["items"]) == ["FIXME: dirty", "TODO: one", "TODO: two"]
+    # Any setting that changes what is found drops the whole cache
+    cfg.data["markers"] = [{"pattern": "FIXME"}]
+    cache = ScanCache(repo, cfg, cache_dir=str(tmp_path))
+    result = scan_repo(repo, cfg, cache=cache)
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert [it["meta"]["snippet"] for it in result["items"]] == ["FIXME: dirty"]
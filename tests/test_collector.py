@@ -0,0 +1,24 @@
+from __future__ import annotations
+import random
+
+from techdebt_cli.collector import TopItems
+from techdebt_cli.signals import DebtItem
+
+
+def items(scores):
+    return [DebtItem(path=f"f{i}.py", kind="k" if i % 2 else "j", score=s) for i, s in enumerate(scores)]
+
+
+def test_keeps_what_a_stable_sort_and_cut_would():
+    rng = random.Random(3)
+    offered = items([rng.choice([10.0, 20.0, 30.0, 40.0]) for _ in range(200)])
+    top = TopItems(25, offered)
+    assert top.items() == sorted(offered, key=lambda it: -it.score)[:25]
+    assert TopItems(0, offered).items() == []
+
+
+def test_summary_scopes():
+    top = TopItems(2, items([10.0, 50.0, 30.0]), keep_all=True)
+    assert top.summary() == {"count": 2, "by_kind": {"k": 1, "j": 1}, "avg_score": 40.0}
+    assert top.summary("all") == {"count": 3, "by_kind": {"j": 2, "k": 1}, "avg_score": 30.0, "reported": 2}
+    assert [it.score for it in top.all_items] == [10.0, 50.0, 30.0]
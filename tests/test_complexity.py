@@ -0,0 +1,159 @@
+from __future__ import annotations
+import textwrap
+
+from techdebt_cli.complexity import ComplexityLimits, analyze_complexity
+
+# Every function is over fn_lines=1, so each one shows up with its measures
+ALL = ComplexityLimits(fn_lines=1, nesting=0, cyclomatic=1, file_lines=10_000)
+
+
+def measure(rel: str, src: str, limits: ComplexityLimits = ALL):
+    buf = textwrap.dedent(src).lstrip("\n").encode()
+    return {r[1]: r[2:6] for r in analyze_complexity(rel, buf, 0, limits) if r[0] == "complexity"}
+
+
+def test_python_nesting_cyclomatic_and_length():
+    found = measure("a.py", """
+        def f(xs, flag):
+            for x in xs:
+                if x and flag:
+                    try:
+                        pass
+                    except ValueError:
+                        pass
+                elif x or not flag:
+                    pass
+            return [y for y in xs if y] if flag else None
+    """)
+    # (line, lines, nesting, cyclomatic): for, if, `and`, except, elif, `or`, comprehension + its
+    # filter, conditional expression -> 1 + 9; try sits inside if inside for
+    assert found == {"f": (1, 10, 3, 10)}
+
+
+def test_python_nested_defs_are_qualified_and_separate():
+    found = measure("a.py", """
+        class C:
+            def m(self):
+                def inner(a=1 if True else 2):
+                    while a:
+                        a -= 1
+                return inner
+    """)
+    assert found == {"C.m": (2, 5, 0, 2), "C.m.inner": (3, 3, 1, 2)}
+
+
+def test_python_docstring_examples_are_not_functions():
+    found = measure("a.py", '''
+        """Usage:
+
+        def example(self):
+            pass
+        """
+
+        def real():
+            return 1
+    ''')
+    assert found == {"real": (7, 2, 0, 1)}
+
+
+def test_python_unparseable_file_has_no_functions():
+    assert measure("a.py", "def f(:\n    pass\n") == {}
+
+
+def test_javascript_functions():
+    found = measure("a.js", """
+        function outer(a) {
+          if (a && a.b) {
+            for (const x of a.b) {
+              if (x || "}") { return x; }
+            }
+          }
+          const inner = (y) => {
+            return y ? 1 : 2;
+          };
+          // if (a) { while (1) {} }
+          return inner;
+        }
+    """)
+    # if, &&, for, if, || -> 1 + 5; the "}" string and the comment are skipped
+    assert found == {"outer": (1, 12, 3, 6), "inner": (7, 3, 0, 1)}
+
+
+def test_typescript_method_with_return_type():
+    found = measure("a.ts", """
+        class A {
+          run(x: number): Promise<void> {
+            switch (x) {
+              case 1: break;
+              case 2: break;
+            }
+          }
+        }
+    """)
+    assert found == {"run": (2, 6, 1, 3)}
+
+
+def test_go_functions():
+    found = measure("a.go", """
+        func (s *Server) Handle(w Writer, r *Request) error {
+        \tfor _, h := range s.hooks {
+        \t\tif err := h(r); err != nil {
+        \t\t\treturn err
+        \t\t}
+        \t}
+        \tgo func() {
+        \t\tlog(`raw { string`)
+        \t}()
+        \treturn nil
+        }
+    """)
+    assert found == {"Handle": (1, 11, 2, 3), "<anonymous>": (7, 3, 0, 1)}
+
+
+def test_limits_select_functions_and_long_files():
+    src = "def f(x):\n" + "".join(f"    if x == {i}:\n        return {i}\n" for i in range(12))
+    limits = ComplexityLimits(file_lines=10)
+    records = analyze_complexity("a.py", src.encode(), 25, limits)
+    assert records[0] == ("long_file", 25, 2.5)
+    assert records[1][:6] == ("complexity", "f", 1, 25, 1, 13)
+    assert records[1][7:] == (1.3, ["cyclomatic"])
+    assert analyze_complexity("a.py", src.encode(), 25, ComplexityLimits(cyclomatic=20)) == []
+
+
+def test_text_that_only_looks_top_level_does_not_hide_long_functions():
+    # Column-0 lines inside brackets, strings and continuations are still part of the function
+    src = textwrap.dedent('''
+        def f(x):
+            y = [
+        1, 2,
+            ]
+            s = """
+        text
+        """
+            z = 1 + \\
+        2
+            return x
+    ''').lstrip("\n")
+    limits = ComplexityLimits(fn_lines=8, nesting=9, cyclomatic=99)
+    records = analyze_complexity("a.py", src.encode(), 10, limits)
+    assert [r[:4] for r in records] == [("complexity", "f", 1, 10)]
+    assert analyze_complexity("a.py", src.encode(), 10, ComplexityLimits(fn_lines=10, cyclomatic=99)) == []
+
+
+def test_braces_in_strings_do_not_end_functions_early():
+    src = 'function f(a) {\n  const s = "}";\n  const t = `\n}\n`;\n  return s + t;\n}\n'
+    limits = ComplexityLimits(fn_lines=6, nesting=9, cyclomatic=99)
+    assert [r[:4] for r in analyze_complexity("a.js", src.encode(), 7, limits)] == [("complexity", "f", 1, 7)]
+    assert analyze_complexity("a.js", src.encode(), 7, ComplexityLimits(fn_lines=7, cyclomatic=99)) == []
+
+
+def test_sample_repo_complexity_items(sample_items):
+    found = {
+        (it["path"], it["meta"]["function"]): (it["meta"]["nesting"], it["meta"]["cyclomatic"])
+        for it in sample_items if it["kind"] == "complexity"
+    }
+    # Handle in cmd/main.go stays under the default limits; the docstring example is not a function
+    assert found == {
+        ("app/service.py", "dispatch"): (6, 14),
+        ("src/web/index.ts", "render"): (5, 8),
+    }
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+from techdebt_cli.config import Config
+from techdebt_cli.deps import DepFiles, dependency_parser
+from techdebt_cli.fileindex import FileIndex
+from techdebt_cli.scanner import dependency_items, parse_manifest
+from techdebt_cli.scoring import Scorer
+
+
+def index_of(files: dict) -> FileIndex:
+    index = FileIndex()
+    for rel, text in files.items():
+        data = text.encode()
+        parser = dependency_parser(rel, DepFiles())
+        records = []
+        if parser is not None:
+            parser.feed(data)
+            record = parser.close()
+            records = [record] if record is not None else []
+        elif rel == "package.json":
+            records = [("manifest", parse_manifest(data))]
+        index.add(rel, len(data), records)
+    return index
+
+
+def dep_items(files: dict, cfg: Config = None) -> list:
+    cfg = cfg or Config()
+    items = dependency_items(index_of(files), cfg, Scorer(cfg.data["weights"]))
+    return sorted((it.path, it.meta["dep"], it.meta["reason"]) for it in items)
+
+
+PYPROJECT = """
+[project]
+name = "lib"
+dependencies = ["requests>=2.31", "attrs==23.1.0"]
+"""
+
+
+def test_pyproject_ranges_are_not_loose():
+    assert dep_items({"pyproject.toml": PYPROJECT}) == []
+
+
+def test_requirements_ranges_are_loose():
+    files = {"requirements.txt": "requests>=2.31\nattrs==23.1.0\n", "requirements/dev.txt": "pytest\n"}
+    assert dep_items(files) == [
+        ("requirements.txt", "requests", "loose_range"),
+        ("requirements/dev.txt", "pytest", "loose_range"),
+    ]
+    cfg = Config()
+    cfg.data["dependencies"]["python"]["allow_loose_ranges"] = True
+    assert dep_items(files, cfg) == []
+
+
+# root -> a@^1.0.0 (1.2.0), b@^1.0.0 (1.0.0); a -> b@^2.0.0 (2.1.0), in each lockfile format
+LOCKFILES = {
+    "package-lock.json": """
+{
+  "name": "app",
+  "lockfileVersion": 3,
+  "packages": {
+    "": {"name": "app", "dependencies": {"a": "^1.0.0", "b": "^1.0.0"}},
+    "node_modules/a": {"version": "1.2.0", "dependencies": {"b": "^2.0.0"}},
+    "node_modules/a/node_modules/b": {"version": "2.1.0"},
+    "node_modules/b": {"version": "1.0.0"}
+  }
+}
+""",
+    "pnpm-lock.yaml": """
+lockfileVersion: '9.0'
+
+importers:
+
+  .:
+    dependencies:
+      a:
+        specifier: ^1.0.0
+        version: 1.2.0
+      b:
+        specifier: ^1.0.0
+        version: 1.0.0
+
+packages:
+
+  a@1.2.0:
+    resolution: {integrity: sha512-a}
+
+  b@1.0.0:
+    resolution: {integrity: sha512-b}
+
+  b@2.1.0:
+    resolution: {integrity: sha512-c}
+
+snapshots:
+
+  a@1.2.0:
+    dependencies:
+      b: 2.1.0
+
+  b@1.0.0: {}
+
+  b@2.1.0: {}
+""",
+    "yarn.lock": """
+# yarn lockfile v1
+
+
+a@^1.0.0:
+  version "1.2.0"
+  dependencies:
+    b "^2.0.0"
+
+b@^1.0.0:
+  version "1.0.0"
+
+b@^2.0.0:
+  version "2.1.0"
+""",
+}
+PACKAGE_JSON = '{"name": "app", "dependencies": {"a": "^1.0.0", "b": "^1.0.0", "c": "3.0.0"}}'
+
+
+def test_lockfile_formats_parse_to_the_same_graph():
+    for rel, text in LOCKFILES.items():
+        _, _, nodes = index_of({rel: text}).locks[rel]
+        edges = {(f"{n[0]}@{n[1]}", tuple(f"{nodes[d][0]}@{nodes[d][1]}" for d in n[2])) for n in nodes}
+        assert edges == {("a@1.2.0", ("b@2.1.0",)), ("b@1.0.0", ()), ("b@2.1.0", ())}, rel
+
+
+def test_lockfile_items():
+    for rel, text in LOCKFILES.items():
+        assert dep_items({"package.json": PACKAGE_JSON, rel: text}) == sorted([
+            ("package.json", "a", "loose_range"),
+            ("package.json", "a", "possibly_unused"),
+            ("package.json", "b", "loose_range"),
+            ("package.json", "b", "possibly_unused"),
+            ("package.json", "c", "not_in_lockfile"),
+            ("package.json", "c", "possibly_unused"),
+            (rel, "b", "multiple_versions"),
+        ]), rel
+
+
+
+def test_sample_repo_dependency_items(sample_items):
+    found = sorted(
+        (it["path"], it["meta"]["dep"], it["meta"]["reason"]) for it in sample_items if it["kind"] == "dep_risk"
+    )
+    assert found == [
+        ("package-lock.json", "lodash", "multiple_versions"),
+        ("package.json", "jest", "possibly_unused"),
+        ("package.json", "left-pad", "possibly_unused"),
+        ("package.json", "lodash", "loose_range"),
+        ("package.json", "missing", "not_in_lockfile"),
+        ("package.json", "missing", "possibly_unused"),
+        ("requirements.txt", "requests", "loose_range"),
+    ]
+    by_reason = {(it["meta"]["dep"], it["meta"]["reason"]): it for it in sample_items if it["kind"] == "dep_risk"}
+    loose = by_reason["lodash", "loose_range"]
+    assert loose["meta"]["resolved"] == "4.17.21"
+    dup = by_reason["lodash", "multiple_versions"]
+    assert dup["meta"]["versions"] == ["3.10.1", "4.17.21"]
+    assert dup["meta"]["required_by"] == ["left-pad@1.3.0"]
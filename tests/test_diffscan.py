@@ -0,0 +1,66 @@
+from __future__ import annotations
+import os
+
+from techdebt_cli.cache import ScanCache
+from techdebt_cli.config import load_config
+from techdebt_cli.diffscan import changed_paths, scan_diff
+from techdebt_cli.scanner import scan_repo
+
+BASE = {
+    "a.py": "# TODO: old\nx = 1\n",
+    "c.py": "# XXX: goes away\n",
+    "same.py": "# FIXME: untouched\n",
+    ".gitignore": "*.log\n",
+}
+
+
+def change(repo: str):
+    with open(os.path.join(repo, "a.py"), "w") as f:
+        f.write("# FIXME: new\nx = 1\n")
+    with open(os.path.join(repo, "b.py"), "w") as f:
+        f.write("# HACK: untracked\n")
+    with open(os.path.join(repo, "debug.log"), "w") as f:
+        f.write("TODO: ignored\n")
+    os.remove(os.path.join(repo, "c.py"))
+
+
+def snippets(entries):
+    return sorted((it["path"], it["meta"]["snippet"]) for it in entries)
+
+
+def test_untracked_files_count_as_added(make_repo):
+    repo = make_repo(BASE)
+    change(repo)
+    assert changed_paths(repo, "HEAD") == {"a.py": "M", "b.py": "A", "c.py": "D"}
+
+
+def test_delta_lists_added_and_removed_items(make_repo):
+    repo = make_repo(BASE)
+    change(repo)
+    result = scan_diff(repo, load_config(repo), "HEAD")
+    delta = result["delta"]
+    assert delta["changed_files"] == 3
+    assert snippets(delta["added"]) == [("a.py", "FIXME: new"), ("b.py", "HACK: untracked")]
+    assert snippets(delta["removed"]) == [("a.py", "TODO: old"), ("c.py", "XXX: goes away")]
+    # Only changed files are scanned
+    assert snippets(result["items"]) == [("a.py", "FIXME: new"), ("b.py", "HACK: untracked")]
+
+
+def test_diff_scan_reads_the_cache_without_rewriting_it(make_repo, tmp_path):
+    repo = make_repo(dict(BASE, **{"package.json": '{"dependencies": {}}', "web.js": "import pad from 'left-pad';\n"}))
+    change(repo)
+    with open(os.path.join(repo, "package.json"), "w") as f:
+        f.write('{"dependencies": {"left-pad": "^1.3.0"}}')
+    cfg = load_config(repo)
+    cache_dir = str(tmp_path / "cache")
+    scan_repo(repo, cfg, cache=ScanCache(repo, cfg, cache_dir=cache_dir))
+    with open(os.path.join(cache_dir, "scan.json"), "rb") as f:
+        saved = f.read()
+    cache = ScanCache(repo, cfg, cache_dir=cache_dir)
+    result = scan_diff(repo, cfg, "HEAD", cache=cache)
+    assert result == scan_diff(repo, cfg, "HEAD")
+    assert [it["meta"]["dep"] for it in result["delta"]["added"] if it["kind"] == "dep_risk"] == ["left-pad"]
+    # a.py, b.py and package.json from the diff, web.js for the dependency pass
+    assert (cache.hits, cache.misses) == (4, 0)
+    with open(os.path.join(cache_dir, "scan.json"), "rb") as f:
+        assert f.read() == saved
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from techdebt_cli.fileindex import FileIndex
+
+
+def test_records_fill_the_index():
+    index = FileIndex()
+    index.add("package.json", 10, [("manifest", {"dependencies": {"a": "1"}})])
+    index.add("package-lock.json", 20, [("dep_lock", "npm", {"a": "1.0.0"}, [["a", "1.0.0", []]])])
+    index.add("pyproject.toml", 5, [("dep_manifest", "python", {"attrs": ">=23"})])
+    index.add("src/a.ts", 3, [("inline_marker", 1, 1, "TODO"), ("imports", ["a", "@s/b"])])
+    index.add("src/b.js", 3, [("imports", ["a"])])
+    index.add("big.bin", 99)
+    assert index.manifest == {"dependencies": {"a": "1"}}
+    assert index.locks == {"package-lock.json": ("npm", {"a": "1.0.0"}, [["a", "1.0.0", []]])}
+    assert index.dep_manifests == {"pyproject.toml": {"attrs": ">=23"}}
+    assert index.used_imports() == {"a", "@s/b"}
+    assert index.files[3].ext == ".ts" and index.files[5].imports == ()
+
+
+def test_glob_keeps_pattern_then_walk_order():
+    index = FileIndex()
+    for rel in ["app/z.py", "src/a.ts", "app/sub/a.py", "tests/test_z.py", "src/a.test.ts"]:
+        index.add(rel, 1)
+    assert index.glob(["src/**/*.ts", "app/**/*.py"]) == ["src/a.ts", "src/a.test.ts", "app/z.py", "app/sub/a.py"]
+    assert index.glob(["**/*.test.ts", "tests/**/*.py"]) == ["src/a.test.ts", "tests/test_z.py"]
+
+
+def test_sample_repo_test_gaps(sample_items):
+    gaps = sorted(it["path"] for it in sample_items if it["kind"] == "test_gap")
+    # index.ts has index.test.ts next to it; no app/ module has a tests/<name>.py
+    assert "src/web/index.ts" not in gaps
+    assert "app/service.py" in gaps and "app/untracked.py" in gaps
+    assert not any(p.startswith("vendor/") for p in gaps)
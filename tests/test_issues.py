@@ -0,0 +1,89 @@
+from __future__ import annotations
+import importlib.util, os, sys
+
+import pytest
+
+from techdebt_cli.issues import item_specs, plan_sync
+
+BENCHMARKS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+_spec = importlib.util.spec_from_file_location("bench_issue_sync", os.path.join(BENCHMARKS, "issue_sync.py"))
+fake = sys.modules[_spec.name] = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(fake)
+
+
+def issue(number: int, spec) -> dict:
+    return {"number": number, "body": spec.payload("tech-debt")["body"]}
+
+
+def report_items(n: int) -> list:
+    return [
+        {"path": f"f{i}.py", "kind": "inline_marker", "score": 100.0 - i, "meta": {"snippet": f"TODO {i}"}}
+        for i in range(n)
+    ]
+
+
+def test_issues_below_top_stay_open_and_gone_items_close():
+    items = report_items(5)
+    specs = item_specs(items)
+    existing = [issue(n + 1, spec) for n, spec in enumerate(specs)]
+    # Only the top 2 are wanted; items 2-3 are still in the report, item 4 is gone from it
+    present = [spec.key for spec in item_specs(items[:4])]
+    plan = plan_sync(specs[:2], existing, present)
+    assert (plan.create, plan.update, plan.close, plan.unchanged, plan.kept) == ([], [], [5], 2, 2)
+
+
+def test_duplicate_markers_close_the_newer_issue():
+    spec = item_specs(report_items(1))[0]
+    plan = plan_sync([spec], [issue(7, spec), issue(3, spec)], [spec.key])
+    assert (plan.close, plan.unchanged, plan.kept) == ([7], 1, 0)
+
+
+@pytest.fixture
+def gh():
+    server = fake.FakeGitHub().start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def outcome(stats: dict) -> tuple:
+    return stats["created"], stats["updated"], stats["closed"], stats["unchanged"], stats["failed"]
+
+
+def test_sync_against_fake_github(gh):
+    n = 150  # two pages of open issues
+    report = fake.make_report(n)
+    first = fake.run_sync(gh, report, top=0, jobs=3)
+    assert outcome(first) == (n, 0, 0, 0, [])
+    assert first["server"]["requests"] == 1 + n
+    assert len(gh.open_issues()) == n
+
+    again = fake.run_sync(gh, report, top=0, jobs=3)
+    assert outcome(again) == (0, 0, 0, n, [])
+    assert again["server"] == dict(again["server"], requests=2, GET=2, POST=0, PATCH=0)
+
+    # Under --top the rest stay open; a reworded snippet is a new item, a moved line an update
+    assert outcome(fake.run_sync(gh, report, top=10)) == (0, 0, 0, 10, [])
+    fake._touch(report, renamed=2, moved=3, rescored=20)
+    changed = fake.run_sync(gh, report, top=0, jobs=3)
+    assert outcome(changed) == (2, 3, 2, n - 5, [])
+    assert changed["server"]["requests"] == 2 + 2 + 3 + 2
+    assert len(gh.open_issues()) == n
+
+    by_owner = fake.run_sync(gh, report, top=0, group="owner")
+    assert outcome(by_owner) == (4, 0, n, 0, [])
+    assert sorted(i["title"] for i in gh.open_issues()) == [
+        "Tech debt: 37 items for @carol", "Tech debt: 37 items for unowned items",
+        "Tech debt: 38 items for @alice", "Tech debt: 38 items for @bob",
+    ]
+
+
+def test_sync_retries_through_server_errors_and_secondary_limits(gh):
+    report = fake.make_report(40)
+    gh.faults = 0.2
+    stats = fake.run_sync(gh, report, top=0, jobs=2)
+    assert stats["server"]["injected"] > 0
+    assert outcome(stats)[:3] == (40, 0, 0) and stats["failed"] == []
+    gh.faults = 0.0
+    assert outcome(fake.run_sync(gh, report, top=0)) == (0, 0, 0, 40, [])
+    assert len(gh.open_issues()) == 40
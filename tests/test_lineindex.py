@@ -0,0 +1,32 @@
+from __future__ import annotations
+import mmap
+
+from techdebt_cli import lineindex
+from techdebt_cli.lineindex import LineIndex, count_newlines
+
+TEXT = "first\nsecond — 2\n\nfourth ñ TODO\n".encode("utf-8")
+
+
+def test_positions_are_lines_and_character_columns():
+    index = LineIndex(TEXT)
+    todo = TEXT.index(b"TODO")
+    assert index.position(0) == (1, 1)
+    assert index.position(TEXT.index(b"2")) == (2, 10)  # the dash is one character, three bytes
+    assert index.position(todo) == (4, 10)
+    assert index.line_text(todo) == "fourth ñ TODO"
+    # Going backwards restarts the cursor instead of giving a wrong answer
+    assert index.position(TEXT.index(b"second")) == (2, 1)
+
+
+def test_line_base_continues_numbering_from_earlier_chunks():
+    assert LineIndex(TEXT, line_base=100).line_of(TEXT.index(b"fourth")) == 104
+
+
+def test_mmap_counts_match_bytes(tmp_path, monkeypatch):
+    monkeypatch.setattr(lineindex, "COUNT_WINDOW", 4)
+    path = tmp_path / "f.txt"
+    path.write_bytes(TEXT * 3)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for start, end in [(0, len(mm)), (3, 17), (5, 6)]:
+            assert count_newlines(mm, start, end) == (TEXT * 3).count(b"\n", start, end)
+        assert LineIndex(mm).position(len(TEXT) * 2 + TEXT.index(b"TODO")) == (12, 10)
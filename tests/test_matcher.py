@@ -0,0 +1,47 @@
+from __future__ import annotations
+import os, re, subprocess, sys
+
+import pytest
+
+from techdebt_cli.matcher import get_matcher, marker_specs
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def test_custom_markers_take_priority_and_owner_from_their_own_patterns():
+    specs = marker_specs(
+        [
+            {"pattern": r"(?i:todo)\b"},
+            {"pattern": r"NOTE\(", "priority_from": r"prio=(\w+)", "owner_from": r"by (\w+)"},
+            {"priority_from": r"ignored without a pattern"},
+        ]
+    )
+    hits = get_matcher(specs, "py").scan(b"x = 1  # todo [P2] @amy fix\n# NOTE( prio=p1 by bo\n")
+    assert [(line, owner, prio) for line, _, _, owner, prio in hits.markers] == [(1, "amy", "P2"), (2, "bo", "P1")]
+
+
+@pytest.mark.parametrize(
+    "marker, message",
+    [
+        ({"pattern": "TODO("}, "markers[2].pattern 'TODO(' is not a valid regex: missing )"),
+        ({"pattern": "(?i)todo"}, "use scoped flags such as (?i:...) instead"),
+        ({"pattern": "TODO", "owner_from": "@(["}, "markers[2].owner_from '@([' is not a valid regex"),
+        ({"pattern": "(?P<m0>TODO)"}, "group names m<N> and x<N> are reserved"),
+        ({"pattern": 42}, "markers[2].pattern must be a regex string, got 42"),
+    ],
+)
+def test_bad_marker_patterns_are_reported_by_name(marker, message):
+    with pytest.raises(ValueError, match=re.escape(message)):
+        marker_specs([{"pattern": "FIXME"}, marker])
+
+
+def test_scan_fails_on_a_bad_marker_instead_of_finding_nothing(tmp_path):
+    (tmp_path / ".techdebt.yml").write_text("markers:\n  - pattern: 'TODO('\n")
+    (tmp_path / "a.py").write_text("# TODO( fix\n")
+    proc = subprocess.run(
+        [sys.executable, "-m", "techdebt_cli", "scan", str(tmp_path), "--json"],
+        env=dict(os.environ, PYTHONPATH=SRC), capture_output=True, text=True,
+    )
+    assert proc.returncode != 0
+    assert "[error] markers[1].pattern 'TODO(' is not a valid regex" in proc.stderr
+    assert not (tmp_path / "tech-debt.json").exists()
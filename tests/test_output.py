@@ -0,0 +1,28 @@
+from __future__ import annotations
+import json
+
+from techdebt_cli.utils import write_json, write_ndjson
+
+RESULT = {
+    "repo_root": "/repo",
+    "summary": {"total_items": 2},
+    "items": [{"path": "a.py", "score": 0.5}, {"path": "b.py", "score": 0.25}],
+    "delta": {"base": "main", "added": [{"path": "b.py"}], "removed": []},
+    "skipped": [{"path": "big.bin", "size": 10}],
+}
+
+
+def test_write_json_is_indented_json(tmp_path):
+    write_json(RESULT, str(tmp_path))
+    assert (tmp_path / "tech-debt.json").read_text() == json.dumps(RESULT, indent=2)
+
+
+def test_ndjson_has_header_items_delta_skipped_and_end(tmp_path):
+    write_ndjson(RESULT, str(tmp_path))
+    records = [json.loads(line) for line in (tmp_path / "tech-debt.ndjson").read_text().splitlines()]
+    assert [r["type"] for r in records] == ["header", "item", "item", "added", "skipped", "end"]
+    assert records[0] == {
+        "type": "header", "repo_root": "/repo", "summary": {"total_items": 2}, "delta": {"base": "main"},
+    }
+    assert records[1] == {"type": "item", "path": "a.py", "score": 0.5}
+    assert records[-1] == {"type": "end", "items": 2}
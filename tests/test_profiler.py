@@ -0,0 +1,36 @@
+from __future__ import annotations
+import json, os
+
+from techdebt_cli.config import load_config
+from techdebt_cli.profiler import NULL_PROFILER, Profiler
+from techdebt_cli.scanner import scan_repo
+
+
+def test_scan_phases_counters_and_slowest_files(sample_repo):
+    profiler = Profiler(top_n=3)
+    scan_repo(sample_repo, load_config(sample_repo), profiler=profiler)
+    report = profiler.to_json()
+    names = [p["name"] for p in report["phases"]]
+    assert names[:3] == ["git_churn", "walk", "analyze"]
+    assert report["counters"]["files_walked"] == report["counters"]["files_scanned"] > 50
+    assert 1 <= sum(p["git_processes"] for p in report["phases"]) <= report["git_processes"]
+    assert report["subprocesses"]["git"] == report["git_processes"]
+    slowest = report["slowest_files"]
+    assert len(slowest) == 3 and slowest == sorted(slowest, key=lambda f: -f["seconds"])
+
+
+def test_disabled_profiler_records_nothing():
+    with NULL_PROFILER.phase("x"):
+        NULL_PROFILER.count("files")
+        NULL_PROFILER.file("a.py", 1.0)
+    assert NULL_PROFILER.phases == [] and NULL_PROFILER.counters == {} and NULL_PROFILER._slowest == []
+
+
+def test_profile_flag_writes_the_report(sample_repo, cli_json):
+    cli_json(sample_repo, "--profile")
+    path = os.path.join(sample_repo, "techdebt-profile.json")
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    os.remove(path)
+    names = [p["name"] for p in report["phases"]]
+    assert names[0] == "load_config" and "write_json" in names
@@ -0,0 +1,46 @@
+from __future__ import annotations
+import mmap
+
+from techdebt_cli import reader
+from techdebt_cli.reader import count_loc, iter_buffers
+from techdebt_cli.scanner import AnalyzeOptions, analyze_blob, analyze_file
+
+TEXT = b"".join(b"x = %d  # TODO: item %d\n\n" % (i, i) for i in range(50))
+
+
+def buffers(path, size):
+    with open(path, "rb") as f:
+        return [bytes(b) if isinstance(b, mmap.mmap) else b for b in iter_buffers(f, size)]
+
+
+def test_size_tiers(tmp_path, monkeypatch):
+    path = tmp_path / "a.py"
+    path.write_bytes(TEXT)
+    assert buffers(path, len(TEXT)) == [TEXT]
+    monkeypatch.setattr(reader, "SMALL_FILE_BYTES", 10)
+    monkeypatch.setattr(reader, "CHUNK_BYTES", 64)
+    chunks = buffers(path, len(TEXT))
+    assert len(chunks) > 5 and b"".join(chunks) == TEXT
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+    monkeypatch.setattr(reader, "MMAP_FILE_BYTES", 100)
+    with open(path, "rb") as f:
+        (mm,) = iter_buffers(f, len(TEXT))
+        assert isinstance(mm, mmap.mmap)
+
+
+def test_chunked_and_mapped_reads_find_the_same_items(tmp_path, monkeypatch):
+    path = tmp_path / "a.py"
+    path.write_bytes(TEXT)
+    whole = analyze_blob("a.py", TEXT)
+    assert whole[0] == count_loc(TEXT) == 50
+    monkeypatch.setattr(reader, "SMALL_FILE_BYTES", 10)
+    monkeypatch.setattr(reader, "CHUNK_BYTES", 64)
+    assert analyze_file(str(path), "a.py") == whole
+    monkeypatch.setattr(reader, "MMAP_FILE_BYTES", 100)
+    assert analyze_file(str(path), "a.py") == whole
+
+
+def test_files_over_the_limit_are_skipped_unread(tmp_path):
+    path = tmp_path / "a.py"
+    path.write_bytes(TEXT)
+    assert analyze_file(str(path), "a.py", AnalyzeOptions(max_file_bytes=100)) == (0, [("skipped", len(TEXT))])
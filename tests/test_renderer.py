@@ -0,0 +1,51 @@
+from __future__ import annotations
+import os
+
+from techdebt_cli.renderer import QUICK_WINS, render_markdown
+
+
+def report(n: int) -> dict:
+    items = [
+        {
+            "path": f"f{i:02d}.py", "kind": "inline_marker", "score": 90.0 - i, "owner": None, "status": "open",
+            "meta": {"snippet": f"TODO: {i}", "priority_bucket": "P1", "components": {"churn": 0.5}},
+        }
+        for i in range(n)
+    ]
+    return {
+        "repo_root": "/repo", "commit_sha": "abc", "items": items,
+        "summary": {"count": n, "avg_score": 80.0, "by_kind": {"inline_marker": n}},
+    }
+
+
+def read(path) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_details_are_paginated_and_capped(tmp_path):
+    render_markdown(report(7), str(tmp_path), details_per_page=2, max_detail_pages=3)
+    assert sorted(os.listdir(tmp_path)) == ["TECH_DEBT-2.md", "TECH_DEBT-3.md", "TECH_DEBT.md"]
+    main = read(tmp_path / "TECH_DEBT.md")
+    assert "### f01.py" in main and "### f02.py" not in main
+    assert "- [TECH_DEBT-2.md](TECH_DEBT-2.md)\n- [TECH_DEBT-3.md](TECH_DEBT-3.md)" in main
+    assert "1 lower-ranked items are not detailed here" in main
+    page3 = read(tmp_path / "TECH_DEBT-3.md")
+    assert page3.startswith("# Tech Debt Report — Details, page 3 of 3")
+    assert "### f05.py" in page3 and "### f06.py" not in page3
+
+
+def test_only_pages_the_previous_report_linked_are_removed(tmp_path):
+    render_markdown(report(6), str(tmp_path), details_per_page=2)
+    (tmp_path / "TECH_DEBT-9.md").write_text("not ours")
+    render_markdown(report(3), str(tmp_path), details_per_page=2)
+    assert sorted(os.listdir(tmp_path)) == ["TECH_DEBT-2.md", "TECH_DEBT-9.md", "TECH_DEBT.md"]
+    render_markdown(report(3), str(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == ["TECH_DEBT-9.md", "TECH_DEBT.md"]
+
+
+def test_quick_wins_are_capped(tmp_path):
+    render_markdown(report(40), str(tmp_path))
+    main = read(tmp_path / "TECH_DEBT.md")
+    wins = main.split("## Quick Wins")[1].split("## Details")[0]
+    assert wins.count("\n- **") == QUICK_WINS
@@ -0,0 +1,44 @@
+from __future__ import annotations
+import json, os, subprocess, sys
+
+import pytest
+
+from techdebt_cli.config import load_config
+from techdebt_cli.rescore import load_report, rescore_result
+from techdebt_cli.scanner import scan_repo
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def key(items):
+    return sorted((it["path"], it["kind"], it["score"], it["meta"]["priority_bucket"]) for it in items)
+
+
+def test_same_weights_reproduce_the_report(sample_repo):
+    cfg = load_config(sample_repo)
+    report = json.loads(json.dumps(scan_repo(sample_repo, cfg), default=str))
+    assert rescore_result(json.loads(json.dumps(report)), cfg) == report
+
+
+def test_new_weights_match_a_fresh_scan(sample_repo):
+    cfg = load_config(sample_repo)
+    report = json.loads(json.dumps(scan_repo(sample_repo, cfg), default=str))
+    cfg.data["weights"] = dict(cfg.data["weights"], no_tests=3.0, inline_priority=0.1)
+    fresh = scan_repo(sample_repo, cfg)
+    rescored = rescore_result(report, cfg)
+    assert key(rescored["items"]) == key(fresh["items"])
+    assert rescored["summary"] == fresh["summary"]
+    scores = [it["score"] for it in rescored["items"]]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_bad_reports_are_rejected(tmp_path):
+    path = tmp_path / "r.json"
+    path.write_text('{"summary": {}}')
+    with pytest.raises(ValueError, match="is not a tech-debt.json report"):
+        load_report(str(path))
+    proc = subprocess.run(
+        [sys.executable, "-m", "techdebt_cli", "rescore", str(path)],
+        env=dict(os.environ, PYTHONPATH=SRC), capture_output=True, text=True,
+    )
+    assert proc.returncode != 0 and "[error] Cannot load report" in proc.stderr
@@ -0,0 +1,25 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+
+from techdebt_cli.scanner import iter_analyzed
+
+
+def test_parallel_scan_writes_the_same_json(sample_repo, cli_json):
+    serial = cli_json(sample_repo, "-j", "1")
+    assert cli_json(sample_repo, "-j", "4") == serial
+    assert cli_json(sample_repo, "-j", "4", "--walker", "git") == serial
+
+
+
+def test_results_keep_job_order_with_workers_and_a_shared_pool(tmp_path):
+    jobs = []
+    for i in range(40):
+        path = tmp_path / f"f{i:02d}.py"
+        path.write_text(f"# TODO: {i}\n" * (i % 3 + 1))
+        jobs.append((str(path), path.name))
+    jobs.append((str(tmp_path / "missing.py"), "missing.py"))
+    serial = list(iter_analyzed(jobs))
+    assert serial[-1] is None and [res[0] for res in serial[:3]] == [1, 2, 3]
+    assert list(iter_analyzed(jobs, workers=3)) == serial
+    with ThreadPoolExecutor(4) as pool:
+        assert list(iter_analyzed(jobs, workers=2, pool=pool)) == serial
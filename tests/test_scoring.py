@@ -0,0 +1,36 @@
+from __future__ import annotations
+import random
+
+import pytest
+
+from techdebt_cli.scoring import COMPONENTS, Scorer, bucket, component_matrix, components, rescore_items
+
+WEIGHTS = {"inline_priority": 1.3, "age_days": 0.7, "churn": 0.4, "no_tests": 0.9, "deprecated": -0.2}
+
+
+def rows(n: int):
+    rng = random.Random(7)
+    return [tuple(rng.random() for _ in COMPONENTS) for _ in range(n)]
+
+
+def test_batch_scores_match_item_scores():
+    scorer = Scorer(WEIGHTS)
+    data = rows(300)
+    expected = [scorer.score(r) for r in data]
+    assert list(scorer.score_matrix(component_matrix(data))) == expected
+    assert list(scorer.score_matrix(data)) == expected
+    assert scorer.buckets(expected) == [bucket(s) for s in expected]
+
+
+def test_rescore_items_rewrites_score_and_bucket():
+    items = [{"score": 1.0, "meta": {"components": {"inline_priority": 1.0}}}, {"score": 1.0}]
+    rescore_items(items, {"inline_priority": 2.0})
+    assert [(it["score"], it["meta"]["priority_bucket"]) for it in items] == [(88.08, "P1"), (50.0, "P2")]
+
+
+def test_components_are_validated():
+    assert components(churn=0.5)[COMPONENTS.index("churn")] == 0.5
+    with pytest.raises(ValueError):
+        components(bogus=1.0)
+    with pytest.raises(ValueError):
+        component_matrix([(0.0,)])
@@ -0,0 +1,53 @@
+from __future__ import annotations
+from datetime import datetime
+
+from techdebt_cli.trends import TrendStore
+
+
+def item(n: int, score: float) -> dict:
+    return {"path": f"f{n}.py", "kind": "inline_marker", "score": score, "meta": {"snippet": f"TODO {n}"}}
+
+
+def report(sha: str, items: list, max_items: int) -> dict:
+    kept = sorted(items, key=lambda it: -it["score"])[:max_items]
+    return {"commit_sha": sha, "summary": {"count": len(kept)}, "items": [dict(it) for it in kept]}
+
+
+def test_items_under_the_cut_stay_open(tmp_path):
+    everything = [item(n, 10.0 * n) for n in range(1, 5)]
+    with TrendStore(str(tmp_path / "t.sqlite")) as store:
+        store.record(report("a", everything, 10), datetime(2024, 1, 1), everything)
+        # Same four items, reported with --max-items 1; item 1 is gone from the next scan
+        store.record(report("b", everything, 1), datetime(2024, 1, 8), everything)
+        result = report("c", everything[1:], 1)
+        store.record(result, datetime(2024, 1, 15), everything[1:])
+        assert store.counts() == {"scans": 3, "open": 3, "resolved": 1}
+        assert [(it["path"], it["status"], it["first_seen"]) for it in result["items"]] == [
+            ("f4.py", "open", "2024-01-01T00:00:00Z")
+        ]
+        assert [s["count"] for s in store.scans()] == [3, 4, 4]
+
+
+def test_reported_items_are_recorded_by_default(tmp_path):
+    everything = [item(n, 10.0 * n) for n in range(1, 4)]
+    with TrendStore(str(tmp_path / "t.sqlite")) as store:
+        store.record(report("a", everything, 10), datetime(2024, 1, 1))
+        store.record(report("b", everything, 2), datetime(2024, 1, 8))
+        assert store.counts() == {"scans": 2, "open": 2, "resolved": 1}
+
+
+def test_weekly_and_open_longest_come_from_the_indexes(tmp_path):
+    items = [item(n, 10.0 * n) for n in range(1, 5)]
+    with TrendStore(str(tmp_path / "t.sqlite")) as store:
+        for day, live in ((1, items[:2]), (8, items[1:3]), (10, items[1:4]), (15, items[2:4])):
+            store.record(report(f"sha{day}", live, 10), datetime(2024, 1, day), live)
+        assert store.weekly() == [
+            {"week": "2024-01-01", "added": 2, "resolved": 0},
+            {"week": "2024-01-08", "added": 2, "resolved": 1},
+            {"week": "2024-01-15", "added": 0, "resolved": 1},
+        ]
+        assert [(it["path"], it["first_seen"]) for it in store.open_longest(1)] == [("f3.py", "2024-01-08T00:00:00Z")]
+        plan = store.db.execute(
+            "EXPLAIN QUERY PLAN SELECT path FROM items WHERE status = 'open' ORDER BY first_seen LIMIT 1"
+        ).fetchall()
+        assert any("items_status_first_seen" in row[-1] for row in plan)
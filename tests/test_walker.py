@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from techdebt_cli.walker import IgnoreRules, walk_files
+
+
+def paths(repo: str, **kw) -> list:
+    return [e.rel for e in walk_files(repo, **kw)]
+
+
+def test_excluded_and_ignored_files_are_skipped(sample_repo):
+    found = paths(sample_repo, excludes=["vendor/**"])
+    assert "app/untracked.py" in found
+    assert not any(p.startswith(("vendor/", "build/", ".git/")) for p in found)
+    assert paths(sample_repo, excludes=["vendor/**"], backend="git") == found
+
+
+def test_nested_gitignore_and_negation(make_repo):
+    repo = make_repo(
+        {
+            ".gitignore": "*.log\nlogs/\n",
+            "keep.py": "",
+            "a.log": "",
+            "logs/x.py": "",
+            "pkg/.gitignore": "!important.log\ngen/\n",
+            "pkg/important.log": "",
+            "pkg/other.log": "",
+            "pkg/gen/out.py": "",
+            "pkg/mod.py": "",
+        }
+    )
+    found = paths(repo)
+    assert found == [".gitignore", "keep.py", "pkg/.gitignore", "pkg/important.log", "pkg/mod.py"]
+    assert paths(repo, backend="git") == found
+
+
+def test_ignored_directories_are_decided_once(make_repo):
+    repo = make_repo({".gitignore": "build/\n", "build/a/b.py": "", "src/c.py": ""})
+    rules = IgnoreRules(repo)
+    assert [e.rel for e in walk_files(repo, rules=rules)] == [".gitignore", "src/c.py"]
+    # The pruned directory was looked up, nothing below it was
+    assert rules.dir_ignored("build") and "build/a" not in rules._dirs
@@ -0,0 +1,59 @@
+from __future__ import annotations
+import json, os
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from techdebt_cli.config import load_config
+from techdebt_cli.scanner import scan_repo
+from techdebt_cli.watch import MAX_WAIT_S, LiveIndex, serve, wait_seconds
+
+
+def test_wait_is_clamped():
+    assert wait_seconds({}) == 0.0
+    assert wait_seconds({"wait": ["2.5"]}) == 2.5
+    assert wait_seconds({"wait": ["-3"]}) == 0.0
+    assert wait_seconds({"wait": ["1e9"]}) == MAX_WAIT_S
+
+
+def test_bad_wait_is_rejected():
+    for bad in ("soon", "", "nan", "inf", "-inf"):
+        assert wait_seconds({"wait": [bad]}) is None, bad
+
+
+def scan_items(repo: str) -> list:
+    return scan_repo(repo, load_config(repo))["items"]
+
+
+def test_refresh_reads_only_changed_files_and_matches_a_scan(make_repo):
+    repo = make_repo({f"m{i}.py": f"# TODO: {i}\n" for i in range(5)})
+    live = LiveIndex(repo)
+    assert live.snapshot.result["items"] == scan_items(repo)
+    assert live.refresh() is False
+    with open(os.path.join(repo, "m1.py"), "w") as f:
+        f.write("# FIXME: changed, and longer\n")
+    os.remove(os.path.join(repo, "m2.py"))
+    assert live.refresh() is True
+    assert live.last_update["files_analyzed"] == 2  # one read, one dropped
+    assert live.snapshot.version == 2
+    assert live.snapshot.result["items"] == scan_items(repo)
+    assert [it["meta"]["snippet"] for it in live.items_for("m1.py")] == ["FIXME: changed, and longer"]
+
+
+def test_http_result_uses_the_version_as_etag(make_repo):
+    live = LiveIndex(make_repo({"a.py": "# TODO: one\n"}))
+    server = serve(live, port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        with urlopen(f"{url}/result") as resp:
+            assert resp.headers["ETag"] == '"1"'
+            assert json.loads(resp.read()) == live.snapshot.result
+        with pytest.raises(HTTPError) as err:
+            urlopen(Request(f"{url}/result", headers={"If-None-Match": '"1"'}))
+        assert err.value.code == 304
+        with pytest.raises(HTTPError) as err:
+            urlopen(f"{url}/result?wait=soon")
+        assert err.value.code == 400
+    finally:
+        server.shutdown()